@@ -4,29 +4,81 @@ Ce module contient l'interface graphique principale de l'application,
 incluant la fenêtre de connexion et le menu principal.
 """
 
-import os
 import sys
+
+from ressources.startup_profile import profiler
+
+# Mesure du démarrage (python app.py --profile-startup) : les imports
+# suivants sont chronométrés
+if "--profile-startup" in sys.argv:
+    profiler.install()
+
+import os
+import threading
+import multiprocessing
 import traceback
 from datetime import datetime
-from typing import Optional, Dict, Any, Tuple, List, Union
+from typing import Optional, Dict, Any, Tuple, List
 
 import customtkinter as ctk
 import hashlib
 import sqlite3
 from PIL import Image, ImageTk
 from tkinter import messagebox
-import matplotlib.pyplot as plt
-import pygame
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+# Matplotlib (graphiques), NumPy (catalogue), pygame (musique) et la
+# messagerie ne sont importés qu'à leur première utilisation, afin que la
+# fenêtre de connexion s'affiche le plus tôt possible
 from ressources import allinfos as infos
 from ressources import bdd_users
 from ressources import manip_bd
+from ressources import init_bd
 from ressources.request_bd import db
-from ressources.send_mail import global_email_manager
+from ressources.pool_bd import pool
+from ressources.completion import CompletionIndex, RECENT_LIMIT
+from ressources.virtual_grid import VirtualGrid
+from ressources.tk_executor import TkExecutor
+from ressources.query_profiler import query_profiler
+
+# Profilage des requêtes SQL (python app.py --profile-sql) : rapport écrit
+# dans ressources/sql_profile.txt à la fermeture
+if "--profile-sql" in sys.argv:
+    query_profiler.enable()
+
+
+def get_mixer():
+    """Importe pygame et initialise le mixer audio au premier usage.
+    
+    Returns:
+        module: pygame.mixer initialisé
+    """
+    import pygame
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    return pygame.mixer
+
 
-# Initialisation de pygame pour la musique
-pygame.mixer.init()
+def start_background_services() -> None:
+    """Prépare en arrière-plan ce dont le menu principal aura besoin.
+    
+    Charge le catalogue en mémoire (depuis l'instantané du dernier lancement
+    si possible), purge le journal des mouvements déjà agrégé et relance
+    l'envoi des emails restés en file.
+    """
+    def run():
+        try:
+            from ressources.catalog import catalog
+            catalog.warm_start()
+            from ressources.manip_bd import compact_stock_movements
+            compact_stock_movements()
+            from ressources.send_mail import global_email_outbox
+            global_email_outbox.start()
+        except Exception as e:
+            print(f"Erreur lors du démarrage des services de fond : {str(e)}")
+        finally:
+            pool.close_thread()
+
+    threading.Thread(target=run, name="startup-services", daemon=True).start()
 
 # Configurer la gestion des erreurs
 def log_error(error_type, error_value, error_traceback):
@@ -90,6 +142,9 @@ class SignUpFrame(ctk.CTk):
         # Bouton de connexion
         self.btn_next = ctk.CTkButton(self, text="Suivant", command=self.on_next)
         
+        # Vérification des identifiants hors du thread de l'interface
+        self.executor = TkExecutor(self, on_busy=self._set_busy)
+        
         # Gestion des événements
         self.ctrl_snd.bind("<Return>", self.on_return)  # Touche Entrée pour se connecter
         self._focus_after_id = self.after(100, lambda: self.ctrl_main.focus_set())  # Focus automatique
@@ -100,10 +155,27 @@ class SignUpFrame(ctk.CTk):
         self.label_snd.pack(pady=10)
         self.password_frame.pack(pady=10)
         self.btn_next.pack(pady=10)
+        
+        # Suite du démarrage une fois la fenêtre affichée
+        self.after_idle(self._on_first_frame)
        
         # Lancement de la boucle principale
         self.mainloop()
     
+    def _on_first_frame(self):
+        """Lance les services différés, ou termine la mesure du démarrage."""
+        self.update_idletasks()
+        profiler.mark("première image de la fenêtre de connexion")
+        
+        if profiler.active:
+            # Mode --profile-startup : rapport puis fermeture
+            profiler.uninstall()
+            print(profiler.report())
+            self._safe_destroy()
+            return
+        
+        start_background_services()
+    
     def toggle_password_visibility(self):
         """Bascule l'affichage du mot de passe entre visible et masqué."""
         self.password_visible = not self.password_visible
@@ -122,13 +194,34 @@ class SignUpFrame(ctk.CTk):
         """
         self.after(10, self.on_next)
     
+    def _set_busy(self, busy: bool) -> None:
+        """Affiche l'attente pendant la vérification des identifiants.
+        
+        Args:
+            busy: True pendant la vérification
+        """
+        self.configure(cursor="watch" if busy else "")
+        self.btn_next.configure(state="disabled" if busy else "normal")
+    
     def check_connexion(self):
-        """Vérifie les identifiants de connexion et ouvre le menu principal si valides."""
+        """Vérifie les identifiants de connexion en arrière-plan."""
         username = self.ctrl_main.get()
         password = self.ctrl_snd.get()
         
         # Utilisation de la fonction check_co de bdd_users
-        success, message, user_data = bdd_users.check_co(username, password)
+        self.executor.submit(
+            bdd_users.check_co, username, password,
+            on_done=self._on_connexion_checked,
+            key="connexion"
+        )
+    
+    def _on_connexion_checked(self, result: Tuple[bool, str, Optional[Dict[str, Any]]]) -> None:
+        """Ouvre le menu principal si les identifiants sont valides.
+        
+        Args:
+            result: Résultat de bdd_users.check_co
+        """
+        success, message, user_data = result
         
         if success:
             print(f"Connexion réussie pour {user_data['firstname']}")
@@ -151,6 +244,8 @@ class SignUpFrame(ctk.CTk):
         """Détruit proprement la fenêtre en annulant les tâches en attente."""
         if hasattr(self, '_focus_after_id'):
             self.after_cancel(self._focus_after_id)
+        if hasattr(self, 'executor'):
+            self.executor.shutdown()
         try:
             self.destroy()
         except Exception as e:
@@ -177,15 +272,19 @@ class MainMenu(ctk.CTk):
         self._init_keyboard_shortcuts()
         self._init_resources()
         
-        # Initialisation de la musique
+        # Musique (chargée au premier lancement de la lecture)
         self.music_playing = False
+        self.music_loaded = False
         self.music_path = os.path.join(infos.PATH, "immortal.mp3")
-        if os.path.exists(self.music_path):
-            pygame.mixer.music.load(self.music_path)
-            pygame.mixer.music.set_volume(0.5)
-        else:
+        if not os.path.exists(self.music_path):
             print("Erreur : Le fichier de musique n'a pas été trouvé")
         
+        # Accès à la base hors du thread de l'interface
+        self.executor = TkExecutor(self, on_busy=self._set_busy)
+        
+        # Emails mis en file par ce poste : ID mail -> tentatives déjà signalées
+        self._outbox_mails: Dict[int, int] = {}
+        
         # Création de l'interface
         self._init_tab_system()
         self._create_main_menu()
@@ -495,6 +594,246 @@ class MainMenu(ctk.CTk):
         separator = ctk.CTkFrame(tab, height=2, fg_color=infos.separator_color)
         separator.pack(fill="x", padx=infos.SMALL_PAD, pady=(0, infos.SMALL_PAD))
 
+    def _load_material_choices(self) -> None:
+        """Lance le chargement des libellés des matériels pour la combobox.
+        
+        Le catalogue et les pièces récentes sont lus dans le thread de travail ;
+        la liste déroulante (self.ctrl_search) est remplie à l'arrivée du
+        résultat. L'index de complétion n'est reconstruit que si le catalogue
+        a changé.
+        """
+        if not hasattr(self, "material_index"):
+            self.material_ids = {}
+            self.material_index = CompletionIndex([])
+            self.recent_material_ids = []
+        self.material_suggestions = []
+        
+        self.executor.submit(
+            self._fetch_material_choices,
+            getattr(self, "material_index_version", None), self.username,
+            on_done=self._apply_material_choices,
+            on_error=lambda e: print(f"Erreur lors de la récupération des descriptions : {str(e)}"),
+            key="choix_materiel"
+        )
+    
+    @staticmethod
+    def _fetch_material_choices(
+        known_version: Optional[Tuple[int, int]],
+        username: str
+    ) -> Tuple[Tuple[int, int], Optional[List[Tuple[int, str, str]]], List[int]]:
+        """Lit les matériels et les pièces récentes (thread de travail).
+        
+        Args:
+            known_version: Version du catalogue de l'index actuel
+            username: Utilisateur connecté
+        
+        Returns:
+            Tuple: (version du catalogue, matériels ou None si l'index est
+                à jour, ID des pièces mouvementées par l'utilisateur)
+        """
+        from ressources.catalog import catalog
+        
+        index_version = (catalog.column_version("Description"), catalog.column_version("PN"))
+        rows = None
+        if index_version != known_version:
+            try:
+                rows = catalog.material_choices()
+            except Exception as e:
+                print(f"Erreur lors de la récupération des descriptions : {str(e)}")
+                rows = []
+        return index_version, rows, db.get_recent_materials(username, RECENT_LIMIT)
+    
+    def _apply_material_choices(
+        self,
+        result: Tuple[Tuple[int, int], Optional[List[Tuple[int, str, str]]], List[int]]
+    ) -> None:
+        """Reconstruit l'index de complétion et remplit la liste déroulante.
+        
+        Les descriptions en double sont complétées par l'ID de la pièce afin
+        que chaque libellé désigne une seule ligne de la table magasin.
+        
+        Args:
+            result: Résultat de _fetch_material_choices
+        """
+        index_version, rows, recent_ids = result
+        if rows is not None:
+            counts = {}
+            for _, description, _ in rows:
+                counts[description] = counts.get(description, 0) + 1
+            
+            self.material_ids = {}
+            entries = []
+            for part_id, description, pn in rows:
+                label = description if counts[description] == 1 else f"{description} [#{part_id}]"
+                self.material_ids[label] = part_id
+                entries.append((part_id, label, pn))
+            
+            self.material_index = CompletionIndex(entries)
+            self.material_index_version = index_version
+        
+        self.recent_material_ids = self._recent_material_ids(recent_ids)
+        if self.ctrl_search.winfo_exists():
+            self._update_material_suggestions()
+    
+    def _recent_material_ids(self, user_recent_ids: List[int]) -> List[int]:
+        """Retourne les pièces récemment utilisées, de la plus récente à la plus ancienne.
+        
+        Le dernier matériel saisi (allinfos.last_material) passe en tête,
+        suivi des pièces mouvementées par l'utilisateur connecté.
+        
+        Args:
+            user_recent_ids: ID des pièces mouvementées par l'utilisateur
+        
+        Returns:
+            List[int]: ID des pièces récentes
+        """
+        recent = []
+        last_id = self.material_ids.get(infos.last_material)
+        if last_id is not None:
+            recent.append(last_id)
+        recent.extend(user_recent_ids)
+        return recent
+    
+    def _update_material_suggestions(self, event=None) -> None:
+        """Met à jour les propositions de la liste déroulante selon la saisie.
+        
+        Args:
+            event: Événement clavier (les touches de navigation sont ignorées)
+        """
+        if event is not None and event.keysym in ("Return", "Tab", "Up", "Down"):
+            return
+        
+        self.material_suggestions = self.material_index.complete(
+            self.ctrl_search.get(),
+            recent=self.recent_material_ids
+        )
+        self.ctrl_search.configure(values=self.material_suggestions)
+    
+    def _load_plane_choices(self) -> None:
+        """Lance le chargement des avions pour l'attribution des retraits.
+        
+        La liste des avions est lue dans le thread de travail, puis placée
+        dans self.ctrl_withdraw_plane, précédée d'un choix vide.
+        """
+        from ressources.catalog import catalog
+        
+        if not hasattr(self, "plane_ids"):
+            self.plane_ids = {}
+        self.executor.submit(
+            catalog.planes,
+            on_done=self._apply_plane_choices,
+            on_error=lambda e: print(f"Erreur lors de la récupération des avions : {str(e)}"),
+            key="choix_avions"
+        )
+    
+    def _apply_plane_choices(self, rows: List[Tuple[str, int]]) -> None:
+        """Remplit la liste des avions.
+        
+        Args:
+            rows: Couples (nom, ID) des avions
+        """
+        self.plane_ids = {name: plane_id for name, plane_id in rows}
+        if self.ctrl_withdraw_plane.winfo_exists():
+            self.ctrl_withdraw_plane.configure(values=[""] + [name for name, _ in rows])
+    
+    def _apply_movement_from_form(
+        self,
+        sign: int,
+        action: str,
+        plane_name: Optional[str] = None
+    ) -> None:
+        """Valide le formulaire d'ajout/retrait et applique le mouvement de stock.
+        
+        Args:
+            sign: 1 pour un ajout, -1 pour un retrait
+            action: Libellé de l'action pour le message de succès
+            plane_name: Avion auquel le mouvement est attribué (facultatif)
+        """
+        description = self.ctrl_search.get()
+        quantity = self.ctrl_quantity.get()
+        
+        # Validation des champs
+        if not description:
+            messagebox.showerror("Erreur", "Veuillez sélectionner un matériel")
+            return
+        
+        try:
+            quantity = int(quantity)
+            if quantity <= 0:
+                messagebox.showerror("Erreur", "La quantité doit être un nombre positif")
+                return
+        except ValueError:
+            messagebox.showerror("Erreur", "La quantité doit être un nombre entier")
+            return
+        
+        part_id = getattr(self, "material_ids", {}).get(description)
+        if part_id is None:
+            messagebox.showerror("Erreur", "Matériel non trouvé dans la base de données")
+            return
+        
+        plane_id = None
+        if plane_name:
+            plane_id = getattr(self, "plane_ids", {}).get(plane_name)
+            if plane_id is None:
+                messagebox.showerror("Erreur", "Avion non trouvé dans la base de données")
+                return
+        
+        # Mise à jour atomique de la quantité, inscrite au journal des mouvements
+        self.btn_validate.configure(state="disabled")
+        self.executor.submit(
+            manip_bd.apply_stock_movement,
+            part_id, sign * quantity, username=self.username, plane_id=plane_id,
+            on_done=lambda result: self._on_movement_applied(
+                result, action, description, part_id, quantity
+            ),
+            on_error=lambda error: self._on_movement_applied(
+                (False, f"Erreur inattendue : {str(error)}", None),
+                action, description, part_id, quantity
+            )
+        )
+    
+    def _on_movement_applied(
+        self,
+        result: Tuple[bool, str, Optional[int]],
+        action: str,
+        description: str,
+        part_id: int,
+        quantity: int
+    ) -> None:
+        """Affiche le résultat d'un mouvement de stock et réinitialise le formulaire.
+        
+        Args:
+            result: Résultat de manip_bd.apply_stock_movement
+            action: Libellé de l'action pour le message de succès
+            description: Libellé du matériel
+            part_id: ID du matériel
+            quantity: Quantité déplacée
+        """
+        self.btn_validate.configure(state="normal")
+        success, message, new_quantity = result
+        if not success:
+            messagebox.showerror("Erreur", message)
+            return
+        
+        # Message de succès
+        messagebox.showinfo(
+            "Succès", 
+            f"{action} de {quantity} unité(s) de {description}\nNouveau stock : {new_quantity}"
+        )
+        
+        # Mémorisation du matériel pour le classement des propositions
+        infos.last_material = description
+        infos.save_infos()
+        self.recent_material_ids = [part_id] + [
+            recent_id for recent_id in self.recent_material_ids if recent_id != part_id
+        ]
+        
+        # Réinitialisation des champs
+        self.ctrl_quantity.delete(0, "end")
+        self.ctrl_search.set("")
+        self._update_material_suggestions()
+        self.ctrl_search.focus()
+    
     def on_add(self):
         """Gère l'ouverture de l'onglet Ajouter du matériel."""
         # Nouvel onglet ou focus sur l'ancien
@@ -512,14 +851,6 @@ class MainMenu(ctk.CTk):
         content_frame = ctk.CTkFrame(on_add_tab, fg_color="transparent")
         content_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Récupération des descriptions depuis la base de données
-        try:
-            descriptions = db.query("SELECT Description FROM magasin ORDER BY Description")
-            descriptions = [desc[0] for desc in descriptions if desc[0]]  # Extraction des descriptions non vides
-        except Exception as e:
-            print(f"Erreur lors de la récupération des descriptions : {str(e)}")
-            descriptions = []
-        
         # Section recherche de matériel
         search_frame = ctk.CTkFrame(content_frame)
         search_frame.pack(fill="x", padx=20, pady=10)
@@ -530,17 +861,23 @@ class MainMenu(ctk.CTk):
         
         self.ctrl_search = ctk.CTkComboBox(
             search_frame, 
-            values=descriptions,
+            values=[],
             width=300
         )
         self.ctrl_search.pack(pady=10)
         
+        # Propositions chargées en arrière-plan depuis la base de données
+        self._load_material_choices()
+        
         # Ajout du gestionnaire d'événements pour la molette
         self.ctrl_search._entry.bind(
             "<MouseWheel>",
-            lambda e: self._handle_mousewheel(e, self.ctrl_search, descriptions)
+            lambda e: self._handle_mousewheel(e, self.ctrl_search, self.material_suggestions)
         )
         
+        # Propositions recalculées à chaque frappe
+        self.ctrl_search._entry.bind("<KeyRelease>", self._update_material_suggestions)
+        
         # Section quantité
         quantity_frame = ctk.CTkFrame(content_frame)
         quantity_frame.pack(fill="x", padx=20, pady=10)
@@ -573,57 +910,7 @@ class MainMenu(ctk.CTk):
 
     def validate_add(self):
         """Valide l'ajout de matériel."""
-        description = self.ctrl_search.get()
-        quantity = self.ctrl_quantity.get()
-        
-        # Validation des champs
-        if not description:
-            messagebox.showerror("Erreur", "Veuillez sélectionner un matériel")
-            return
-        
-        try:
-            quantity = int(quantity)
-            if quantity <= 0:
-                messagebox.showerror("Erreur", "La quantité doit être un nombre positif")
-                return
-        except ValueError:
-            messagebox.showerror("Erreur", "La quantité doit être un nombre entier")
-            return
-        
-        # Mise à jour de la base de données
-        try:
-            # Récupération de la quantité actuelle
-            result = db.query(
-                "SELECT Quantity FROM magasin WHERE Description = ?",
-                (description,)
-            )
-            
-            if not result:
-                messagebox.showerror("Erreur", "Matériel non trouvé dans la base de données")
-                return
-            
-            current_quantity = result[0][0]
-            new_quantity = current_quantity + quantity
-            
-            # Mise à jour de la quantité
-            db.query(
-                "UPDATE magasin SET Quantity = ? WHERE Description = ?",
-                (new_quantity, description)
-            )
-            
-            # Message de succès
-            messagebox.showinfo(
-                "Succès", 
-                f"Ajout de {quantity} unité(s) de {description}\nNouveau stock : {new_quantity}"
-            )
-            
-            # Réinitialisation des champs
-            self.ctrl_quantity.delete(0, "end")
-            self.ctrl_search.set("")
-            self.ctrl_search.focus()
-            
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la mise à jour : {str(e)}")
+        self._apply_movement_from_form(1, "Ajout")
 
     def on_withdraw(self):
         """Gère l'ouverture de l'onglet Retirer du matériel."""
@@ -642,14 +929,6 @@ class MainMenu(ctk.CTk):
         content_frame = ctk.CTkFrame(on_withdraw_tab, fg_color="transparent")
         content_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Récupération des descriptions depuis la base de données
-        try:
-            descriptions = db.query("SELECT Description FROM magasin ORDER BY Description")
-            descriptions = [desc[0] for desc in descriptions if desc[0]]  # Extraction des descriptions non vides
-        except Exception as e:
-            print(f"Erreur lors de la récupération des descriptions : {str(e)}")
-            descriptions = []
-        
         # Section recherche de matériel
         search_frame = ctk.CTkFrame(content_frame)
         search_frame.pack(fill="x", padx=20, pady=10)
@@ -660,17 +939,23 @@ class MainMenu(ctk.CTk):
         
         self.ctrl_search = ctk.CTkComboBox(
             search_frame, 
-            values=descriptions,
+            values=[],
             width=300
         )
         self.ctrl_search.pack(pady=10)
         
+        # Propositions chargées en arrière-plan depuis la base de données
+        self._load_material_choices()
+        
         # Ajout du gestionnaire d'événements pour la molette
         self.ctrl_search._entry.bind(
             "<MouseWheel>",
-            lambda e: self._handle_mousewheel(e, self.ctrl_search, descriptions)
+            lambda e: self._handle_mousewheel(e, self.ctrl_search, self.material_suggestions)
         )
         
+        # Propositions recalculées à chaque frappe
+        self.ctrl_search._entry.bind("<KeyRelease>", self._update_material_suggestions)
+        
         # Section quantité
         quantity_frame = ctk.CTkFrame(content_frame)
         quantity_frame.pack(fill="x", padx=20, pady=10)
@@ -682,6 +967,22 @@ class MainMenu(ctk.CTk):
         self.ctrl_quantity = ctk.CTkEntry(quantity_frame, width=100)
         self.ctrl_quantity.pack(pady=10)
         
+        # Section avion (attribution facultative du retrait)
+        plane_frame = ctk.CTkFrame(content_frame)
+        plane_frame.pack(fill="x", padx=20, pady=10)
+        
+        self.label_withdraw_plane = ctk.CTkLabel(plane_frame, text="Avion (facultatif)")
+        self.label_withdraw_plane.pack(pady=(10,0))
+        
+        self.ctrl_withdraw_plane = ctk.CTkComboBox(
+            plane_frame,
+            values=[""],
+            width=200
+        )
+        self.ctrl_withdraw_plane.set("")
+        self.ctrl_withdraw_plane.pack(pady=10)
+        self._load_plane_choices()
+        
         # Bouton de validation
         self.btn_validate = ctk.CTkButton(
             content_frame,
@@ -703,66 +1004,7 @@ class MainMenu(ctk.CTk):
 
     def validate_withdraw(self):
         """Valide le retrait de matériel."""
-        description = self.ctrl_search.get()
-        quantity = self.ctrl_quantity.get()
-        
-        # Validation des champs
-        if not description:
-            messagebox.showerror("Erreur", "Veuillez sélectionner un matériel")
-            return
-        
-        try:
-            quantity = int(quantity)
-            if quantity <= 0:
-                messagebox.showerror("Erreur", "La quantité doit être un nombre positif")
-                return
-        except ValueError:
-            messagebox.showerror("Erreur", "La quantité doit être un nombre entier")
-            return
-        
-        # Mise à jour de la base de données
-        try:
-            # Récupération de la quantité actuelle
-            result = db.query(
-                "SELECT Quantity FROM magasin WHERE Description = ?",
-                (description,)
-            )
-            
-            if not result:
-                messagebox.showerror("Erreur", "Matériel non trouvé dans la base de données")
-                return
-            
-            current_quantity = result[0][0]
-            
-            # Vérification qu'il y a assez de stock
-            if current_quantity < quantity:
-                messagebox.showerror(
-                    "Erreur", 
-                    f"Stock insuffisant\nQuantité disponible : {current_quantity}"
-                )
-                return
-            
-            new_quantity = current_quantity - quantity
-            
-            # Mise à jour de la quantité
-            db.query(
-                "UPDATE magasin SET Quantity = ? WHERE Description = ?",
-                (new_quantity, description)
-            )
-            
-            # Message de succès
-            messagebox.showinfo(
-                "Succès", 
-                f"Retrait de {quantity} unité(s) de {description}\nNouveau stock : {new_quantity}"
-            )
-            
-            # Réinitialisation des champs
-            self.ctrl_quantity.delete(0, "end")
-            self.ctrl_search.set("")
-            self.ctrl_search.focus()
-            
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la mise à jour : {str(e)}")
+        self._apply_movement_from_form(-1, "Retrait", self.ctrl_withdraw_plane.get().strip())
 
     def on_search(self):
         # Nouvel onglet ou focus sur l'ancien
@@ -776,14 +1018,136 @@ class MainMenu(ctk.CTk):
         # Création de l'en-tête
         self.create_tab_header(on_search_tab, "Rechercher du matériel", "Rechercher du matériel")
         
+        # Frame pour le contenu
+        content_frame = ctk.CTkFrame(on_search_tab, fg_color="transparent")
+        content_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # Champ de recherche et nombre de résultats
+        search_frame = ctk.CTkFrame(content_frame)
+        search_frame.pack(fill="x", padx=20, pady=10)
+        
+        self.ctrl_search_catalog = ctk.CTkEntry(
+            search_frame,
+            placeholder_text="Description, PN, fournisseur...",
+            width=400
+        )
+        self.ctrl_search_catalog.pack(side="left", padx=10, pady=10)
+        
+        self.label_search_count = ctk.CTkLabel(search_frame, text="", text_color=infos.text_color)
+        self.label_search_count.pack(side="left", padx=10)
+        
+        # Tableau des résultats : seules les lignes visibles sont dessinées
+        self.search_grid = VirtualGrid(
+            content_frame,
+            columns=(
+                ("Description", "Description", 320),
+                ("PN", "PN", 160),
+                ("Rayonnage", "Rayonnage", 150),
+                ("Etagere", "Étagère", 90),
+                ("Quantity", "Quantité", 80),
+                ("Minimum", "Minimum", 80)
+            ),
+            on_select=self._show_search_detail,
+            executor=self.executor
+        )
+        self.search_grid.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # Détail du matériel sélectionné
+        self.label_search_detail = ctk.CTkLabel(
+            content_frame, text="", justify="left", text_color=infos.text_color
+        )
+        self.label_search_detail.pack(fill="x", padx=20, pady=(0, 10))
+        
+        # Recherche lancée après une courte pause dans la frappe
+        self._search_job = None
+        self.ctrl_search_catalog.bind("<KeyRelease>", self._schedule_search)
+        self.ctrl_search_catalog.bind("<Return>", lambda e: self._run_search())
+        
+        # Tout le catalogue au premier affichage
+        self._run_search()
+        self.ctrl_search_catalog.focus()
+        
         # Focus sur le Nouvel onglet
         self.tab_control.set("Rechercher du matériel")
     
+    def _schedule_search(self, event=None) -> None:
+        """Relance le minuteur de recherche à chaque frappe (anti-rebond)."""
+        if event is not None and event.keysym == "Return":
+            return
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(infos.SEARCH_DEBOUNCE_MS, self._run_search)
+    
+    def _run_search(self) -> None:
+        """Affiche dans le tableau les résultats du terme saisi."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        
+        term = self.ctrl_search_catalog.get().strip()
+        
+        def fetch_page(sort_key, descending, cursor, page_size, offset):
+            try:
+                return db.get_material_page(
+                    term, None, page_size, sort_key, descending, cursor, offset
+                )
+            except ValueError as e:
+                print(f"Erreur de validation : {str(e)}")
+                return [], None
+        
+        def show_results(total):
+            self.label_search_count.configure(text=f"{total} résultat(s)")
+            self.label_search_detail.configure(text="")
+            self.search_grid.set_source(fetch_page, total)
+        
+        # Seul le comptage du dernier terme saisi est affiché
+        self.label_search_count.configure(text="Recherche...")
+        self.executor.submit(db.count_material, term, on_done=show_results, key="recherche")
+    
+    def _show_search_detail(self, record) -> None:
+        """Affiche le détail du matériel sélectionné dans le tableau.
+        
+        Args:
+            record: Ligne MaterialRecord sélectionnée
+        """
+        self.label_search_detail.configure(text=f"{record.description}...")
+        self.executor.submit(
+            db.get_material_planes, record.id_stuff,
+            on_done=lambda planes: self._render_search_detail(record, planes),
+            key="detail_recherche"
+        )
+    
+    def _render_search_detail(self, record, planes: List[str]) -> None:
+        """Écrit le détail d'un matériel et des avions qui l'utilisent.
+        
+        Args:
+            record: Ligne MaterialRecord sélectionnée
+            planes: Noms des avions associés au matériel
+        """
+        if not self.label_search_detail.winfo_exists():
+            return
+        maintenance = [
+            label for label, flag in (("50H", record.h50), ("100H", record.h100), ("200H", record.h200))
+            if flag
+        ]
+        self.label_search_detail.configure(text=(
+            f"{record.description} (PN {record.pn or '-'})\n"
+            f"Emplacement : {record.rayonnage} / {record.etagere} - "
+            f"Stock : {record.quantity} (minimum {record.minimum})\n"
+            f"Fournisseur : {record.providers or '-'} - "
+            f"Avions : {', '.join(planes) or '-'} - "
+            f"Maintenance : {', '.join(maintenance) or '-'}"
+        ))
+    
     def on_stats(self):
         #Gère l'ouverture de l'onglet Statistiques.
         if "Statistiques" in self.tabs:
             self.tab_control.set("Statistiques")
             return
+        
+        # Matplotlib et la messagerie ne sont chargés qu'à l'ouverture de l'onglet
+        from ressources.charts import CachedPieChart
+        from ressources.send_mail import global_email_manager
             
         on_stats_tab = self.tab_control.add("Statistiques")
         self.tabs["Statistiques"] = on_stats_tab
@@ -798,6 +1162,15 @@ class MainMenu(ctk.CTk):
         # Frame pour les graphiques
         self.stats_frame = ctk.CTkFrame(main_frame)
         self.stats_frame.pack(fill="x", padx=20, pady=10)
+
+        # Graphiques créés une fois, puis mis à jour sur place
+        self._close_stats_charts()
+        self.stats_charts = (
+            CachedPieChart(self.stats_frame),
+            CachedPieChart(self.stats_frame)
+        )
+        for chart in self.stats_charts:
+            chart.widget.pack(pady=10)
         
         # Bouton de rafraîchissement
         refresh_btn = ctk.CTkButton(
@@ -822,7 +1195,7 @@ class MainMenu(ctk.CTk):
         
         # Description
         description = """Le rapport contiendra les diagrammes suivants :
-        1. Proportion des types de pièces
+        1. Proportion des pièces par fournisseur
         2. Ratio de disponibilité des pièces
         3. Consommation de pièces par avion"""
         
@@ -879,58 +1252,120 @@ class MainMenu(ctk.CTk):
         # Focus sur le nouvel onglet
         self.tab_control.set("Statistiques")
     
-    def create_pie_chart(self, data: Dict[str, Union[float, int]], title: str) -> FigureCanvasTkAgg:
-        """Crée un graphique en camembert."""
-        # Augmentation de la taille de 6x4 à 12x8
-        fig, ax = plt.subplots(figsize=(12, 8))
-        labels = list(data.keys())
-        values = list(data.values())
-        
-        if sum(values) > 0:  # Vérifier qu'il y a des données à afficher
-            # Augmenter la taille de la police pour le titre et les labels
-            ax.pie(values, labels=labels, autopct='%1.1f%%', textprops={'fontsize': 12})
-            ax.set_title(title, pad=20, fontsize=14)
-        else:
-            ax.text(0.5, 0.5, "Pas de données", ha='center', va='center', fontsize=14)
-        
-        canvas = FigureCanvasTkAgg(fig, master=self.stats_frame)
-        return canvas
+    def _close_stats_charts(self) -> None:
+        """Libère les graphiques de l'onglet Statistiques."""
+        for chart in getattr(self, "stats_charts", ()):
+            chart.close()
+        self.stats_charts = ()
 
     def update_statistics(self):
-        """Met à jour les graphiques statistiques."""
-        # Nettoyer les anciens graphiques
-        for widget in self.stats_frame.winfo_children():
-            widget.destroy()
+        """Lance la lecture des statistiques en arrière-plan.
+        
+        Les tables de synthèse (stats_plane_cost, stats_magasin), tenues à
+        jour par triggers, sont lues en une requête chacune.
+        """
+        # Un rafraîchissement plus récent rend le précédent obsolète
+        self.executor.submit(
+            lambda: (db.get_cost_stats_by_plane(), db.get_availability_ratio()),
+            on_done=self._show_statistics,
+            key="statistiques"
+        )
 
-        # Récupérer les données
-        cost_stats = db.get_cost_stats_by_plane()
-        availability_stats = db.get_availability_ratio()
+    def _show_statistics(self, stats: Tuple[Dict[str, float], Dict[str, int]]) -> None:
+        """Met à jour les graphiques statistiques.
+        
+        Args:
+            stats: Coût moyen par avion et ratio de disponibilité
+        """
+        if not self.stats_charts or not self.stats_frame.winfo_exists():
+            return
+        
+        cost_stats, availability_stats = stats
+        cost_chart, availability_chart = self.stats_charts
+        
+        # Avions dont aucune pièce n'a de coût renseigné (moyenne NULL)
+        cost_stats = {plane: cost for plane, cost in cost_stats.items() if cost is not None}
 
-        # Créer les graphiques
-        cost_canvas = self.create_pie_chart(
-            cost_stats, 
-            "Coût moyen des pièces par avion"
-        )
-        availability_canvas = self.create_pie_chart(
-            availability_stats, 
-            "Ratio de disponibilité des pièces"
+        # Seuls les graphiques dont les données ont changé sont redessinés
+        cost_chart.update(cost_stats, "Coût moyen des pièces par avion")
+        availability_chart.update(availability_stats, "Ratio de disponibilité des pièces")
+
+    def send_stats_report(self):
+        """Place le rapport statistique dans la file d'envoi des emails."""
+        from ressources.send_mail import envoyer_rapport_statistiques
+        
+        destinataire = self.email_entry.get().strip()
+        if not destinataire:
+            messagebox.showerror("Erreur", "Veuillez saisir une adresse email")
+            return
+        
+        # Inscription dans la file (une écriture) hors du thread de l'interface
+        self.executor.submit(
+            envoyer_rapport_statistiques,
+            destinataire,
+            on_done=self._on_report_queued
         )
 
-        # Afficher les graphiques
-        cost_canvas.get_tk_widget().pack(pady=10)
-        availability_canvas.get_tk_widget().pack(pady=10)
+    def _on_report_queued(self, mail_id: Optional[int]) -> None:
+        """Suit l'envoi d'un rapport qui vient d'être mis en file.
+        
+        Args:
+            mail_id: ID de l'email dans la file, None en cas d'erreur
+        """
+        if mail_id is None:
+            messagebox.showerror("Échec", "Impossible de préparer l'envoi du mail.")
+            return
+        
+        if hasattr(self, "last_send_label") and self.last_send_label.winfo_exists():
+            self.last_send_label.configure(text="Envoi en cours...")
+        self._outbox_mails[mail_id] = 0
+        if getattr(self, "_outbox_poll_id", None) is None:
+            self._poll_outbox()
 
-        # Rafraîchir les graphiques
-        cost_canvas.draw()
-        availability_canvas.draw()
+    def _poll_outbox(self) -> None:
+        """Relit en arrière-plan l'état des emails mis en file par ce poste."""
+        from ressources.send_mail import global_email_outbox
+        
+        self._outbox_poll_id = None
+        self.executor.submit(
+            global_email_outbox.statuses,
+            list(self._outbox_mails),
+            on_done=self._show_outbox_statuses,
+            key="outbox"
+        )
 
-    def send_stats_report(self):
-        """Envoie le rapport statistique par email."""
-        try:
-            destinataire = self.email_entry.get()
-            global_email_manager.envoyer_rapport_statistiques(destinataire)
-        except Exception as e:
-            print(f"Erreur lors de l'envoi du rapport : {str(e)}")
+    def _show_outbox_statuses(self, statuses: Dict[int, tuple]) -> None:
+        """Affiche le résultat des emails mis en file.
+        
+        Args:
+            statuses: ID mail -> (statut, tentatives, destinataire, erreur)
+        """
+        from ressources.send_mail import global_email_manager
+        
+        for mail_id, (status, attempts, destinataire, error) in statuses.items():
+            if mail_id not in self._outbox_mails:
+                continue
+            label_exists = hasattr(self, "last_send_label") and self.last_send_label.winfo_exists()
+            if status == "sent":
+                del self._outbox_mails[mail_id]
+                if label_exists:
+                    last_send_date = global_email_manager.get_last_send_date()
+                    self.last_send_label.configure(text=f"Dernier envoi : {last_send_date}")
+                messagebox.showinfo("Succès", f"Le mail a été envoyé à {destinataire}.")
+            elif status == "failed":
+                del self._outbox_mails[mail_id]
+                if label_exists:
+                    self.last_send_label.configure(text="Échec de l'envoi")
+                messagebox.showerror("Échec", f"Échec de l'envoi du mail à {destinataire} :\n{error}")
+            elif attempts > self._outbox_mails[mail_id]:
+                # Nouvelle tentative échouée depuis la dernière consultation
+                self._outbox_mails[mail_id] = attempts
+                if label_exists:
+                    self.last_send_label.configure(text="Échec de l'envoi, nouvel essai prévu")
+        
+        # Consultation tant que des emails restent à envoyer
+        if self._outbox_mails and getattr(self, "_outbox_poll_id", None) is None:
+            self._outbox_poll_id = self.after(infos.OUTBOX_POLL_MS, self._poll_outbox)
 
     def on_users(self):
         # Vérification des droits admin
@@ -1021,16 +1456,25 @@ class MainMenu(ctk.CTk):
         isAdmin = True if self.ctrl_isAdmin.get() == 1 else False
         
         # Utilisation de la fonction new_user de bdd_users
-        success, message = bdd_users.new_user(
+        self.executor.submit(
+            bdd_users.new_user,
             username=username,
             password=password,
             name=name,
             firstname=firstname,
             email=email,
             tel=tel,
-            isAdmin=isAdmin
+            isAdmin=isAdmin,
+            on_done=self._on_account_created
         )
+    
+    def _on_account_created(self, result: Tuple[bool, str]) -> None:
+        """Affiche le résultat de la création d'un compte.
         
+        Args:
+            result: Résultat de bdd_users.new_user
+        """
+        success, message = result
         if success:
             messagebox.showinfo("Confirmation", message)
             # Réinitialisation des champs
@@ -1241,6 +1685,11 @@ class MainMenu(ctk.CTk):
         if tab_info['method']:
             self.closed_tabs_history.insert(0, tab_info)  # Ajout en début de liste
         
+        # Libération des graphiques statistiques
+        if tab_name == "Statistiques":
+            self.executor.cancel("statistiques")
+            self._close_stats_charts()
+
         # Suppression de l'onglet
         self.tab_control.delete(tab_name)
         del self.tabs[tab_name]
@@ -1270,11 +1719,43 @@ class MainMenu(ctk.CTk):
         # Changement de l'onglet actif vers Menu Principal
         self.tab_control.set("Menu Principal")
     
+    def _set_busy(self, busy: bool) -> None:
+        """Affiche le curseur d'attente pendant les accès à la base.
+        
+        Args:
+            busy: True tant que des tâches sont en cours
+        """
+        self.configure(cursor="watch" if busy else "")
+    
     def on_close(self):
         """Gère la fermeture de l'application."""
+        # Arrêt des tâches en arrière-plan
+        self.executor.shutdown()
+
+        # Arrêt de l'envoi des emails (les emails non partis restent en file)
+        if getattr(self, "_outbox_poll_id", None):
+            self.after_cancel(self._outbox_poll_id)
+        send_mail = sys.modules.get("ressources.send_mail")
+        if send_mail is not None:
+            send_mail.global_email_outbox.stop()
+
+        # Libération des graphiques statistiques
+        self._close_stats_charts()
+        
         # Destruction sécurisée de la fenêtre
         self._safe_destroy()
-        
+
+        # Instantané du catalogue pour le prochain démarrage (s'il a été chargé)
+        catalog = sys.modules.get("ressources.catalog")
+        if catalog is not None:
+            catalog.catalog.save_snapshot()
+
+        # Fermeture des connexions du pool
+        pool.close_all()
+
+        if query_profiler.enabled:
+            print(query_profiler.report())
+
         # Fermeture de l'application
         self.quit()
     
@@ -1283,7 +1764,7 @@ class MainMenu(ctk.CTk):
         try:
             # Arrêt de la musique
             if hasattr(self, 'music_playing') and self.music_playing:
-                pygame.mixer.music.stop()
+                get_mixer().music.stop()
             self.destroy()
         except Exception as e:
             print(f"Erreur lors de la destruction de la fenêtre : {e}")
@@ -1330,7 +1811,19 @@ class MainMenu(ctk.CTk):
             messagebox.showerror("Erreur", "Veuillez entrer un nom d'avion")
             return
             
-        success, message = manip_bd.ajout_plane(plane_name)
+        self.executor.submit(
+            manip_bd.ajout_plane, plane_name,
+            on_done=lambda result: self._on_plane_added(plane_name, result)
+        )
+    
+    def _on_plane_added(self, plane_name: str, result: Tuple[bool, str]) -> None:
+        """Affiche le résultat de l'ajout d'un avion.
+        
+        Args:
+            plane_name: Nom de l'avion
+            result: Résultat de manip_bd.ajout_plane
+        """
+        success, message = result
         if success:
             messagebox.showinfo("Succès", f"L'avion '{plane_name}' a été ajouté avec succès")
             self.ctrl_plane.delete(0, "end")  # Efface le champ
@@ -1608,36 +2101,73 @@ class MainMenu(ctk.CTk):
         return [plane for plane, checkbox in self.plane_checkboxes.items() 
                 if checkbox.get()]
 
-    def _insert_material(self, numeric_values: Dict[str, float]) -> Tuple[bool, str]:
-        """Insère le nouveau matériel dans la base de données.
+    def _collect_material_form(self, numeric_values: Dict[str, float]) -> Dict[str, Any]:
+        """Lit le formulaire du nouveau matériel (dans le thread de l'interface).
         
         Args:
             numeric_values: Dictionnaire des valeurs numériques validées
             
+        Returns:
+            Dict[str, Any]: Arguments de manip_bd.ajouter_materiel, avec la
+            liste des avions sélectionnés sous la clé plane_names
+        """
+        # Génération automatique du numéro
+        current_date = datetime.now()
+        year_last_two = str(current_date.year)[-2:]
+        week_number = current_date.strftime("%V")  # Numéro de la semaine sur 2 chiffres
+        numero = f"{year_last_two}{week_number}"
+        
+        # Préparation des données
+        maintenance = {
+            "50h": int(self.ctrl_50h.get()),
+            "100h": int(self.ctrl_100h.get()),
+            "200h": int(self.ctrl_200h.get())
+        }
+        
+        # Calcul du stock_estimate_ht (coût total)
+        stock_estimate_ht = numeric_values["Coût"] * int(numeric_values["Quantité"])
+        
+        # Vérification et préparation du champ order
+        order = self.ctrl_order.get().strip()
+        if not order:  # Si vide, on met 0 par défaut
+            order = "0"
+        
+        return {
+            "numero": numero,
+            "rayonnage": self.ctrl_rayonnage.get().strip(),
+            "etagere": self.ctrl_etagere.get().strip(),
+            "description": self.ctrl_description.get().strip(),
+            "providers": self.ctrl_providers.get().strip(),
+            "pn": self.ctrl_pn.get().strip(),
+            "order": order,
+            "quantity": int(numeric_values["Quantité"]),
+            "minimum": int(numeric_values["Minimum"]),
+            "maintenance": maintenance,
+            "providers_actf": self.ctrl_providers_actf.get().strip(),
+            "cost_estimate": numeric_values["Coût"],
+            "stock_estimate_ht": stock_estimate_ht,
+            "remarks": self.ctrl_remarks.get().strip(),
+            "plane_names": self._get_selected_planes()
+        }
+
+    @staticmethod
+    def _insert_material(form: Dict[str, Any]) -> Tuple[bool, str]:
+        """Insère le nouveau matériel dans la base de données.
+        
+        Exécutée dans le thread de travail : ne lit aucun widget.
+        
+        Args:
+            form: Valeurs lues par _collect_material_form
+            
         Returns:
             Tuple[bool, str]: (True si succès, message d'erreur sinon)
         """
         try:
-            # Génération automatique du numéro
-            from datetime import datetime
-            current_date = datetime.now()
-            year_last_two = str(current_date.year)[-2:]
-            week_number = current_date.strftime("%V")  # Numéro de la semaine sur 2 chiffres
-            numero = f"{year_last_two}{week_number}"
-            
-            # Préparation des données
-            maintenance = {
-                "50h": int(self.ctrl_50h.get()),
-                "100h": int(self.ctrl_100h.get()),
-                "200h": int(self.ctrl_200h.get())
-            }
-            
-            # Récupération des IDs des avions sélectionnés
-            selected_planes = self._get_selected_planes()
+            values = dict(form)
             plane_ids = []
             
             # Conversion des noms d'avions en IDs
-            for plane_name in selected_planes:
+            for plane_name in values.pop("plane_names"):
                 try:
                     result = db.query('SELECT "ID plane" FROM planes WHERE name = ?', (plane_name,))
                     if result:
@@ -1645,40 +2175,14 @@ class MainMenu(ctk.CTk):
                 except Exception as e:
                     print(f"Erreur lors de la récupération de l'ID de l'avion {plane_name}: {str(e)}")
             
-            # Calcul du stock_estimate_ht (coût total)
-            stock_estimate_ht = numeric_values["Coût"] * int(numeric_values["Quantité"])
-            
-            # Vérification et préparation du champ order
-            order = self.ctrl_order.get().strip()
-            if not order:  # Si vide, on met 0 par défaut
-                order = "0"
-            
             # Appel de la fonction d'ajout
-            success, message = manip_bd.ajouter_materiel(
-                numero=numero,
-                rayonnage=self.ctrl_rayonnage.get().strip(),
-                etagere=self.ctrl_etagere.get().strip(),
-                description=self.ctrl_description.get().strip(),
-                providers=self.ctrl_providers.get().strip(),
-                pn=self.ctrl_pn.get().strip(),
-                order=order,
-                quantity=int(numeric_values["Quantité"]),
-                minimum=int(numeric_values["Minimum"]),
-                maintenance=maintenance,
-                providers_actf=self.ctrl_providers_actf.get().strip(),
-                cost_estimate=numeric_values["Coût"],
-                stock_estimate_ht=stock_estimate_ht,
-                remarks=self.ctrl_remarks.get().strip(),
-                plane_ids=plane_ids
-            )
-            
-            return success, message
+            return manip_bd.ajouter_materiel(plane_ids=plane_ids, **values)
             
         except Exception as e:
             return False, f"Erreur inattendue : {str(e)}"
 
     def validate_new_material(self):
-        """Valide et enregistre le nouveau matériel."""
+        """Valide le formulaire et enregistre le nouveau matériel en arrière-plan."""
         # Validation des champs obligatoires
         valid, message = self._validate_required_fields()
         if not valid:
@@ -1692,14 +2196,64 @@ class MainMenu(ctk.CTk):
             return
             
         # Insertion dans la base de données
-        success, message = self._insert_material(numeric_values)
+        self.executor.submit(
+            self._insert_material,
+            self._collect_material_form(numeric_values),
+            on_done=self._on_material_inserted,
+            key="nouveau_materiel"
+        )
+
+    def _on_material_inserted(self, result: Tuple[bool, str]) -> None:
+        """Affiche le résultat de l'insertion et ferme l'onglet si elle a réussi.
+        
+        Args:
+            result: Résultat de _insert_material
+        """
+        success, message = result
         if success:
             messagebox.showinfo("Succès", message)
-            self.tab_control.delete("Nouveau matériel")
-            del self.tabs["Nouveau matériel"]
+            if "Nouveau matériel" in self.tabs:
+                self.tab_control.delete("Nouveau matériel")
+                del self.tabs["Nouveau matériel"]
         else:
             messagebox.showerror("Erreur", message)
 
+    @staticmethod
+    def _update_password(username: str, old_password: str, new_password: str) -> Tuple[bool, str]:
+        """Vérifie l'ancien mot de passe puis enregistre le nouveau.
+        
+        Exécutée dans le thread de travail.
+        
+        Args:
+            username: Nom d'utilisateur
+            old_password: Mot de passe actuel
+            new_password: Nouveau mot de passe
+            
+        Returns:
+            Tuple[bool, str]: (True si succès, message à afficher)
+        """
+        # Vérification de l'ancien mot de passe
+        success, _, _ = bdd_users.check_co(username, old_password)
+        if not success:
+            return False, "Ancien mot de passe incorrect"
+        
+        # Mise à jour du mot de passe dans la base de données
+        try:
+            # Hash du nouveau mot de passe
+            new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+
+            # Mise à jour du mot de passe
+            with pool.connection() as conn:
+                conn.execute("""
+                    UPDATE users
+                    SET password = ?
+                    WHERE username = ?
+                """, (new_password_hash, username))
+            return True, "Mot de passe modifié avec succès"
+            
+        except Exception as e:
+            return False, f"Erreur lors de la modification du mot de passe : {str(e)}"
+
     def change_password(self):
         """Gère le changement de mot de passe."""
         old_password = self.old_password_entry.get()
@@ -1716,39 +2270,29 @@ class MainMenu(ctk.CTk):
             messagebox.showerror("Erreur", "Les nouveaux mots de passe ne correspondent pas")
             return
         
-        # Vérification de l'ancien mot de passe
-        success, message, _ = bdd_users.check_co(self.username, old_password)
+        self.executor.submit(
+            self._update_password, self.username, old_password, new_password,
+            on_done=self._on_password_changed,
+            key="mot_de_passe"
+        )
+
+    def _on_password_changed(self, result: Tuple[bool, str]) -> None:
+        """Affiche le résultat du changement de mot de passe.
+        
+        Args:
+            result: Résultat de _update_password
+        """
+        success, message = result
         if not success:
-            messagebox.showerror("Erreur", "Ancien mot de passe incorrect")
+            messagebox.showerror("Erreur", message)
             return
         
-        # Mise à jour du mot de passe dans la base de données
-        try:
-            conn = sqlite3.connect(os.path.join(infos.PATH, "bdd_all.db"))
-            cursor = conn.cursor()
-            
-            # Hash du nouveau mot de passe
-            new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
-            
-            # Mise à jour du mot de passe
-            cursor.execute("""
-                UPDATE users 
-                SET password = ? 
-                WHERE username = ?
-            """, (new_password_hash, self.username))
-            
-            conn.commit()
-            conn.close()
-            
-            # Réinitialisation des champs
-            self.old_password_entry.delete(0, "end")
-            self.new_password_entry.delete(0, "end")
-            self.confirm_password_entry.delete(0, "end")
-            
-            messagebox.showinfo("Succès", "Mot de passe modifié avec succès")
-            
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la modification du mot de passe : {str(e)}")
+        # Réinitialisation des champs
+        self.old_password_entry.delete(0, "end")
+        self.new_password_entry.delete(0, "end")
+        self.confirm_password_entry.delete(0, "end")
+        
+        messagebox.showinfo("Succès", message)
 
     def _handle_mousewheel(self, event, combobox, values):
         """Gère le défilement de la molette pour les combobox.
@@ -1786,15 +2330,32 @@ class MainMenu(ctk.CTk):
             return
             
         try:
+            mixer = get_mixer()
+            if not self.music_loaded:
+                mixer.music.load(self.music_path)
+                mixer.music.set_volume(0.5)
+                self.music_loaded = True
+            
             if self.music_playing:
-                pygame.mixer.music.pause()
+                mixer.music.pause()
                 self.btn_music.configure(text="▶")
             else:
-                pygame.mixer.music.unpause() if pygame.mixer.music.get_pos() > 0 else pygame.mixer.music.play(-1)
+                mixer.music.unpause() if mixer.music.get_pos() > 0 else mixer.music.play(-1)
                 self.btn_music.configure(text="⏸")
             self.music_playing = not self.music_playing
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de la lecture de la musique : {str(e)}")
 
 if __name__ == "__main__":
-    app = SignUpFrame()
\ No newline at end of file
+    # Processus de rendu des rapports dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
+    profiler.mark("imports")
+    # Table des utilisateurs et comptes par défaut si besoin
+    bdd_users.init_db()
+    # Création des tables du magasin (journal, index de recherche) si besoin
+    init_bd.init_db()
+    profiler.mark("initialisation de la base")
+    # Le catalogue et la file d'envoi sont préparés après le premier affichage
+    app = SignUpFrame()
+    if profiler.active:
+        sys.exit(0 if profiler.within_budget() else 1)
\ No newline at end of file
@@ -4,10 +4,11 @@ Ce module gère les préférences utilisateur, les thèmes et les styles de l'in
 """
 
 import os
-import csv
 import hashlib
 from typing import Dict, Any
 
+from ressources.config_store import config
+
 
 # Chemin absolu du dossier ressources
 PATH = os.path.dirname(os.path.abspath(__file__))
@@ -15,8 +16,8 @@ PATH = os.path.dirname(os.path.abspath(__file__))
 # Chemin absolu de l'icone de l'application
 ICON_PATH = os.path.join(PATH, "final_icon.ico")
 
-# Fichier de configuration
-CONFIG_FILE = os.path.join(PATH, "config.csv")
+# Fichier de configuration (lu et écrit par config_store)
+CONFIG_FILE = config.path
 
 # Nom de l'application
 NAME_MAIN = "Méca'stuff"
@@ -33,6 +34,12 @@ BOTTOM_BUTTON_WIDTH = 150
 SMALL_BUTTON_WIDTH = 30
 ICON_BUTTON_SIZE = int(SMALL_BUTTON_WIDTH * 1.4)
 
+# Délai d'attente après la dernière frappe avant de lancer une recherche (ms)
+SEARCH_DEBOUNCE_MS = 250
+
+# Intervalle de consultation des résultats d'envoi des emails (ms)
+OUTBOX_POLL_MS = 500
+
 # Espacements
 DEFAULT_PAD = 20
 SMALL_PAD = 10
@@ -55,39 +62,23 @@ last_date = ''
 
 
 def load_infos() -> None:
-    """Charge les préférences depuis le fichier CSV."""
+    """Charge les préférences depuis le magasin de configuration."""
     global last_plane, last_material, last_quantity, last_date
     
-    try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    last_plane = row.get('last_plane', '')
-                    last_material = row.get('last_material', '')
-                    last_quantity = row.get('last_quantity', '')
-                    last_date = row.get('last_date', '')
-                    
-    except Exception as e:
-        print(f"Erreur lors du chargement des préférences : {e}")
+    last_plane = config.get('last_plane', '')
+    last_material = config.get('last_material', '')
+    last_quantity = config.get('last_quantity', '')
+    last_date = config.get('last_date', '')
 
 
 def save_infos() -> None:
-    """Sauvegarde les préférences dans un fichier CSV."""
-    try:
-        with open(CONFIG_FILE, 'w', newline='') as file:
-            fieldnames = ['last_plane', 'last_material', 'last_quantity', 'last_date', 'theme']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerow({
-                'last_plane': last_plane,
-                'last_material': last_material,
-                'last_quantity': last_quantity,
-                'last_date': last_date,
-                'theme': 'dark'
-            })
-    except Exception as e:
-        print(f"Erreur lors de la sauvegarde des préférences : {e}")
+    """Sauvegarde les préférences (écriture différée et regroupée)."""
+    config.update({
+        'last_plane': last_plane,
+        'last_material': last_material,
+        'last_quantity': last_quantity,
+        'last_date': last_date
+    })
 
 
 def update_colors(theme: Dict[str, str]) -> None:
@@ -10,6 +10,7 @@ import os
 import re
 from ressources import allinfos as infos
 from ressources.request_bd import db
+from ressources.pool_bd import pool
 from typing import Tuple, Dict, Any, Optional, List
 
 # Constantes de sécurité
@@ -62,12 +63,9 @@ def init_db() -> bool:
         assert os.path.exists(os.path.dirname(db_path)), "Le répertoire de la base de données n'existe pas"
         assert os.access(os.path.dirname(db_path), os.W_OK), "Le répertoire n'est pas accessible en écriture"
         
-        conn = sqlite3.connect(db_path, timeout=30)  # Timeout de 30 secondes
+        conn = pool.acquire(db_path)
         cursor = conn.cursor()
-        
-        # Activation des clés étrangères
-        cursor.execute("PRAGMA foreign_keys = ON")
-        
+
         # Création de la table users si elle n'existe pas
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -114,15 +112,17 @@ def init_db() -> bool:
                 ''', (username, password_hash, name, firstname, email, tel, isAdmin))
         
         conn.commit()
-        conn.close()
         return True
-        
+
     except (AssertionError, ValueError) as e:
         print(f"Erreur de validation : {str(e)}")
         return False
     except Exception as e:
         print(f"Erreur lors de l'initialisation de la base de données : {str(e)}")
         return False
+    finally:
+        if 'conn' in locals() and conn:
+            pool.release(conn, db_path)
 
 def new_user(
     username: str,
@@ -173,26 +173,22 @@ def new_user(
         
         # Connexion à la base de données
         db_path = os.path.join(infos.PATH, "bdd_all.db")
-        conn = sqlite3.connect(db_path, timeout=30)
-        cursor = conn.cursor()
-        
-        # Vérification du nombre d'utilisateurs
-        cursor.execute("SELECT COUNT(*) FROM users")
-        if cursor.fetchone()[0] >= MAX_USERS:
-            conn.close()
-            return False, f"Nombre maximum d'utilisateurs atteint ({MAX_USERS})"
-        
-        # Insertion du nouvel utilisateur
-        cursor.execute('''
-            INSERT INTO users (
-                username, password, name, firstname, email, tel, isAdmin
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (username, password_hash, name, firstname, email, tel, isAdmin))
-        
-        conn.commit()
-        conn.close()
-        
+        with pool.connection(db_path) as conn:
+            cursor = conn.cursor()
+
+            # Vérification du nombre d'utilisateurs
+            cursor.execute("SELECT COUNT(*) FROM users")
+            if cursor.fetchone()[0] >= MAX_USERS:
+                return False, f"Nombre maximum d'utilisateurs atteint ({MAX_USERS})"
+
+            # Insertion du nouvel utilisateur
+            cursor.execute('''
+                INSERT INTO users (
+                    username, password, name, firstname, email, tel, isAdmin
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (username, password_hash, name, firstname, email, tel, isAdmin))
+
         return True, "Utilisateur créé avec succès"
         
     except ValueError as e:
@@ -228,19 +224,19 @@ def check_co(username: str, password: str) -> Tuple[bool, str, Optional[Dict[str
         
         # Connexion à la base de données
         db_path = os.path.join(infos.PATH, "bdd_all.db")
-        conn = sqlite3.connect(db_path, timeout=30)
-        cursor = conn.cursor()
-        
-        # Vérification des identifiants
-        cursor.execute('''
-            SELECT username, name, firstname, email, tel, isAdmin
-            FROM users
-            WHERE username = ? AND password = ?
-            LIMIT 1
-        ''', (username, password_hash))
-        
-        row = cursor.fetchone()
-        
+        with pool.connection(db_path) as conn:
+            cursor = conn.cursor()
+
+            # Vérification des identifiants
+            cursor.execute('''
+                SELECT username, name, firstname, email, tel, isAdmin
+                FROM users
+                WHERE username = ? AND password = ?
+                LIMIT 1
+            ''', (username, password_hash))
+
+            row = cursor.fetchone()
+
         if row:
             # Création du dictionnaire de données utilisateur
             user_data = {
@@ -251,16 +247,11 @@ def check_co(username: str, password: str) -> Tuple[bool, str, Optional[Dict[str
                 "tel": row[4],
                 "isAdmin": bool(row[5])
             }
-            conn.close()
             return True, "Connexion réussie", user_data
         else:
-            conn.close()
             return False, "Nom d'utilisateur ou mot de passe incorrect", None
             
     except ValueError as e:
         return False, str(e), None
     except Exception as e:
         return False, f"Erreur lors de la connexion : {str(e)}", None
-
-# Initialisation de la base de données au démarrage
-init_db()
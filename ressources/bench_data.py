@@ -0,0 +1,296 @@
+"""
+Module de génération de bases de données synthétiques.
+
+Ce module produit des bases reproductibles (même graine, même contenu ;
+les dates sont relatives au jour de génération) à
+l'échelle d'un grand magasin : flotte de plusieurs centaines d'avions,
+dizaines de milliers à millions de pièces, liens pièce-avion et historique
+de mouvements de stock. Les distributions imitent l'inventaire réel :
+quelques fournisseurs et familles de pièces très fréquents et une longue
+traîne, des PN aux formats des différents fabricants, beaucoup de stocks
+nuls ou faibles, des coûts très dispersés.
+
+Les pièces passent par BulkImporter, donc par la même validation et les
+mêmes triggers (index plein texte, synthèse des statistiques) que les
+imports réels.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Ajout du répertoire parent au path Python pour permettre l'importation des modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ressources.pool_bd import pool
+from ressources.bulk_import import BulkImporter, DEFAULT_CHUNK_SIZE
+
+# Tailles prédéfinies : (pièces, avions)
+SCALES = {
+    "small": (10000, 50),
+    "medium": (100000, 200),
+    "large": (1000000, 500)
+}
+DEFAULT_SCALE = "small"
+DEFAULT_SEED = 42
+DEFAULT_LINK_DENSITY = 2.0     # Nombre moyen d'avions par pièce
+DEFAULT_MOVEMENT_RATIO = 0.5   # Mouvements d'historique par pièce
+HISTORY_DAYS = 365             # Profondeur de l'historique des mouvements
+
+# Vocabulaire, du plus fréquent au plus rare (distribution de Zipf)
+PART_NOUNS = (
+    "Joint", "Seal", "Filter", "Washer", "Bolt", "Nut", "Screw", "Rivet",
+    "O-ring", "Gasket", "Bulb", "Lamp", "Hose", "Clamp", "Bearing", "Bushing",
+    "Spring", "Cable", "Connector", "Fuse", "Relay", "Switch", "Valve", "Pump",
+    "Sensor", "Gauge", "Brake pad", "Tire", "Tube", "Spark plug", "Cotter pin",
+    "Strobe", "Antenna", "Battery", "Placard", "Alternator", "Starter",
+    "Magneto", "Windshield", "Propeller spinner"
+)
+PART_QUALIFIERS = (
+    "engine", "oil", "fuel", "brake", "cabin", "door", "air", "exhaust",
+    "landing light", "nose gear", "main gear", "wing", "flap", "aileron",
+    "elevator", "rudder", "instrument", "avionics", "baggage", "hydraulic"
+)
+PART_SPECS = ("28V", "14V", "12V/55W", "3/16", "1/4", "M6x20", "AN3", "MS28775", "x10", "kit")
+PROVIDERS = (
+    "Whelen", "Cirrus", "Aircraft Spruce", "Lycoming", "Continental",
+    "Diamond Aircraft", "Piper", "Textron", "Champion", "Cleveland",
+    "Tempest", "Parker", "Hella", "Bendix", "Garmin", "Concorde",
+    "McCauley", "Hartzell", "Superior", "Skybolt"
+)
+USERNAMES = tuple(f"mecano{i}" for i in range(1, 9))
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Poids cumulés d'une distribution de Zipf sur count éléments."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def plane_names(count: int) -> List[str]:
+    """Génère des immatriculations d'avions uniques (F-HAAA, F-HAAB...).
+
+    Args:
+        count: Nombre d'avions
+
+    Returns:
+        List[str]: Immatriculations, conformes à PLANE_NAME_PATTERN
+    """
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    if count > len(letters) ** 3:
+        raise ValueError(f"Au plus {len(letters) ** 3} avions")
+    return [
+        "F-H" + letters[i // 676] + letters[(i // 26) % 26] + letters[i % 26]
+        for i in range(count)
+    ]
+
+
+def _part_number(rng: random.Random, provider_index: int) -> str:
+    """Génère un PN au format habituel du fabricant."""
+    style = provider_index % 5
+    if style == 0:
+        return f"{rng.randint(1, 99):02d}-{rng.randint(0, 9999999):07d}-{rng.randint(0, 99):02d}"
+    if style == 1:
+        return f"{rng.randint(10000, 99999)}-{rng.randint(0, 999):03d}{rng.choice('UABC')}"
+    if style == 2:
+        return f"MS{rng.randint(20000, 29999)}-{rng.randint(1, 40)}"
+    if style == 3:
+        return f"AN{rng.randint(3, 999)}-{rng.randint(1, 20)}{rng.choice(['', 'A', 'L'])}"
+    return f"{rng.randint(1000, 9999)}-{rng.randint(0, 999):03d}"
+
+
+def synthetic_fleet_materials(
+    parts: int,
+    planes: Sequence[str],
+    link_density: float = DEFAULT_LINK_DENSITY,
+    seed: int = DEFAULT_SEED
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Génère des matériels réalistes, au format attendu par BulkImporter.
+
+    Args:
+        parts: Nombre de pièces
+        planes: Noms des avions existants
+        link_density: Nombre moyen d'avions associés à une pièce
+        seed: Graine du générateur (même graine, mêmes pièces)
+
+    Yields:
+        Tuple[int, Dict[str, Any]]: (numéro de ligne, données du matériel)
+    """
+    rng = random.Random(seed)
+    noun_weights = _zipf_weights(len(PART_NOUNS))
+    qualifier_weights = _zipf_weights(len(PART_QUALIFIERS))
+    provider_weights = _zipf_weights(len(PROVIDERS))
+    plane_weights = _zipf_weights(len(planes), 0.8) if planes else []
+    today = datetime.now()
+
+    for i in range(parts):
+        noun = rng.choices(PART_NOUNS, cum_weights=noun_weights)[0]
+        qualifier = rng.choices(PART_QUALIFIERS, cum_weights=qualifier_weights)[0]
+        description = f"{noun} {qualifier}"
+        if rng.random() < 0.4:
+            description += f" ({rng.choice(PART_SPECS)})"
+
+        provider_index = rng.choices(range(len(PROVIDERS)), cum_weights=provider_weights)[0]
+        provider = PROVIDERS[provider_index] if rng.random() > 0.05 else ""
+
+        quantity = 0 if rng.random() < 0.3 else min(int(rng.expovariate(1 / 8)) + 1, 10000)
+        cost = round(min(rng.lognormvariate(3.5, 1.3), 100000.0), 2)
+
+        links = min(len(planes), int(rng.expovariate(1 / link_density) + 0.5)) if link_density > 0 else 0
+        linked = set()
+        while len(linked) < links:
+            linked.add(rng.choices(planes, cum_weights=plane_weights)[0])
+
+        added = today - timedelta(days=rng.randint(0, 3 * 365))
+        rack = rng.choice("ABCDEFGHIJKL")
+        yield i + 2, {
+            "numero": added.strftime("%y%V"),
+            "rayonnage": rack,
+            "etagere": f"{rack}{rng.randint(0, 9)}.{rng.randint(1, 4)}",
+            "description": description,
+            "providers": provider,
+            "pn": _part_number(rng, provider_index),
+            "order": "",
+            "quantity": quantity,
+            "minimum": rng.choice((0, 0, 1, 1, 2, 5, 10)),
+            "h50": rng.random() < 0.15,
+            "h100": rng.random() < 0.25,
+            "h200": rng.random() < 0.2,
+            "providers_actf": "",
+            "cost": cost,
+            "stock": round(min(cost * quantity, 1000000.0), 2),
+            "remarks": "",
+            "planes": sorted(linked)
+        }
+
+
+def synthetic_movements(
+    count: int,
+    part_ids: Sequence[int],
+    plane_ids: Sequence[int],
+    seed: int = DEFAULT_SEED
+) -> Iterator[tuple]:
+    """Génère un historique de mouvements de stock sur HISTORY_DAYS jours.
+
+    Args:
+        count: Nombre de mouvements
+        part_ids: IDs des pièces
+        plane_ids: IDs des avions
+        seed: Graine du générateur
+
+    Yields:
+        tuple: ("ID stuff", "ID plane", username, delta, quantity_after, created_at)
+    """
+    rng = random.Random(seed + 1)
+    part_weights = _zipf_weights(len(part_ids), 0.9)
+    now = datetime.now()
+    for _ in range(count):
+        delta = rng.randint(1, 5) if rng.random() < 0.15 else -rng.randint(1, 3)
+        plane_id = rng.choice(plane_ids) if plane_ids and delta < 0 and rng.random() < 0.7 else None
+        created_at = now - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+        yield (
+            rng.choices(part_ids, cum_weights=part_weights)[0],
+            plane_id,
+            rng.choice(USERNAMES),
+            delta,
+            rng.randint(0, 50),
+            created_at.strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+
+def generate_database(
+    db_path: str,
+    parts: int,
+    planes: int,
+    link_density: float = DEFAULT_LINK_DENSITY,
+    movements: Optional[int] = None,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Crée et remplit une base synthétique.
+
+    Args:
+        db_path: Chemin de la base à créer (ne doit pas contenir de pièces)
+        parts: Nombre de pièces
+        planes: Nombre d'avions
+        link_density: Nombre moyen d'avions associés à une pièce
+        movements: Mouvements d'historique (parts x DEFAULT_MOVEMENT_RATIO si None)
+        seed: Graine du générateur
+        chunk_size: Nombre de lignes par transaction
+
+    Returns:
+        Dict[str, Any]: Description de la base (tailles, graine, durées en s)
+    """
+    from ressources.init_bd import init_db
+
+    if movements is None:
+        movements = int(parts * DEFAULT_MOVEMENT_RATIO)
+    if not init_db(db_path):
+        raise RuntimeError(f"Initialisation de la base impossible : {db_path}")
+
+    start = time.perf_counter()
+    names = plane_names(planes)
+    with pool.connection(db_path) as conn:
+        if conn.execute("SELECT COUNT(*) FROM magasin").fetchone()[0]:
+            raise RuntimeError(f"La base contient déjà des pièces : {db_path}")
+        conn.executemany('INSERT INTO planes ("name") VALUES (?)', [(name,) for name in names])
+
+    importer = BulkImporter(chunk_size=chunk_size, db_path=db_path)
+    report = importer.import_materials(
+        synthetic_fleet_materials(parts, names, link_density, seed)
+    )
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with pool.connection(db_path) as conn:
+        part_ids = [row[0] for row in conn.execute('SELECT "ID stuff" FROM magasin')]
+        plane_ids = [row[0] for row in conn.execute('SELECT "ID plane" FROM planes')]
+        if part_ids and movements:
+            conn.executemany(
+                '''
+                INSERT INTO stock_movements (
+                    "ID stuff", "ID plane", "username", "delta", "quantity_after", "created_at"
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''',
+                synthetic_movements(movements, part_ids, plane_ids, seed)
+            )
+        conn.execute("ANALYZE")
+    movement_seconds = time.perf_counter() - start
+
+    return {
+        "parts": report.inserted,
+        "rejected": report.rejected,
+        "planes": planes,
+        "links": report.links,
+        "movements": movements if part_ids else 0,
+        "link_density": link_density,
+        "seed": seed,
+        "import_seconds": round(import_seconds, 3),
+        "movement_seconds": round(movement_seconds, 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération d'une base synthétique")
+    parser.add_argument("db_path", help="Chemin de la base à créer")
+    parser.add_argument("--scale", choices=sorted(SCALES), default=DEFAULT_SCALE)
+    parser.add_argument("--parts", type=int, help="Nombre de pièces (remplace --scale)")
+    parser.add_argument("--planes", type=int, help="Nombre d'avions (remplace --scale)")
+    parser.add_argument("--link-density", type=float, default=DEFAULT_LINK_DENSITY)
+    parser.add_argument("--movements", type=int)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    scale_parts, scale_planes = SCALES[args.scale]
+    try:
+        summary = generate_database(
+            os.path.abspath(args.db_path), args.parts or scale_parts, args.planes or scale_planes,
+            args.link_density, args.movements, args.seed
+        )
+    finally:
+        pool.close_all()
+    print(", ".join(f"{key} : {value}" for key, value in summary.items()))
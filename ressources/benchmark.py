@@ -0,0 +1,387 @@
+"""
+Module de mesure des performances sur une base synthétique.
+
+Ce module génère (ou réutilise) une base synthétique (voir bench_data), puis
+chronomètre les opérations sensibles à la taille du magasin : recherche de
+matériel, import en masse, mouvements de stock, requêtes de statistiques et
+rendu des diagrammes du rapport. Les résultats sont écrits en JSON et
+comparés à une référence enregistrée (benchmark_baseline.json) : toute
+opération nettement plus lente que la référence est signalée, et le code de
+sortie vaut 1, ce qui rend les régressions visibles en revue.
+
+Usage :
+    python ressources/benchmark.py                      # base « small »
+    python ressources/benchmark.py --scale medium --db /tmp/medium.db
+    python ressources/benchmark.py --update-baseline    # nouvelle référence
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import platform
+import argparse
+import tempfile
+import statistics
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Ajout du répertoire parent au path Python pour permettre l'importation des modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ressources.pool_bd import pool
+from ressources import bench_data
+from ressources.bulk_import import BulkImporter
+from ressources.request_bd import DatabaseConfig, DatabaseQueries
+
+# Fichiers de résultats
+RESOURCES_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_PATH = os.path.join(RESOURCES_PATH, "benchmark_results.json")
+DEFAULT_BASELINE_PATH = os.path.join(RESOURCES_PATH, "benchmark_baseline.json")
+
+# Paramètres des mesures
+DEFAULT_REPEAT = 5          # Exécutions mesurées par opération (après un échauffement)
+STOCK_OPERATIONS = 200      # Mouvements de stock mesurés
+IMPORT_ROWS = 2000          # Lignes par import mesuré
+
+# Seuils de régression : plus lent de TOLERANCE et d'au moins NOISE_FLOOR_MS
+TOLERANCE = 0.25
+NOISE_FLOOR_MS = 1.0
+
+
+@contextmanager
+def _default_database(db_path: str) -> Iterator[None]:
+    """Fait de db_path la base par défaut du pool (fonctions de manip_bd)."""
+    previous = pool.default_path
+    pool.default_path = db_path
+    try:
+        yield
+    finally:
+        pool.default_path = previous
+
+
+def summarize(samples_ms: List[float], ops: int = 1) -> Dict[str, Any]:
+    """Résume une série de mesures.
+
+    Args:
+        samples_ms: Durées des exécutions (ms)
+        ops: Nombre d'opérations par exécution
+
+    Returns:
+        Dict[str, Any]: Nombre d'exécutions, min, médiane, p95, max (ms)
+        et débit (opérations par seconde, sur la médiane)
+    """
+    ordered = sorted(samples_ms)
+    median = statistics.median(ordered)
+    return {
+        "runs": len(ordered),
+        "ops": ops,
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(median, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+        "max_ms": round(ordered[-1], 3),
+        "ops_per_s": round(ops / (median / 1000), 1) if median > 0 else None
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int = DEFAULT_REPEAT, ops: int = 1) -> Dict[str, Any]:
+    """Chronomètre une opération, après une exécution d'échauffement.
+
+    Args:
+        func: Opération à mesurer
+        repeat: Nombre d'exécutions mesurées
+        ops: Nombre d'opérations élémentaires par exécution
+
+    Returns:
+        Dict[str, Any]: Résumé des mesures (voir summarize)
+    """
+    func()
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - begin) * 1000)
+    return summarize(samples, ops)
+
+
+def _search_terms() -> Dict[str, str]:
+    """Termes de recherche couvrant les cas fréquents, rares et absents."""
+    return {
+        "common_word": bench_data.PART_NOUNS[0],
+        "rare_word": bench_data.PART_NOUNS[-1],
+        "qualifier": bench_data.PART_QUALIFIERS[0],
+        "provider": bench_data.PROVIDERS[0],
+        "pn_prefix": "MS2",
+        "absent": "Zzyzx"
+    }
+
+
+def bench_search(queries: DatabaseQueries, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Mesure search_material et count_material."""
+    results = {}
+    for label, term in _search_terms().items():
+        results[f"search_material.{label}"] = measure(
+            lambda term=term: queries.search_material(term), repeat
+        )
+    results["count_material.common_word"] = measure(
+        lambda: queries.count_material(bench_data.PART_NOUNS[0]), repeat
+    )
+    return results
+
+
+def bench_stats(queries: DatabaseQueries, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Mesure les requêtes de l'onglet Statistiques et du rapport."""
+    since = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    operations = {
+        "cost_by_plane": queries.get_cost_stats_by_plane,
+        "availability": queries.get_availability_ratio,
+        "stock_value": queries.get_stock_value,
+        "provider_mix": queries.get_provider_mix,
+        "consumption_by_plane": lambda: queries.get_consumption_by_plane(since),
+        "consumption_by_part": lambda: queries.get_consumption_by_part(since),
+        "consumption_all_time": queries.get_consumption_by_plane
+    }
+    return {f"stats.{name}": measure(func, repeat) for name, func in operations.items()}
+
+
+def bench_stock_movements(db_path: str, seed: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Mesure apply_stock_movement (une transaction par mouvement)."""
+    from ressources.manip_bd import apply_stock_movement
+
+    with pool.connection(db_path) as conn:
+        part_ids = [row[0] for row in conn.execute(
+            'SELECT "ID stuff" FROM magasin WHERE "Quantity" BETWEEN 1 AND 9000'
+        )]
+    if not part_ids:
+        return {}
+    rng = random.Random(seed)
+    targets = [rng.choice(part_ids) for _ in range(STOCK_OPERATIONS // 2)]
+
+    def run() -> None:
+        # Retrait puis remise : le stock revient à son état initial
+        for part_id in targets:
+            apply_stock_movement(part_id, -1, "benchmark")
+            apply_stock_movement(part_id, 1, "benchmark")
+
+    with _default_database(db_path):
+        return {"stock_movement.withdraw_restore": measure(run, repeat, 2 * len(targets))}
+
+
+def bench_import(db_path: str, seed: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Mesure un import en masse dans la base déjà remplie."""
+    with pool.connection(db_path) as conn:
+        planes = [row[0] for row in conn.execute('SELECT "name" FROM planes')]
+
+    batches = iter(range(repeat + 1))
+
+    def run() -> None:
+        materials = bench_data.synthetic_fleet_materials(
+            IMPORT_ROWS, planes, seed=seed + 1000 + next(batches)
+        )
+        BulkImporter(db_path=db_path).import_materials(materials)
+
+    return {f"import.{IMPORT_ROWS}_rows": measure(run, repeat, IMPORT_ROWS)}
+
+
+def bench_charts(queries: DatabaseQueries, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Mesure le rendu d'un diagramme du rapport (sans cache)."""
+    try:
+        from ressources.report_charts import render_pie_png
+        import matplotlib  # noqa: F401
+    except ImportError as e:
+        print(f"Rendu des diagrammes non mesuré : {str(e)}")
+        return {}
+    mix = queries.get_provider_mix()
+    spec = ("Répartition par fournisseur", list(mix), list(mix.values()))
+    return {"charts.render_pie_png": measure(lambda: render_pie_png(spec), repeat)}
+
+
+def run_benchmarks(db_path: str, seed: int, repeat: int = DEFAULT_REPEAT) -> Dict[str, Dict[str, Any]]:
+    """Exécute toutes les mesures sur une base existante.
+
+    Les lectures sont mesurées avant les écritures, qui modifient la base.
+
+    Args:
+        db_path: Chemin de la base
+        seed: Graine des tirages (pièces mouvementées, lignes importées)
+        repeat: Nombre d'exécutions mesurées par opération
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Résumé des mesures par opération
+    """
+    queries = DatabaseQueries(DatabaseConfig(db_path))
+    results = {}
+    for name, bench in (
+        ("recherche", lambda: bench_search(queries, repeat)),
+        ("statistiques", lambda: bench_stats(queries, repeat)),
+        ("diagrammes", lambda: bench_charts(queries, repeat)),
+        ("mouvements de stock", lambda: bench_stock_movements(db_path, seed, repeat)),
+        ("import", lambda: bench_import(db_path, seed, repeat))
+    ):
+        print(f"Mesure : {name}...")
+        results.update(bench())
+    return results
+
+
+def scale_label(meta: Dict[str, Any]) -> str:
+    """Identifie une taille de base (les références ne se comparent qu'à taille égale)."""
+    return f"{meta['parts']}x{meta['planes']}x{meta['link_density']}"
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    """Lit un fichier JSON (dictionnaire vide s'il n'existe pas ou est invalide)."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Erreur lors de la lecture de {path} : {str(e)}")
+        return {}
+
+
+def save_json(path: str, data: Dict[str, Any]) -> None:
+    """Écrit un fichier JSON lisible (clés triées, pour des diffs stables)."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = TOLERANCE,
+    noise_floor_ms: float = NOISE_FLOOR_MS
+) -> List[Tuple[str, Optional[float], Optional[float], str]]:
+    """Compare des mesures à une référence, sur la médiane.
+
+    Args:
+        results: Mesures courantes par opération
+        baseline: Mesures de référence par opération
+        tolerance: Ralentissement relatif toléré (0.25 : +25 %)
+        noise_floor_ms: Écart absolu en dessous duquel rien n'est signalé
+
+    Returns:
+        List[Tuple[str, Optional[float], Optional[float], str]]: (opération,
+        médiane de référence, médiane courante, verdict) où le verdict vaut
+        "ok", "plus rapide", "RÉGRESSION", "nouveau" ou "disparu"
+    """
+    rows = []
+    for name in sorted(set(results) | set(baseline)):
+        current = results.get(name, {}).get("median_ms")
+        reference = baseline.get(name, {}).get("median_ms")
+        if reference is None:
+            verdict = "nouveau"
+        elif current is None:
+            verdict = "disparu"
+        elif current > reference * (1 + tolerance) and current - reference > noise_floor_ms:
+            verdict = "RÉGRESSION"
+        elif current < reference / (1 + tolerance) and reference - current > noise_floor_ms:
+            verdict = "plus rapide"
+        else:
+            verdict = "ok"
+        rows.append((name, reference, current, verdict))
+    return rows
+
+
+def format_comparison(rows: List[Tuple[str, Optional[float], Optional[float], str]]) -> str:
+    """Met en forme le résultat de compare()."""
+    def cell(value: Optional[float]) -> str:
+        return f"{value:10.2f}" if value is not None else f"{'-':>10}"
+
+    lines = [f"{'opération':40} {'référence':>10} {'actuel':>10} {'écart':>8}  verdict"]
+    for name, reference, current, verdict in rows:
+        change = (
+            f"{(current / reference - 1) * 100:+7.0f}%"
+            if reference and current is not None else f"{'':8}"
+        )
+        lines.append(f"{name:40} {cell(reference)} {cell(current)} {change}  {verdict}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande.
+
+    Returns:
+        int: 0 si aucune régression, 1 sinon
+    """
+    parser = argparse.ArgumentParser(description="Mesure des performances sur une base synthétique")
+    parser.add_argument("--scale", choices=sorted(bench_data.SCALES), default=bench_data.DEFAULT_SCALE)
+    parser.add_argument("--parts", type=int, help="Nombre de pièces (remplace --scale)")
+    parser.add_argument("--planes", type=int, help="Nombre d'avions (remplace --scale)")
+    parser.add_argument("--link-density", type=float, default=bench_data.DEFAULT_LINK_DENSITY)
+    parser.add_argument("--seed", type=int, default=bench_data.DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--db", help="Base à réutiliser, ou à générer et conserver si absente")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Enregistre les mesures comme nouvelle référence")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    scale_parts, scale_planes = bench_data.SCALES[args.scale]
+    parts = args.parts or scale_parts
+    planes = args.planes or scale_planes
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.abspath(args.db) if args.db else os.path.join(tmp_dir, "benchmark.db")
+        try:
+            if os.path.exists(db_path):
+                # Base existante : les mesures d'import en masse de la génération manquent
+                with pool.connection(db_path) as conn:
+                    meta = {
+                        "parts": conn.execute("SELECT COUNT(*) FROM magasin").fetchone()[0],
+                        "planes": conn.execute("SELECT COUNT(*) FROM planes").fetchone()[0],
+                        "link_density": args.link_density,
+                        "seed": args.seed
+                    }
+                print(f"Base réutilisée : {db_path}")
+            else:
+                print(f"Génération de {parts} pièces et {planes} avions...")
+                meta = bench_data.generate_database(
+                    db_path, parts, planes, args.link_density, seed=args.seed
+                )
+            results = run_benchmarks(db_path, args.seed, args.repeat)
+            if "import_seconds" in meta:
+                results["generate.import_all"] = summarize(
+                    [meta["import_seconds"] * 1000], meta["parts"]
+                )
+        finally:
+            pool.close_all()
+
+    meta.update({
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat
+    })
+    label = scale_label(meta)
+    save_json(args.output, {"label": label, "meta": meta, "results": results})
+    print(f"Résultats écrits dans {args.output}")
+
+    baselines = load_json(args.baseline)
+    if args.update_baseline:
+        baselines[label] = {"meta": meta, "results": results}
+        save_json(args.baseline, baselines)
+        print(f"Référence {label} enregistrée dans {args.baseline}")
+        return 0
+
+    if label not in baselines:
+        print(f"Aucune référence pour {label} : relancez avec --update-baseline")
+        return 0
+    rows = compare(results, baselines[label]["results"], args.tolerance)
+    print(format_comparison(rows))
+    regressions = [row[0] for row in rows if row[3] == "RÉGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} régression(s) : {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
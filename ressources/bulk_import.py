@@ -0,0 +1,1102 @@
+"""
+Module d'import en masse du matériel.
+
+Ce module insère un grand nombre de matériels en quelques transactions :
+les IDs des avions sont résolus une seule fois, les lignes sont validées en
+mémoire, puis les pièces et leurs liens planes_magasin sont écrits par
+executemany, par lots. Les lignes refusées sont consignées dans un rapport
+CSV au lieu d'interrompre l'import.
+
+La conversion et la validation, coûteuses en calcul, peuvent être confiées
+à un pool de processus (un fichier par processus pour les imports de
+plusieurs fichiers) ; un seul écrivain insère les lots validés dans SQLite.
+"""
+
+import os
+import sys
+import csv
+import time
+import sqlite3
+import hashlib
+import queue
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Ajout du répertoire parent au path Python pour permettre l'importation des modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ressources.pool_bd import pool
+from ressources.manip_bd import ValidationError, validate_material
+from ressources.ods_reader import iter_ods_rows
+
+# Constantes d'import
+DEFAULT_CHUNK_SIZE = 5000
+BENCHMARK_ROWS = 100000
+DRY_RUN_EXAMPLES = 5          # Exemples conservés par type d'erreur
+DRY_RUN_MAX_DISTINCT = 10000  # Plafond du comptage des valeurs distinctes
+
+# Avions reconnus dans les fichiers d'inventaire
+IMPORT_PLANES = ("AQUILA", "PA28-181", "DA40", "SR20", "SR22")
+
+# Colonnes insérées dans magasin, dans l'ordre des tuples produits par prepare_row
+INSERT_COLUMNS = (
+    "Numero", "Rayonnage", "Etagere", "Description",
+    "Providers", "PN", "Order", "Quantity", "Minimum",
+    "50H", "100H", "200H_ou_annuelle",
+    "Providers_ACTF", "Cost_Estimate", "Stock_Estimate_HT", "Remarks"
+)
+INSERT_MATERIAL_SQL = (
+    "INSERT INTO magasin ({columns}, \"created_at\", \"updated_at\") "
+    "VALUES ({values}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+).format(
+    columns=", ".join(f'"{column}"' for column in INSERT_COLUMNS),
+    values=", ".join("?" for _ in INSERT_COLUMNS)
+)
+# Mise à jour d'une ligne réimportée : le numéro d'origine est conservé et le
+# stock n'est pas écrasé, il n'évolue que par apply_stock_movement (qui tient
+# le journal des mouvements et ses agrégats à jour)
+UPDATE_COLUMNS = tuple(
+    column for column in INSERT_COLUMNS[1:] if column not in ("Quantity", "Stock_Estimate_HT")
+)
+UPDATE_INDEXES = tuple(INSERT_COLUMNS.index(column) for column in UPDATE_COLUMNS)
+UPDATE_MATERIAL_SQL = (
+    "UPDATE magasin SET {assignments} WHERE \"ID stuff\" = ?"
+).format(assignments=", ".join(f'"{column}" = ?' for column in UPDATE_COLUMNS))
+UPSERT_IMPORT_KEY_SQL = (
+    'INSERT INTO magasin_import_keys ("PN", "Rayonnage", "Etagere", "ID stuff", "fingerprint") '
+    "VALUES (?, ?, ?, ?, ?) "
+    'ON CONFLICT ("PN", "Rayonnage", "Etagere") DO UPDATE SET '
+    '"ID stuff" = excluded."ID stuff", "fingerprint" = excluded."fingerprint", '
+    '"updated_at" = CURRENT_TIMESTAMP'
+)
+UPSERT_IMPORT_FILE_SQL = (
+    'INSERT INTO import_files ("path", "sha256") VALUES (?, ?) '
+    'ON CONFLICT ("path") DO UPDATE SET "sha256" = excluded."sha256", '
+    '"imported_at" = CURRENT_TIMESTAMP'
+)
+INSERT_LINK_SQL = (
+    'INSERT OR IGNORE INTO planes_magasin ("ID stuff", "ID plane", created_at) '
+    "VALUES (?, ?, CURRENT_TIMESTAMP)"
+)
+
+# Ligne validée : (numéro de ligne, valeurs à insérer, avions, données d'origine)
+PreparedRow = Tuple[int, tuple, List[str], Dict[str, Any]]
+# Ligne refusée : (numéro de ligne, motif, données d'origine)
+Reject = Tuple[int, str, Dict[str, Any]]
+
+# Résultat d'un import
+ImportReport = namedtuple(
+    "ImportReport",
+    ["inserted", "rejected", "links", "chunks", "elapsed", "rejects_path",
+     "updated", "unchanged"],
+    defaults=(0, 0)
+)
+
+
+def numero_for_date(date: str) -> str:
+    """Calcule le numéro d'un matériel (année sur 2 chiffres + semaine ISO).
+
+    Args:
+        date: Date d'ajout au format YYYY-MM-DD
+
+    Returns:
+        str: Numéro du matériel
+    """
+    date_obj = datetime.strptime(date, "%Y-%m-%d")
+    return f"{str(date_obj.year)[-2:]}{date_obj.strftime('%V')}"
+
+
+def material_fingerprint(material: Dict[str, Any]) -> str:
+    """Calcule l'empreinte du contenu d'un matériel.
+
+    Args:
+        material: Données du matériel
+
+    Returns:
+        str: Empreinte SHA-1 hexadécimale
+    """
+    content = repr(sorted(
+        (key, value) for key, value in material.items() if key != "fingerprint"
+    ))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    """Calcule l'empreinte SHA-256 d'un fichier, lu par blocs.
+
+    Args:
+        file_path: Chemin du fichier
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prepare_row(material: Dict[str, Any], numero: str) -> Tuple[tuple, List[str]]:
+    """Valide un matériel et le convertit en tuple prêt pour l'insertion.
+
+    Args:
+        material: Données du matériel (mêmes clés que add_material_from_excel,
+            plus "planes" : liste des noms d'avions associés)
+        numero: Numéro attribué au matériel
+
+    Returns:
+        Tuple[tuple, List[str]]: (valeurs dans l'ordre de INSERT_COLUMNS,
+        noms des avions associés)
+
+    Raises:
+        ValidationError: Si un champ est invalide
+    """
+    maintenance = {
+        "50h": bool(material.get("h50", False)),
+        "100h": bool(material.get("h100", False)),
+        "200h": bool(material.get("h200", False))
+    }
+    values = (
+        material.get("numero") or numero,
+        material.get("rayonnage", "A1"),
+        material.get("etagere", "1"),
+        material.get("description", ""),
+        material.get("providers", ""),
+        material.get("pn", ""),
+        material.get("order", ""),
+        material.get("quantity", 0),
+        material.get("minimum", 0),
+        maintenance["50h"],
+        maintenance["100h"],
+        maintenance["200h"],
+        material.get("providers_actf", ""),
+        material.get("cost", 0.0),
+        material.get("stock", 0.0),
+        material.get("remarks", "")
+    )
+    validate_material(
+        values[3], values[4], values[12], values[5], values[6],
+        values[1], values[2], values[7], values[8], values[13], values[14],
+        maintenance
+    )
+    return values, list(material.get("planes", ()))
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Découpe un itérable en listes de taille fixe, sans le matérialiser.
+
+    Args:
+        items: Éléments à découper
+        size: Taille des lots
+
+    Yields:
+        List[Any]: Lot d'éléments
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunk(
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    numero: str,
+    plane_names: FrozenSet[str]
+) -> Tuple[List[PreparedRow], List[Reject]]:
+    """Valide un lot de matériels (exécutable dans un processus séparé).
+
+    Args:
+        chunk: Couples (numéro de ligne, données du matériel)
+        numero: Numéro attribué aux matériels
+        plane_names: Noms des avions connus de la base
+
+    Returns:
+        Tuple[List[PreparedRow], List[Reject]]: (lignes prêtes pour
+        l'insertion, lignes refusées avec leur motif)
+    """
+    valid = []
+    rejects = []
+    for line, material in chunk:
+        try:
+            values, planes = prepare_row(material, numero)
+            unknown = [plane for plane in planes if plane not in plane_names]
+            if unknown:
+                raise ValidationError(f"Avion(s) inconnu(s) : {', '.join(unknown)}")
+        except ValidationError as e:
+            rejects.append((line, str(e), material))
+            continue
+        valid.append((line, values, planes, material))
+    return valid, rejects
+
+
+def parse_file_worker(
+    file_path: str,
+    parser: Callable[[Iterator[List[Any]]], Iterable[Tuple[int, Dict[str, Any]]]],
+    numero: str,
+    plane_names: FrozenSet[str],
+    chunk_size: int,
+    batches: Any
+) -> None:
+    """Lit, convertit et valide un fichier ODS dans un processus séparé.
+
+    Les lots validés sont envoyés à l'écrivain par la file batches, sous
+    forme de messages ("batch", fichier, lot), ("error", fichier, message)
+    puis ("done", fichier, None).
+
+    Args:
+        file_path: Fichier ODS à lire
+        parser: Fonction (de niveau module) convertissant les lignes de la
+            feuille, sans l'en-tête, en couples (numéro de ligne, matériel)
+        numero: Numéro attribué aux matériels
+        plane_names: Noms des avions connus de la base
+        chunk_size: Nombre de lignes par lot
+        batches: File partagée avec l'écrivain
+    """
+    try:
+        rows = iter_ods_rows(file_path)
+        next(rows, None)  # En-tête
+        for chunk in _chunks(parser(rows), chunk_size):
+            batches.put(("batch", file_path, validate_chunk(chunk, numero, plane_names)))
+    except Exception as e:
+        batches.put(("error", file_path, str(e)))
+    finally:
+        batches.put(("done", file_path, None))
+
+
+class BulkImporter:
+    """Importe des matériels par lots de transactions.
+
+    Chaque lot est écrit dans une seule transaction : un executemany pour
+    les pièces, un pour les liens avec les avions. Les IDs attribués sont
+    contigus au sein d'une transaction d'écriture (aucun autre écrivain ne
+    peut s'intercaler), ce qui permet de les déduire de last_insert_rowid()
+    sans relire les lignes insérées.
+
+    La conversion et la validation peuvent être réparties sur plusieurs
+    processus ; les écritures restent faites par le seul thread appelant.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rejects_path: Optional[str] = None,
+        db_path: Optional[str] = None
+    ) -> None:
+        """Initialise l'import.
+
+        Args:
+            chunk_size: Nombre de lignes par transaction
+            rejects_path: Fichier CSV des lignes refusées (aucun rapport si None)
+            db_path: Chemin de la base (base par défaut si None)
+        """
+        if chunk_size <= 0:
+            raise ValueError("La taille des lots doit être strictement positive")
+        self.chunk_size = chunk_size
+        self.rejects_path = rejects_path
+        self.db_path = db_path
+        self.plane_ids: Dict[str, int] = {}
+        self.rejects: List[Tuple[str, int, str, Dict[str, Any]]] = []
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.links = 0
+        self.chunks = 0
+
+    def resolve_planes(self) -> Dict[str, int]:
+        """Charge une seule fois la correspondance nom d'avion -> ID.
+
+        Returns:
+            Dict[str, int]: IDs des avions par nom
+        """
+        with pool.connection(self.db_path) as conn:
+            rows = conn.execute('SELECT "name", "ID plane" FROM planes').fetchall()
+        self.plane_ids = {name: plane_id for name, plane_id in rows}
+        return self.plane_ids
+
+    def reject(self, line: int, reason: str, material: Dict[str, Any], source: str = "") -> None:
+        """Consigne une ligne refusée.
+
+        Args:
+            line: Numéro de la ligne dans le fichier source
+            reason: Motif du refus
+            material: Données de la ligne
+            source: Fichier d'origine de la ligne
+        """
+        self.rejects.append((source, line, reason, material))
+
+    def _insert_chunk(self, cursor: sqlite3.Cursor, chunk: List[PreparedRow]) -> List[int]:
+        """Insère un lot de pièces dans la transaction courante.
+
+        Args:
+            cursor: Curseur de la transaction
+            chunk: Lignes (numéro, valeurs, avions, données d'origine)
+
+        Returns:
+            List[int]: IDs attribués, dans l'ordre du lot
+        """
+        cursor.executemany(INSERT_MATERIAL_SQL, [values for _, values, _, _ in chunk])
+        last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(chunk) + 1, last_id + 1))
+
+    def _link_planes(
+        self,
+        cursor: sqlite3.Cursor,
+        piece_ids: List[int],
+        chunk: List[PreparedRow]
+    ) -> int:
+        """Insère les liens planes_magasin d'un lot de pièces.
+
+        Args:
+            cursor: Curseur de la transaction
+            piece_ids: IDs des pièces, dans l'ordre du lot
+            chunk: Lignes (numéro, valeurs, avions, données d'origine)
+
+        Returns:
+            int: Nombre de liens insérés
+        """
+        links = [
+            (piece_id, self.plane_ids[plane])
+            for piece_id, (_, _, planes, _) in zip(piece_ids, chunk)
+            for plane in planes
+        ]
+        if links:
+            cursor.executemany(INSERT_LINK_SQL, links)
+        return len(links)
+
+    def _write_chunk(self, cursor: sqlite3.Cursor, chunk: List[PreparedRow]) -> Tuple[int, int]:
+        """Insère un lot de pièces et leurs liens dans la transaction courante.
+
+        Args:
+            cursor: Curseur de la transaction
+            chunk: Lignes (numéro, valeurs, avions, données d'origine)
+
+        Returns:
+            Tuple[int, int]: (pièces insérées, liens insérés)
+        """
+        piece_ids = self._insert_chunk(cursor, chunk)
+        return len(piece_ids), self._link_planes(cursor, piece_ids, chunk)
+
+    def _write_rows_one_by_one(
+        self,
+        cursor: sqlite3.Cursor,
+        chunk: List[PreparedRow],
+        source: str = ""
+    ) -> Tuple[int, int]:
+        """Insère un lot ligne par ligne, pour isoler les lignes refusées par SQLite.
+
+        Args:
+            cursor: Curseur de la transaction
+            chunk: Lignes (numéro, valeurs, avions, données d'origine)
+            source: Fichier d'origine du lot
+
+        Returns:
+            Tuple[int, int]: (pièces insérées, liens insérés)
+        """
+        inserted = 0
+        links = 0
+        for line, values, planes, material in chunk:
+            try:
+                cursor.execute("SAVEPOINT bulk_row")
+                cursor.execute(INSERT_MATERIAL_SQL, values)
+                piece_id = cursor.lastrowid
+                for plane in planes:
+                    cursor.execute(INSERT_LINK_SQL, (piece_id, self.plane_ids[plane]))
+                    links += 1
+                cursor.execute("RELEASE SAVEPOINT bulk_row")
+                inserted += 1
+            except sqlite3.IntegrityError as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                cursor.execute("RELEASE SAVEPOINT bulk_row")
+                self.reject(line, f"Erreur d'intégrité : {str(e)}", material, source)
+        return inserted, links
+
+    def flush(self, chunk: List[PreparedRow], source: str = "") -> Tuple[int, int]:
+        """Écrit un lot dans sa propre transaction.
+
+        Si SQLite refuse une ligne du lot (contrainte CHECK non couverte par
+        la validation), le lot est rejoué ligne par ligne afin de n'écarter
+        que les lignes fautives.
+
+        Args:
+            chunk: Lignes (numéro, valeurs, avions, données d'origine)
+            source: Fichier d'origine du lot
+
+        Returns:
+            Tuple[int, int]: (pièces insérées, liens insérés)
+        """
+        if not chunk:
+            return 0, 0
+        try:
+            with pool.connection(self.db_path) as conn:
+                return self._write_chunk(conn.cursor(), chunk)
+        except sqlite3.IntegrityError:
+            with pool.connection(self.db_path) as conn:
+                return self._write_rows_one_by_one(conn.cursor(), chunk, source)
+
+    def _consume(self, valid: List[PreparedRow], rejects: List[Reject], source: str = "") -> None:
+        """Enregistre le résultat de la validation d'un lot et l'écrit.
+
+        Args:
+            valid: Lignes prêtes pour l'insertion
+            rejects: Lignes refusées par la validation
+            source: Fichier d'origine du lot
+        """
+        for line, reason, material in rejects:
+            self.reject(line, reason, material, source)
+        inserted, links = self.flush(valid, source)
+        self.inserted += inserted
+        self.links += links
+        if valid:
+            self.chunks += 1
+
+    def _prepare(self, date: Optional[str]) -> Tuple[str, FrozenSet[str]]:
+        """Calcule le numéro des matériels et charge les avions si besoin.
+
+        Args:
+            date: Date d'ajout au format YYYY-MM-DD (aujourd'hui si None)
+
+        Returns:
+            Tuple[str, FrozenSet[str]]: (numéro, noms des avions connus)
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        if not self.plane_ids:
+            self.resolve_planes()
+        return numero_for_date(date), frozenset(self.plane_ids)
+
+    def _report(self, start: float) -> ImportReport:
+        """Écrit le rapport des rejets et construit le bilan de l'import.
+
+        Args:
+            start: Instant de début de l'import (time.perf_counter)
+
+        Returns:
+            ImportReport: Bilan de l'import
+        """
+        rejects_path = self.write_rejects()
+        return ImportReport(
+            self.inserted, len(self.rejects), self.links, self.chunks,
+            time.perf_counter() - start, rejects_path, self.updated, self.unchanged
+        )
+
+    def import_materials(
+        self,
+        materials: Iterable[Tuple[int, Dict[str, Any]]],
+        date: Optional[str] = None,
+        workers: int = 1
+    ) -> ImportReport:
+        """Valide et insère des matériels par lots.
+
+        Avec plusieurs processus, la validation des lots suivants se poursuit
+        pendant l'écriture du lot courant ; les lots sont écrits dans l'ordre
+        de la source, et au plus 2 × workers lots sont en attente.
+
+        Args:
+            materials: Couples (numéro de ligne, données du matériel)
+            date: Date d'ajout au format YYYY-MM-DD (aujourd'hui si None)
+            workers: Nombre de processus de validation (1 : tout dans ce thread)
+
+        Returns:
+            ImportReport: Bilan de l'import
+        """
+        start = time.perf_counter()
+        numero, plane_names = self._prepare(date)
+        chunks = _chunks(materials, self.chunk_size)
+
+        if workers <= 1:
+            for chunk in chunks:
+                self._consume(*validate_chunk(chunk, numero, plane_names))
+            return self._report(start)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(validate_chunk, chunk, numero, plane_names))
+                if len(pending) >= 2 * workers:
+                    self._consume(*pending.popleft().result())
+            while pending:
+                self._consume(*pending.popleft().result())
+        return self._report(start)
+
+    def import_prepared(
+        self,
+        prepared: Iterable[PreparedRow],
+        rejects: Iterable[Reject] = (),
+        source: str = ""
+    ) -> ImportReport:
+        """Insère des lignes déjà validées, par exemple de façon vectorisée.
+
+        Args:
+            prepared: Lignes (numéro, valeurs dans l'ordre de INSERT_COLUMNS,
+                avions, données d'origine)
+            rejects: Lignes déjà refusées par l'appelant
+            source: Fichier d'origine des lignes
+
+        Returns:
+            ImportReport: Bilan de l'import
+        """
+        start = time.perf_counter()
+        if not self.plane_ids:
+            self.resolve_planes()
+        for line, reason, material in rejects:
+            self.reject(line, reason, material, source)
+        for chunk in _chunks(prepared, self.chunk_size):
+            self._consume(chunk, [], source)
+        return self._report(start)
+
+    def import_files(
+        self,
+        file_paths: List[str],
+        parser: Callable[[Iterator[List[Any]]], Iterable[Tuple[int, Dict[str, Any]]]],
+        date: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> ImportReport:
+        """Importe plusieurs fichiers ODS, lus et validés en parallèle.
+
+        Chaque fichier est lu, converti et validé dans son propre processus ;
+        le thread appelant est le seul écrivain et insère les lots dans
+        l'ordre où ils arrivent.
+
+        Args:
+            file_paths: Fichiers ODS à importer
+            parser: Fonction (de niveau module) convertissant les lignes d'une
+                feuille, sans l'en-tête, en couples (numéro de ligne, matériel)
+            date: Date d'ajout au format YYYY-MM-DD (aujourd'hui si None)
+            workers: Nombre de processus (un par fichier, dans la limite des
+                cœurs disponibles, si None)
+
+        Returns:
+            ImportReport: Bilan de l'import
+        """
+        start = time.perf_counter()
+        numero, plane_names = self._prepare(date)
+        if not file_paths:
+            return self._report(start)
+        workers = max(1, min(len(file_paths), workers or os.cpu_count() or 1))
+
+        with multiprocessing.Manager() as manager:
+            batches = manager.Queue(maxsize=4 * workers)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        parse_file_worker, path, parser, numero, plane_names,
+                        self.chunk_size, batches
+                    )
+                    for path in file_paths
+                ]
+                remaining = len(file_paths)
+                while remaining:
+                    try:
+                        kind, path, payload = batches.get(timeout=1)
+                    except queue.Empty:
+                        # Un processus interrompu n'enverra jamais son message de fin
+                        if all(future.done() for future in futures) and batches.empty():
+                            for future in futures:
+                                if future.exception():
+                                    print(f"Erreur d'un processus d'import : {future.exception()}")
+                            break
+                        continue
+
+                    if kind == "batch":
+                        self._consume(*payload, source=path)
+                    elif kind == "error":
+                        self.reject(0, f"Erreur lors de la lecture du fichier : {payload}", {}, path)
+                    else:
+                        remaining -= 1
+
+        return self._report(start)
+
+    def _load_import_keys(self) -> Tuple[Dict[Tuple[str, str, str], int], Dict[str, int]]:
+        """Charge les clés naturelles et empreintes des lignes déjà importées.
+
+        Les pièces présentes dans magasin mais jamais suivies (import complet
+        antérieur) sont rattachées à leur clé, sans empreinte : elles seront
+        mises à jour au lieu d'être dupliquées.
+
+        Returns:
+            Tuple[Dict, Dict]: (ID par clé (PN, Rayonnage, Etagere),
+            ID par empreinte)
+        """
+        with pool.connection(self.db_path) as conn:
+            keys = {
+                (pn, rayonnage, etagere): piece_id
+                for pn, rayonnage, etagere, piece_id in conn.execute(
+                    'SELECT "PN", "Rayonnage", "Etagere", MIN("ID stuff") '
+                    'FROM magasin GROUP BY "PN", "Rayonnage", "Etagere"'
+                )
+            }
+            fingerprints = {}
+            for pn, rayonnage, etagere, piece_id, fingerprint in conn.execute(
+                'SELECT "PN", "Rayonnage", "Etagere", "ID stuff", "fingerprint" '
+                'FROM magasin_import_keys'
+            ):
+                keys[(pn, rayonnage, etagere)] = piece_id
+                if fingerprint:
+                    fingerprints[fingerprint] = piece_id
+        return keys, fingerprints
+
+    def _apply_changes(
+        self,
+        cursor: sqlite3.Cursor,
+        new: List[Tuple[PreparedRow, str]],
+        changed: List[Tuple[int, PreparedRow, str]]
+    ) -> Tuple[List[int], int]:
+        """Insère les nouvelles lignes, met à jour les lignes modifiées et
+        enregistre leurs clés dans la transaction courante.
+
+        Args:
+            cursor: Curseur de la transaction
+            new: Lignes nouvelles et leur empreinte
+            changed: Lignes modifiées (ID de la pièce, ligne, empreinte)
+
+        Returns:
+            Tuple[List[int], int]: (IDs des nouvelles pièces, liens insérés)
+        """
+        new_rows = [row for row, _ in new]
+        new_ids = self._insert_chunk(cursor, new_rows) if new_rows else []
+
+        changed_ids = [piece_id for piece_id, _, _ in changed]
+        changed_rows = [row for _, row, _ in changed]
+        if changed:
+            cursor.executemany(
+                UPDATE_MATERIAL_SQL,
+                [
+                    tuple(values[index] for index in UPDATE_INDEXES) + (piece_id,)
+                    for piece_id, (_, values, _, _), _ in changed
+                ]
+            )
+            cursor.executemany(
+                'DELETE FROM planes_magasin WHERE "ID stuff" = ?',
+                [(piece_id,) for piece_id in changed_ids]
+            )
+        links = self._link_planes(cursor, new_ids + changed_ids, new_rows + changed_rows)
+
+        cursor.executemany(UPSERT_IMPORT_KEY_SQL, [
+            (values[5], values[1], values[2], piece_id, fingerprint)
+            for piece_id, (_, values, _, _), fingerprint in (
+                [(piece_id, row, fp) for piece_id, (row, fp) in zip(new_ids, new)] + changed
+            )
+        ])
+        return new_ids, links
+
+    def _flush_changes(
+        self,
+        new: List[Tuple[PreparedRow, str]],
+        changed: List[Tuple[int, PreparedRow, str]],
+        source: str
+    ) -> List[int]:
+        """Écrit les changements d'un lot dans sa propre transaction.
+
+        Si SQLite refuse une ligne, le lot est rejoué ligne par ligne afin
+        de n'écarter que les lignes fautives.
+
+        Args:
+            new: Lignes nouvelles et leur empreinte
+            changed: Lignes modifiées (ID de la pièce, ligne, empreinte)
+            source: Fichier d'origine du lot
+
+        Returns:
+            List[int]: IDs des nouvelles pièces (None pour une ligne refusée)
+        """
+        if not new and not changed:
+            return []
+        try:
+            with pool.connection(self.db_path) as conn:
+                new_ids, links = self._apply_changes(conn.cursor(), new, changed)
+            self.inserted += len(new_ids)
+            self.updated += len(changed)
+            self.links += links
+            self.chunks += 1
+            return new_ids
+        except sqlite3.IntegrityError:
+            pass
+
+        new_ids = []
+        with pool.connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            items = [([item], []) for item in new] + [([], [item]) for item in changed]
+            for item_new, item_changed in items:
+                row = item_new[0][0] if item_new else item_changed[0][1]
+                try:
+                    cursor.execute("SAVEPOINT bulk_row")
+                    ids, links = self._apply_changes(cursor, item_new, item_changed)
+                    cursor.execute("RELEASE SAVEPOINT bulk_row")
+                except sqlite3.IntegrityError as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                    cursor.execute("RELEASE SAVEPOINT bulk_row")
+                    self.reject(row[0], f"Erreur d'intégrité : {str(e)}", row[3], source)
+                    if item_new:
+                        new_ids.append(None)
+                    continue
+                new_ids.extend(ids)
+                self.inserted += len(ids)
+                self.updated += len(item_changed)
+                self.links += links
+        self.chunks += 1
+        return new_ids
+
+    def import_incremental(
+        self,
+        materials: Iterable[Tuple[int, Dict[str, Any]]],
+        source_path: Optional[str] = None,
+        date: Optional[str] = None,
+        force: bool = False
+    ) -> ImportReport:
+        """Réimporte des matériels en n'écrivant que les lignes modifiées.
+
+        Chaque ligne est identifiée par sa clé naturelle (PN, Rayonnage,
+        Etagere) et comparée à l'empreinte de sa version précédente : les
+        lignes inchangées sont ignorées, les lignes modifiées sont mises à
+        jour (hors quantité en stock) et les nouvelles insérées. Un fichier dont l'empreinte n'a pas
+        changé depuis le dernier import n'est pas relu. Les pièces absentes
+        du fichier ne sont pas supprimées.
+
+        Args:
+            materials: Couples (numéro de ligne, données du matériel) ; la
+                clé "fingerprint" des données, si présente, remplace
+                l'empreinte calculée par material_fingerprint
+            source_path: Fichier d'origine, dont l'empreinte est enregistrée
+            date: Date d'ajout des nouvelles lignes (aujourd'hui si None)
+            force: Si True, relit le fichier même s'il n'a pas changé
+
+        Returns:
+            ImportReport: Bilan de l'import
+        """
+        start = time.perf_counter()
+        numero, plane_names = self._prepare(date)
+        source = source_path or ""
+
+        file_hash = file_sha256(source_path) if source_path else None
+        if file_hash and not force and self._file_already_imported(source_path, file_hash):
+            print(f"Fichier inchangé depuis le dernier import : {source_path}")
+            return self._report(start)
+
+        keys, fingerprints = self._load_import_keys()
+        seen = set()
+        for chunk in _chunks(materials, self.chunk_size):
+            valid, rejects = validate_chunk(chunk, numero, plane_names)
+            for line, reason, material in rejects:
+                self.reject(line, reason, material, source)
+
+            new = []
+            changed = []
+            for row in valid:
+                line, values, _, material = row
+                key = (values[5], values[1], values[2])
+                if key in seen:
+                    self.reject(
+                        line, "Clé (PN, Rayonnage, Etagere) en double dans le fichier",
+                        material, source
+                    )
+                    continue
+                seen.add(key)
+
+                fingerprint = material.get("fingerprint") or material_fingerprint(material)
+                piece_id = keys.get(key)
+                if piece_id is None:
+                    new.append((row, fingerprint))
+                elif fingerprints.get(fingerprint) == piece_id:
+                    self.unchanged += 1
+                else:
+                    changed.append((piece_id, row, fingerprint))
+
+            new_ids = self._flush_changes(new, changed, source)
+            for piece_id, ((_, values, _, _), fingerprint) in zip(new_ids, new):
+                if piece_id is not None:
+                    keys[(values[5], values[1], values[2])] = piece_id
+                    fingerprints[fingerprint] = piece_id
+            for piece_id, _, fingerprint in changed:
+                fingerprints[fingerprint] = piece_id
+
+        if file_hash:
+            with pool.connection(self.db_path) as conn:
+                conn.execute(UPSERT_IMPORT_FILE_SQL, (os.path.abspath(source_path), file_hash))
+        return self._report(start)
+
+    def _file_already_imported(self, file_path: str, file_hash: str) -> bool:
+        """Indique si un fichier identique a déjà été importé dans cette base.
+
+        Args:
+            file_path: Chemin du fichier
+            file_hash: Empreinte SHA-256 du fichier
+
+        Returns:
+            bool: True si l'empreinte enregistrée est identique
+        """
+        with pool.connection(self.db_path) as conn:
+            row = conn.execute(
+                'SELECT "sha256" FROM import_files WHERE "path" = ?',
+                (os.path.abspath(file_path),)
+            ).fetchone()
+            tracked = conn.execute("SELECT 1 FROM magasin_import_keys LIMIT 1").fetchone()
+        return row is not None and row[0] == file_hash and tracked is not None
+
+    def write_rejects(self) -> Optional[str]:
+        """Écrit le rapport CSV des lignes refusées.
+
+        Returns:
+            Optional[str]: Chemin du rapport, ou None s'il n'y a rien à écrire
+        """
+        if not self.rejects or not self.rejects_path:
+            return None
+        try:
+            with open(self.rejects_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerow(
+                    ["fichier", "ligne", "motif", "description", "pn", "rayonnage", "etagere"]
+                )
+                for source, line, reason, material in sorted(self.rejects, key=lambda r: r[:2]):
+                    writer.writerow([
+                        source, line, reason,
+                        material.get("description", ""), material.get("pn", ""),
+                        material.get("rayonnage", ""), material.get("etagere", "")
+                    ])
+            return self.rejects_path
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du rapport des rejets : {str(e)}")
+            return None
+
+
+def validate_only(
+    materials: Iterable[Tuple[int, Dict[str, Any]]],
+    plane_names: Optional[Iterable[str]] = None,
+    examples: int = DRY_RUN_EXAMPLES,
+    date: Optional[str] = None
+) -> Dict[str, Any]:
+    """Valide des matériels sans rien écrire dans la base (mode --dry-run).
+
+    Les règles sont exactement celles de l'import (validate_chunk), plus la
+    détection des clés (PN, Rayonnage, Etagere) en double dans la source.
+
+    Args:
+        materials: Couples (numéro de ligne, données du matériel)
+        plane_names: Avions connus (lus dans la base si None)
+        examples: Nombre d'exemples conservés par type d'erreur
+        date: Date d'ajout utilisée pour le numéro (aujourd'hui si None)
+
+    Returns:
+        Dict[str, Any]: Synthèse avec les clés total, valid, rejected,
+        errors (nombre par motif), examples (premières lignes par motif),
+        columns (statistiques par colonne) et elapsed
+    """
+    start = time.perf_counter()
+    if plane_names is None:
+        try:
+            plane_names = BulkImporter().resolve_planes()
+        except sqlite3.Error as e:
+            print(f"Avions lus dans la base indisponibles, avions par défaut utilisés : {str(e)}")
+            plane_names = IMPORT_PLANES
+    plane_names = frozenset(plane_names)
+    numero = numero_for_date(date or datetime.now().strftime("%Y-%m-%d"))
+
+    errors = Counter()
+    error_examples: Dict[str, List[Tuple[int, str]]] = {}
+    columns: Dict[str, Dict[str, Any]] = {}
+    seen_keys = set()
+    total = 0
+    valid_count = 0
+
+    def record(line: int, reason: str, material: Dict[str, Any]) -> None:
+        # Les motifs variables (avions inconnus) sont regroupés par type
+        kind = reason.split(" : ")[0]
+        errors[kind] += 1
+        kept = error_examples.setdefault(kind, [])
+        if len(kept) < examples:
+            kept.append((line, f"{reason} — {material.get('description', '')!s:.60}"))
+
+    for chunk in _chunks(materials, DEFAULT_CHUNK_SIZE):
+        total += len(chunk)
+        for _, material in chunk:
+            _update_column_stats(columns, material)
+
+        valid, rejects = validate_chunk(chunk, numero, plane_names)
+        for line, reason, material in rejects:
+            record(line, reason, material)
+        for line, values, _, material in valid:
+            key = (values[5], values[1], values[2])
+            if key in seen_keys:
+                record(line, "Clé (PN, Rayonnage, Etagere) en double dans le fichier", material)
+                continue
+            seen_keys.add(key)
+            valid_count += 1
+
+    for stats in columns.values():
+        stats.pop("_distinct", None)
+    return {
+        "total": total,
+        "valid": valid_count,
+        "rejected": total - valid_count,
+        "errors": dict(errors.most_common()),
+        "examples": error_examples,
+        "columns": columns,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def _update_column_stats(columns: Dict[str, Dict[str, Any]], material: Dict[str, Any]) -> None:
+    """Met à jour les statistiques par colonne avec un matériel.
+
+    Args:
+        columns: Statistiques en cours, modifiées sur place
+        material: Données du matériel
+    """
+    for key, value in material.items():
+        if key == "fingerprint":
+            continue
+        stats = columns.setdefault(key, {"filled": 0, "empty": 0})
+        if value in ("", None) or value == []:
+            stats["empty"] += 1
+            continue
+        stats["filled"] += 1
+        if isinstance(value, bool):
+            stats["true"] = stats.get("true", 0) + int(value)
+        elif isinstance(value, (int, float)):
+            stats["min"] = min(stats.get("min", value), value)
+            stats["max"] = max(stats.get("max", value), value)
+        elif isinstance(value, str):
+            stats["max_length"] = max(stats.get("max_length", 0), len(value))
+            distinct = stats.setdefault("_distinct", set())
+            if len(distinct) < DRY_RUN_MAX_DISTINCT:
+                distinct.add(value)
+            stats["distinct"] = len(distinct)
+
+
+def format_validation_summary(summary: Dict[str, Any]) -> str:
+    """Met en forme la synthèse produite par validate_only.
+
+    Args:
+        summary: Synthèse de validation
+
+    Returns:
+        str: Texte du rapport
+    """
+    lines = [
+        f"Lignes analysées : {summary['total']} ({summary['elapsed']:.2f} s)",
+        f"Lignes valides : {summary['valid']}",
+        f"Lignes refusées : {summary['rejected']}"
+    ]
+    if summary["errors"]:
+        lines.append("\nErreurs par type :")
+        for kind, count in summary["errors"].items():
+            lines.append(f"  {count:>6}  {kind}")
+            for line, detail in summary["examples"].get(kind, []):
+                lines.append(f"          ligne {line} : {detail}")
+
+    lines.append("\nColonnes :")
+    for name, stats in summary["columns"].items():
+        details = [f"{stats['filled']} remplie(s)", f"{stats['empty']} vide(s)"]
+        if "min" in stats:
+            details.append(f"min {stats['min']}, max {stats['max']}")
+        if "true" in stats:
+            details.append(f"{stats['true']} coché(s)")
+        if "max_length" in stats:
+            distinct = stats["distinct"]
+            suffix = "+" if distinct >= DRY_RUN_MAX_DISTINCT else ""
+            details.append(f"{distinct}{suffix} valeur(s) distincte(s), {stats['max_length']} car. max")
+        lines.append(f"  {name} : " + ", ".join(details))
+    return "\n".join(lines)
+
+
+def default_rejects_path(source_path: str) -> str:
+    """Retourne le chemin du rapport de rejets associé à un fichier source.
+
+    Args:
+        source_path: Fichier importé
+
+    Returns:
+        str: Chemin du rapport (même dossier, suffixe _rejets.csv)
+    """
+    base, _ = os.path.splitext(source_path)
+    return f"{base}_rejets.csv"
+
+
+def synthetic_materials(count: int) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    """Génère des matériels fictifs pour les mesures de performance.
+
+    Args:
+        count: Nombre de lignes à générer
+
+    Yields:
+        Tuple[int, Dict[str, Any]]: (numéro de ligne, données du matériel)
+    """
+    for i in range(count):
+        yield i + 2, {
+            "rayonnage": f"R{i % 40}",
+            "etagere": f"E{i % 7}",
+            "description": f"Piece de test {i}",
+            "providers": "Fournisseur",
+            "pn": f"PN-{i:07d}",
+            "order": "0",
+            "quantity": i % 100,
+            "minimum": i % 10,
+            "h50": i % 2 == 0,
+            "h100": i % 3 == 0,
+            "h200": False,
+            "providers_actf": "",
+            "cost": float(i % 500),
+            "stock": float((i % 500) * (i % 100)),
+            "remarks": "",
+            "planes": list(IMPORT_PLANES[: i % 3])
+        }
+
+
+def benchmark(
+    rows: int = BENCHMARK_ROWS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1
+) -> ImportReport:
+    """Mesure l'import de lignes synthétiques dans une base temporaire.
+
+    Args:
+        rows: Nombre de lignes importées
+        chunk_size: Nombre de lignes par transaction
+        workers: Nombre de processus de validation
+
+    Returns:
+        ImportReport: Bilan de l'import
+    """
+    from ressources.init_bd import init_db
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "benchmark.db")
+        try:
+            init_db(db_path)
+            with pool.connection(db_path) as conn:
+                conn.executemany(
+                    'INSERT INTO planes ("name") VALUES (?)',
+                    [(name,) for name in IMPORT_PLANES]
+                )
+            importer = BulkImporter(chunk_size=chunk_size, db_path=db_path)
+            report = importer.import_materials(synthetic_materials(rows), workers=workers)
+        finally:
+            pool.close_all()
+
+    print(
+        f"{report.inserted} lignes importées en {report.elapsed:.2f} s "
+        f"({report.inserted / max(report.elapsed, 1e-9):.0f} lignes/s, "
+        f"{report.chunks} transaction(s), {report.links} lien(s) avion)"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import en masse du matériel")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=BENCHMARK_ROWS,
+                        help="Mesure l'import de N lignes synthétiques")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de processus de validation")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.chunk_size, args.workers)
+    else:
+        parser.print_help()
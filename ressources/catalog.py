@@ -0,0 +1,696 @@
+"""
+Module du catalogue magasin en mémoire.
+
+Ce module charge une seule fois les tables magasin, planes et planes_magasin
+dans des tableaux NumPy par colonne. Le catalogue se met à jour de façon
+incrémentale lorsque la base change (PRAGMA data_version, journal
+magasin_changes) et peut être enregistré sur disque sous forme de fichiers
+.npy ouverts en mémoire projetée (mmap) pour un démarrage à chaud immédiat. Les filtres, tris et
+agrégats de l'interface et des rapports s'exécutent ensuite en mémoire.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Ajout du chemin parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ressources.pool_bd import pool, RESOURCES_PATH
+from ressources.init_bd import CHANGE_TABLE
+from ressources.request_bd import (
+    MATERIAL_COLUMNS, MATERIAL_FIELDS, MATERIAL_SELECT, MaterialRecord
+)
+
+# Répertoire par défaut de l'instantané du catalogue
+DEFAULT_SNAPSHOT_PATH = os.path.join(RESOURCES_PATH, "catalog_snapshot")
+
+# Version du format de l'instantané
+SNAPSHOT_VERSION = 3
+
+# Chaque enregistrement crée un répertoire "snapshot-..." ; le fichier
+# CURRENT contient le nom du répertoire valide
+SNAPSHOT_PREFIX = "snapshot-"
+POINTER_FILE = "CURRENT"
+
+# Type NumPy des colonnes numériques (les autres colonnes sont du texte)
+COLUMN_DTYPES = {
+    "ID stuff": np.int64,
+    "Quantity": np.int64,
+    "Minimum": np.int64,
+    "50H": np.int8,
+    "100H": np.int8,
+    "200H_ou_annuelle": np.int8,
+    "Cost_Estimate": np.float64,
+    "Stock_Estimate_HT": np.float64
+}
+
+# Colonnes dans lesquelles porte la recherche textuelle
+TEXT_SEARCH_COLUMNS = ("Description", "PN", "Providers")
+
+# Nom de fichier de chaque colonne dans l'instantané
+_FILE_NAMES = dict(zip(MATERIAL_COLUMNS, MATERIAL_FIELDS))
+
+# Nom de fichier du masque des NULL de chaque colonne numérique
+_NULL_FILE_NAMES = {column: f"{_FILE_NAMES[column]}_null" for column in COLUMN_DTYPES}
+
+# Tableaux des avions et des liaisons enregistrés avec les colonnes
+_EXTRA_ARRAYS = ("plane_ids", "plane_names", "link_stuff", "link_plane")
+
+
+def _column_array(column: str, values: Sequence[Any]) -> np.ndarray:
+    """Convertit les valeurs d'une colonne en tableau NumPy typé.
+
+    Les valeurs NULL sont ramenées à 0 (colonnes numériques) ou à ""
+    (colonnes texte) ; _null_mask conserve leur position pour les colonnes
+    numériques.
+
+    Args:
+        column: Nom de la colonne magasin
+        values: Valeurs lues dans la base
+
+    Returns:
+        np.ndarray: Tableau de la colonne
+    """
+    dtype = COLUMN_DTYPES.get(column)
+    if dtype is None:
+        return np.array(["" if value is None else str(value) for value in values], dtype=str)
+    return np.array([value or 0 for value in values], dtype=dtype)
+
+
+def _null_mask(values: Sequence[Any]) -> np.ndarray:
+    """Retourne le masque des valeurs NULL d'une colonne."""
+    return np.array([value is None for value in values], dtype=bool)
+
+
+def _writable(array: np.ndarray) -> np.ndarray:
+    """Retourne une copie modifiable d'un tableau projeté en lecture seule."""
+    return array if array.flags.writeable else np.array(array)
+
+
+class MaterialCatalog:
+    """Catalogue magasin chargé en mémoire, stocké par colonnes.
+
+    Les lignes sont triées par "ID stuff". Un appel à refresh() avant chaque
+    lecture suffit à garder le catalogue à jour : tant que la base n'a pas
+    changé, il ne coûte qu'un PRAGMA.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        snapshot_path: str = DEFAULT_SNAPSHOT_PATH
+    ) -> None:
+        """Initialise un catalogue vide.
+
+        L'attribut version augmente à chaque modification du contenu ;
+        column_version() fait de même colonne par colonne. Les vues dérivées
+        (listes de complétion, graphiques) s'en servent pour savoir si elles
+        doivent être reconstruites.
+
+        Args:
+            db_path: Chemin de la base (base par défaut du pool si None)
+            snapshot_path: Répertoire de l'instantané sur disque
+        """
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._columns: Dict[str, np.ndarray] = {}
+        self._nulls: Dict[str, np.ndarray] = {}
+        self.plane_ids = np.zeros(0, dtype=np.int64)
+        self.plane_names = np.zeros(0, dtype=str)
+        self.link_stuff = np.zeros(0, dtype=np.int64)
+        self.link_plane = np.zeros(0, dtype=np.int64)
+        self._watermark: Optional[int] = None  # Dernier numéro lu dans magasin_changes
+        self._planes_signature: Optional[list] = None
+        self._links_signature: Optional[list] = None
+        self._version_tokens: Dict[int, tuple] = {}
+        self._loaded = False
+        self.version = 0
+        self._column_versions = dict.fromkeys(MATERIAL_COLUMNS, 0)
+        self._stats = {"full_loads": 0, "incremental": 0, "snapshot_loads": 0, "skipped": 0}
+
+    def __len__(self) -> int:
+        """Retourne le nombre de matériels du catalogue."""
+        ids = self._columns.get("ID stuff")
+        return 0 if ids is None else len(ids)
+
+    def column_version(self, column: str) -> int:
+        """Retourne le numéro de version d'une colonne magasin.
+
+        Args:
+            column: Nom de la colonne (voir MATERIAL_COLUMNS)
+
+        Returns:
+            int: Numéro augmenté à chaque modification de la colonne
+        """
+        self.refresh()
+        return self._column_versions[column]
+
+    def _touch(self, columns: Sequence[str]) -> None:
+        """Signale la modification de colonnes magasin."""
+        for column in columns:
+            self._column_versions[column] += 1
+        self.version += 1
+
+    def column(self, column: str) -> np.ndarray:
+        """Retourne le tableau d'une colonne magasin.
+
+        Args:
+            column: Nom de la colonne (voir MATERIAL_COLUMNS)
+
+        Returns:
+            np.ndarray: Valeurs de la colonne, dans l'ordre des ID
+
+        Raises:
+            KeyError: Si la colonne n'existe pas
+        """
+        self.refresh()
+        return self._columns[column]
+
+    # ----------------------------------------------------------------------
+    # Chargement et mise à jour
+    # ----------------------------------------------------------------------
+
+    def _version(self, conn: sqlite3.Connection) -> tuple:
+        """Jeton de version de la base pour la connexion du thread courant.
+
+        PRAGMA data_version change quand une autre connexion valide une
+        écriture ; total_changes couvre les écritures de cette connexion.
+        Chaque thread ayant sa propre connexion, un jeton est gardé par thread.
+        """
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return (data_version, conn.total_changes)
+
+    @staticmethod
+    def _planes_signature_of(cursor: sqlite3.Cursor) -> Tuple[list, list]:
+        """Calcule les signatures des tables planes et planes_magasin."""
+        cursor.execute('SELECT COUNT(*), MAX("ID plane"), TOTAL(length("name")) FROM planes')
+        planes = list(cursor.fetchone())
+        cursor.execute(
+            'SELECT COUNT(*), TOTAL("ID stuff"), TOTAL("ID plane") FROM planes_magasin'
+        )
+        links = list(cursor.fetchone())
+        return planes, links
+
+    def _load_planes(self, cursor: sqlite3.Cursor) -> None:
+        """Recharge entièrement les avions et les liaisons matériel/avion."""
+        cursor.execute('SELECT "ID plane", "name" FROM planes ORDER BY "ID plane"')
+        rows = cursor.fetchall()
+        self.plane_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.plane_names = np.array([row[1] for row in rows], dtype=str)
+
+        cursor.execute('SELECT "ID stuff", "ID plane" FROM planes_magasin')
+        rows = cursor.fetchall()
+        self.link_stuff = np.array([row[0] for row in rows], dtype=np.int64)
+        self.link_plane = np.array([row[1] for row in rows], dtype=np.int64)
+        self.version += 1
+
+    def _load_all(self, cursor: sqlite3.Cursor) -> None:
+        """Recharge entièrement la table magasin."""
+        cursor.execute(f'SELECT {MATERIAL_SELECT} FROM magasin ORDER BY "ID stuff"')
+        rows = cursor.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * len(MATERIAL_COLUMNS)
+        self._columns = {
+            column: _column_array(column, values)
+            for column, values in zip(MATERIAL_COLUMNS, columns)
+        }
+        self._nulls = {
+            column: _null_mask(values)
+            for column, values in zip(MATERIAL_COLUMNS, columns)
+            if column in COLUMN_DTYPES
+        }
+        self._touch(MATERIAL_COLUMNS)
+        self._stats["full_loads"] += 1
+
+    def _merge_rows(self, rows: List[tuple]) -> None:
+        """Intègre des lignes modifiées ou nouvelles dans les colonnes.
+
+        Args:
+            rows: Lignes de magasin (colonnes de MATERIAL_COLUMNS)
+        """
+        ids = self._columns["ID stuff"]
+        changed = list(zip(*rows))
+        new_ids = np.array(changed[0], dtype=np.int64)
+        positions = np.searchsorted(ids, new_ids)
+        known = positions < len(ids)
+        known[known] = ids[positions[known]] == new_ids[known]
+
+        if not known.all():
+            # Les nouveaux ID sont ajoutés puis les colonnes retriées
+            order = None
+            for column, values in zip(MATERIAL_COLUMNS, changed):
+                added_values = [v for v, k in zip(values, known) if not k]
+                merged = np.concatenate([self._columns[column], _column_array(column, added_values)])
+                if order is None:
+                    order = np.argsort(merged, kind="stable")
+                self._columns[column] = merged[order]
+                if column in self._nulls:
+                    nulls = np.concatenate([self._nulls[column], _null_mask(added_values)])
+                    self._nulls[column] = nulls[order]
+            self._touch(MATERIAL_COLUMNS)
+            if known.any():
+                self._merge_rows([row for row, k in zip(rows, known) if k])
+            return
+
+        for column, values in zip(MATERIAL_COLUMNS, changed):
+            updated = _column_array(column, values)
+            if column in self._nulls:
+                updated_nulls = _null_mask(values)
+                if not np.array_equal(self._nulls[column][positions], updated_nulls):
+                    nulls = _writable(self._nulls[column])
+                    nulls[positions] = updated_nulls
+                    self._nulls[column] = nulls
+                    self._touch((column,))
+            if np.array_equal(self._columns[column][positions], updated):
+                # Colonne inchangée : le tableau projeté est conservé tel quel
+                continue
+            current = _writable(self._columns[column])
+            if current.dtype != updated.dtype:
+                # Élargit les colonnes texte si une valeur est plus longue
+                dtype = np.result_type(current.dtype, updated.dtype)
+                if dtype != current.dtype:
+                    current = current.astype(dtype)
+            current[positions] = updated
+            self._columns[column] = current
+            self._touch((column,))
+
+    def _refresh_magasin(self, cursor: sqlite3.Cursor) -> None:
+        """Met à jour la table magasin depuis le dernier rafraîchissement.
+
+        Seules les pièces inscrites au journal magasin_changes avec un numéro
+        supérieur au dernier vu sont relues. Ce numéro, attribué par trigger,
+        ne dépend pas de l'horloge du poste qui a écrit. Une suppression se
+        traduit par un nombre de lignes différent et force un rechargement,
+        comme un journal recréé (numéro en recul) ou absent.
+        """
+        if not self._loaded or self._watermark is None:
+            self._load_all(cursor)
+        else:
+            try:
+                cursor.execute(
+                    f'SELECT {MATERIAL_SELECT} FROM magasin WHERE "ID stuff" IN '
+                    f'(SELECT "ID stuff" FROM {CHANGE_TABLE} WHERE "seq" > ?) ORDER BY "ID stuff"',
+                    (self._watermark,)
+                )
+                rows = cursor.fetchall()
+                if rows:
+                    self._merge_rows(rows)
+                self._stats["incremental"] += 1
+            except sqlite3.OperationalError:
+                # Base initialisée sans journal des modifications
+                self._load_all(cursor)
+
+        try:
+            cursor.execute(f'SELECT COALESCE(MAX("seq"), 0) FROM {CHANGE_TABLE}')
+            watermark = cursor.fetchone()[0]
+        except sqlite3.OperationalError:
+            watermark = None
+        cursor.execute('SELECT COUNT(*) FROM magasin')
+        count = cursor.fetchone()[0]
+        if count != len(self) or (
+                watermark is not None and self._watermark is not None and watermark < self._watermark):
+            self._load_all(cursor)
+        self._watermark = watermark
+
+    def refresh(self, force: bool = False) -> bool:
+        """Met le catalogue à jour si la base a changé.
+
+        Args:
+            force: Recharge entièrement le catalogue
+
+        Returns:
+            bool: True si le catalogue a été relu, False s'il était à jour
+        """
+        with self._lock:
+            try:
+                with pool.connection(self.db_path) as conn:
+                    token = self._version(conn)
+                    thread_id = threading.get_ident()
+                    if self._loaded and not force and token == self._version_tokens.get(thread_id):
+                        self._stats["skipped"] += 1
+                        return False
+
+                    if force:
+                        self._loaded = False
+
+                    cursor = conn.cursor()
+                    self._refresh_magasin(cursor)
+
+                    planes, links = self._planes_signature_of(cursor)
+                    if (not self._loaded or planes != self._planes_signature
+                            or links != self._links_signature):
+                        self._load_planes(cursor)
+                        self._planes_signature = planes
+                        self._links_signature = links
+
+                    self._loaded = True
+                    self._version_tokens[thread_id] = self._version(conn)
+                    return True
+
+            except sqlite3.Error as e:
+                print(f"Erreur lors du chargement du catalogue : {str(e)}")
+                return False
+
+    # ----------------------------------------------------------------------
+    # Instantané sur disque
+    # ----------------------------------------------------------------------
+
+    def save_snapshot(self, path: Optional[str] = None) -> bool:
+        """Enregistre le catalogue sur disque, une colonne par fichier .npy.
+
+        Les fichiers sont écrits dans un nouveau répertoire, puis le fichier
+        CURRENT est remplacé pour le désigner. Les fichiers d'un instantané
+        ouvert en mémoire projetée ne sont donc jamais remplacés (ce que
+        Windows refuse) ; les anciens répertoires sont supprimés quand ils ne
+        sont plus ouverts.
+
+        Args:
+            path: Répertoire de l'instantané (snapshot_path si None)
+
+        Returns:
+            bool: True si l'enregistrement est réussi, False sinon
+        """
+        path = path or self.snapshot_path
+        with self._lock:
+            if not self._loaded:
+                self.refresh()
+            try:
+                name = f"{SNAPSHOT_PREFIX}{time.time_ns()}-{os.getpid()}"
+                directory = os.path.join(path, name)
+                os.makedirs(directory)
+
+                arrays = {_FILE_NAMES[column]: array for column, array in self._columns.items()}
+                for column, nulls in self._nulls.items():
+                    arrays[_NULL_FILE_NAMES[column]] = nulls
+                for array_name in _EXTRA_ARRAYS:
+                    arrays[array_name] = getattr(self, array_name)
+
+                for array_name, array in arrays.items():
+                    with open(os.path.join(directory, f"{array_name}.npy"), "wb") as f:
+                        np.save(f, np.asarray(array))
+
+                meta = {
+                    "version": SNAPSHOT_VERSION,
+                    "rows": len(self),
+                    "watermark": self._watermark,
+                    "planes_signature": self._planes_signature,
+                    "links_signature": self._links_signature
+                }
+                with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+
+                pointer_path = os.path.join(path, POINTER_FILE)
+                with open(pointer_path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(name)
+                os.replace(pointer_path + ".tmp", pointer_path)
+
+            except OSError as e:
+                print(f"Erreur lors de l'enregistrement du catalogue : {str(e)}")
+                return False
+
+        self._remove_old_snapshots(path, name)
+        return True
+
+    @staticmethod
+    def _remove_old_snapshots(path: str, current: str) -> None:
+        """Supprime les instantanés remplacés et les fichiers de l'ancien format.
+
+        Un répertoire encore ouvert en mémoire projetée (Windows) est laissé
+        en place et sera supprimé lors d'un prochain enregistrement.
+
+        Args:
+            path: Répertoire des instantanés
+            current: Nom du répertoire à conserver
+        """
+        for entry in os.listdir(path):
+            entry_path = os.path.join(path, entry)
+            if entry.startswith(SNAPSHOT_PREFIX) and entry != current:
+                shutil.rmtree(entry_path, ignore_errors=True)
+            elif entry.endswith(".npy") or entry == "meta.json":
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
+
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """Charge un instantané en mémoire projetée puis applique les écarts.
+
+        Les colonnes sont ouvertes en lecture seule (mmap) : seules les pages
+        réellement lues sont chargées. Les lignes modifiées depuis
+        l'instantané sont ensuite relues depuis la base.
+
+        Args:
+            path: Répertoire de l'instantané (snapshot_path si None)
+
+        Returns:
+            bool: True si l'instantané est chargé, False s'il est absent ou invalide
+        """
+        path = path or self.snapshot_path
+        pointer_path = os.path.join(path, POINTER_FILE)
+        if not os.path.exists(pointer_path):
+            return False
+
+        with self._lock:
+            try:
+                with open(pointer_path, encoding="utf-8") as f:
+                    path = os.path.join(path, f.read().strip())
+                with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("version") != SNAPSHOT_VERSION:
+                    return False
+
+                arrays = {}
+                names = list(MATERIAL_FIELDS) + list(_NULL_FILE_NAMES.values()) + list(_EXTRA_ARRAYS)
+                for name in names:
+                    arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+                columns = list(MATERIAL_FIELDS) + list(_NULL_FILE_NAMES.values())
+                if any(len(arrays[name]) != meta["rows"] for name in columns):
+                    print("Instantané du catalogue incohérent : rechargement complet")
+                    return False
+
+                self._columns = {column: arrays[_FILE_NAMES[column]] for column in MATERIAL_COLUMNS}
+                self._nulls = {column: arrays[name] for column, name in _NULL_FILE_NAMES.items()}
+                for name in _EXTRA_ARRAYS:
+                    setattr(self, name, arrays[name])
+                self._watermark = meta["watermark"]
+                self._planes_signature = meta["planes_signature"]
+                self._links_signature = meta["links_signature"]
+                self._loaded = True
+                self._version_tokens = {}
+                self._touch(MATERIAL_COLUMNS)
+                self._stats["snapshot_loads"] += 1
+
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Erreur lors du chargement de l'instantané : {str(e)}")
+                return False
+
+        self.refresh()
+        return True
+
+    def warm_start(self) -> bool:
+        """Charge l'instantané s'il existe, sinon la base complète.
+
+        Returns:
+            bool: True si le catalogue est chargé
+        """
+        return self.load_snapshot() or self.refresh(force=True)
+
+    # ----------------------------------------------------------------------
+    # Filtres, tris et agrégats
+    # ----------------------------------------------------------------------
+
+    def material_choices(self) -> List[Tuple[int, str, str]]:
+        """Liste les matériels décrits, triés par description puis par ID.
+
+        Returns:
+            List[Tuple[int, str, str]]: Triplets (ID, description, PN)
+        """
+        self.refresh()
+        ids = self._columns["ID stuff"]
+        descriptions = self._columns["Description"]
+        selected = np.flatnonzero(descriptions != "")
+        order = selected[np.lexsort((ids[selected], descriptions[selected]))]
+        return list(zip(
+            ids[order].tolist(),
+            descriptions[order].tolist(),
+            self._columns["PN"][order].tolist()
+        ))
+
+    def planes(self) -> List[Tuple[str, int]]:
+        """Liste les avions triés par ID.
+
+        Returns:
+            List[Tuple[str, int]]: Couples (nom, ID)
+        """
+        self.refresh()
+        return list(zip(self.plane_names.tolist(), self.plane_ids.tolist()))
+
+    def _plane_positions(self, plane: str) -> np.ndarray:
+        """Retourne les positions des matériels associés à un avion."""
+        matches = np.flatnonzero(self.plane_names == plane)
+        if not len(matches):
+            return np.zeros(0, dtype=np.int64)
+        stuff = self.link_stuff[self.link_plane == self.plane_ids[matches[0]]]
+        ids = self._columns["ID stuff"]
+        if not len(ids):
+            return np.zeros(0, dtype=np.int64)
+        positions = np.searchsorted(ids, stuff).clip(0, len(ids) - 1)
+        return np.unique(positions[ids[positions] == stuff])
+
+    def filter(
+        self,
+        text: Optional[str] = None,
+        plane: Optional[str] = None,
+        below_minimum: bool = False,
+        maintenance: Optional[str] = None
+    ) -> np.ndarray:
+        """Sélectionne les matériels selon plusieurs critères combinés.
+
+        Args:
+            text: Texte recherché (sans casse) dans la description, le PN
+                et les fournisseurs
+            plane: Nom de l'avion associé
+            below_minimum: Ne garde que les pièces sous le stock minimum
+            maintenance: Colonne de maintenance cochée ("50H", "100H" ou
+                "200H_ou_annuelle")
+
+        Returns:
+            np.ndarray: Positions des matériels retenus, par ID croissant
+
+        Raises:
+            ValueError: Si la colonne de maintenance est inconnue
+        """
+        self.refresh()
+        mask = np.ones(len(self), dtype=bool)
+
+        if text:
+            needle = text.lower()
+            found = np.zeros(len(self), dtype=bool)
+            for column in TEXT_SEARCH_COLUMNS:
+                found |= np.char.find(np.char.lower(self._columns[column]), needle) >= 0
+            mask &= found
+
+        if below_minimum:
+            mask &= self._below_minimum()
+
+        if maintenance is not None:
+            if maintenance not in ("50H", "100H", "200H_ou_annuelle"):
+                raise ValueError(f"Colonne de maintenance inconnue : {maintenance}")
+            mask &= self._columns[maintenance] == 1
+
+        if plane is not None:
+            in_plane = np.zeros(len(self), dtype=bool)
+            in_plane[self._plane_positions(plane)] = True
+            mask &= in_plane
+
+        return np.flatnonzero(mask)
+
+    def sort(
+        self,
+        positions: np.ndarray,
+        column: str,
+        descending: bool = False
+    ) -> np.ndarray:
+        """Trie des positions selon une colonne (ID en départage).
+
+        Args:
+            positions: Positions à trier (résultat de filter())
+            column: Colonne de tri
+            descending: Tri décroissant
+
+        Returns:
+            np.ndarray: Positions triées
+        """
+        self.refresh()
+        keys = self._columns[column][positions]
+        order = np.lexsort((self._columns["ID stuff"][positions], keys))
+        if descending:
+            order = order[::-1]
+        return positions[order]
+
+    def records(self, positions: Sequence[int]) -> List[MaterialRecord]:
+        """Convertit des positions en lignes MaterialRecord.
+
+        Args:
+            positions: Positions des matériels
+
+        Returns:
+            List[MaterialRecord]: Lignes correspondantes
+        """
+        self.refresh()
+        columns = []
+        for column in MATERIAL_COLUMNS:
+            values = self._columns[column][positions].tolist()
+            if column in self._nulls:
+                nulls = self._nulls[column][positions]
+                if nulls.any():
+                    values = [None if null else value for value, null in zip(values, nulls.tolist())]
+            columns.append(values)
+        return [MaterialRecord._make(row) for row in zip(*columns)]
+
+    def _below_minimum(self) -> np.ndarray:
+        """Masque des pièces sous le stock minimum.
+
+        Comme dans la synthèse stats_magasin, une pièce dont la quantité ou
+        le minimum est NULL n'est pas disponible.
+        """
+        known = ~(self._nulls["Quantity"] | self._nulls["Minimum"])
+        return ~(known & (self._columns["Quantity"] >= self._columns["Minimum"]))
+
+    def cost_stats_by_plane(self) -> Dict[str, float]:
+        """Calcule le coût moyen des pièces par avion.
+
+        Les coûts NULL sont ignorés, comme par AVG en SQL.
+
+        Returns:
+            Dict[str, float]: Coût moyen par nom d'avion (avions sans coût
+                renseigné exclus)
+        """
+        self.refresh()
+        ids = self._columns["ID stuff"]
+        if not len(self.link_stuff) or not len(ids):
+            return {}
+
+        positions = np.searchsorted(ids, self.link_stuff).clip(0, len(ids) - 1)
+        plane_positions = np.searchsorted(self.plane_ids, self.link_plane).clip(
+            0, max(len(self.plane_ids) - 1, 0)
+        )
+        valid = (ids[positions] == self.link_stuff) & (self.plane_ids[plane_positions] == self.link_plane)
+        valid &= ~self._nulls["Cost_Estimate"][positions]
+
+        costs = self._columns["Cost_Estimate"][positions[valid]]
+        counts = np.bincount(plane_positions[valid], minlength=len(self.plane_ids))
+        totals = np.bincount(plane_positions[valid], weights=costs, minlength=len(self.plane_ids))
+
+        return {
+            str(self.plane_names[i]): float(totals[i] / counts[i])
+            for i in np.flatnonzero(counts)
+        }
+
+    def availability_ratio(self) -> Dict[str, int]:
+        """Compte les pièces disponibles et sous le stock minimum.
+
+        Returns:
+            Dict[str, int]: Nombre de pièces par statut (statuts vides exclus)
+        """
+        self.refresh()
+        below = int(np.count_nonzero(self._below_minimum()))
+        counts = {"Disponible": len(self) - below, "Sous minimum": below}
+        return {status: count for status, count in counts.items() if count}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs de chargement du catalogue."""
+        return dict(self._stats, rows=len(self))
+
+
+# Instance globale partagée par l'interface et les rapports
+catalog = MaterialCatalog()
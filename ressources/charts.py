@@ -0,0 +1,96 @@
+"""
+Module des graphiques de l'onglet Statistiques.
+
+Ce module fournit un graphique en camembert persistant : la figure, ses axes
+et le canevas Tk sont créés une seule fois, puis redessinés sur place à
+chaque rafraîchissement. Le rendu est ignoré lorsque les données n'ont pas
+changé depuis le dernier affichage. Les figures sont créées sans pyplot, qui
+les conserverait dans son registre global jusqu'à un plt.close explicite.
+"""
+
+import hashlib
+from typing import Any, Dict, Optional, Tuple, Union
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Taille des graphiques (pouces)
+DEFAULT_FIGSIZE = (12, 8)
+
+
+def data_hash(data: Dict[str, Union[float, int]], title: str) -> str:
+    """Calcule l'empreinte des données d'un graphique.
+
+    Args:
+        data: Valeurs par libellé
+        title: Titre du graphique
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    content = repr((title, sorted((str(label), float(value)) for label, value in data.items())))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class CachedPieChart:
+    """Graphique en camembert réutilisable, intégré à un widget Tk."""
+
+    def __init__(self, master: Any, figsize: Tuple[float, float] = DEFAULT_FIGSIZE) -> None:
+        """Crée la figure et son canevas.
+
+        Args:
+            master: Widget parent du canevas
+            figsize: Taille de la figure (pouces)
+        """
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        self.canvas: Optional[FigureCanvasTkAgg] = FigureCanvasTkAgg(self.figure, master=master)
+        self._hash: Optional[str] = None
+
+    @property
+    def widget(self) -> Any:
+        """Widget Tk du canevas."""
+        return self.canvas.get_tk_widget()
+
+    def update(self, data: Dict[str, Union[float, int]], title: str) -> bool:
+        """Redessine le graphique si ses données ont changé.
+
+        Args:
+            data: Valeurs par libellé
+            title: Titre du graphique
+
+        Returns:
+            bool: True si le graphique a été redessiné
+        """
+        if self.canvas is None:
+            return False
+
+        digest = data_hash(data, title)
+        if digest == self._hash:
+            return False
+
+        self.ax.clear()
+        labels = list(data.keys())
+        values = list(data.values())
+
+        if sum(values) > 0:  # Vérifier qu'il y a des données à afficher
+            self.ax.pie(values, labels=labels, autopct='%1.1f%%', textprops={'fontsize': 12})
+            self.ax.set_title(title, pad=20, fontsize=14)
+        else:
+            self.ax.text(0.5, 0.5, "Pas de données", ha='center', va='center', fontsize=14)
+
+        self._hash = digest
+        self.canvas.draw_idle()
+        return True
+
+    def close(self) -> None:
+        """Libère le canevas et le contenu de la figure."""
+        if self.canvas is None:
+            return
+        try:
+            self.canvas.get_tk_widget().destroy()
+        except Exception as e:
+            print(f"Erreur lors de la fermeture du graphique : {str(e)}")
+        self.figure.clear()
+        self.canvas = None
+        self._hash = None
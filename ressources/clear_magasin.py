@@ -1,8 +1,15 @@
 import sqlite3
 import os
+import sys
+
+# Ajout du répertoire parent au path Python pour permettre l'importation des modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ressources.pool_bd import pool
+from ressources.init_bd import LEDGER_TABLES, IMPORT_TRACKING_TABLES
 
 def clear_magasin_table():
     """Vide la table magasin et réinitialise l'auto-increment."""
+    conn = None
     try:
         # Chemin absolu vers le répertoire du projet
         project_path = r"C:\Users\thibd\OneDrive\Projet_python_toussus\V3\toussus_v3"
@@ -17,7 +24,7 @@ def clear_magasin_table():
         print(f"Connexion à la base de données : {db_path}")
         
         # Connexion à la base de données
-        conn = sqlite3.connect(db_path)
+        conn = pool.acquire(db_path)
         cursor = conn.cursor()
         
         # Désactiver les contraintes de clés étrangères temporairement
@@ -31,6 +38,15 @@ def clear_magasin_table():
         cursor.execute("DELETE FROM magasin")
         print("Table magasin vidée")
         
+        # Oublier l'historique des mouvements (les IDs seront réattribués) et
+        # les imports précédents (clés naturelles et empreintes de fichiers)
+        for table in LEDGER_TABLES + IMPORT_TRACKING_TABLES:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            )
+            if cursor.fetchone():
+                cursor.execute(f"DELETE FROM {table}")
+        
         # Réinitialiser l'auto-increment
         cursor.execute("DELETE FROM sqlite_sequence WHERE name='magasin'")
         print("Auto-increment réinitialisé")
@@ -47,9 +63,9 @@ def clear_magasin_table():
         print(f"Erreur lors du nettoyage de la table : {str(e)}")
         
     finally:
-        # Fermer la connexion
+        # Rendre la connexion au pool
         if conn:
-            conn.close()
+            pool.release(conn, db_path)
 
 if __name__ == "__main__":
     clear_magasin_table() 
\ No newline at end of file
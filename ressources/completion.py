@@ -0,0 +1,149 @@
+"""
+Module de complétion des libellés de matériel.
+
+Ce module fournit un index de complétion par préfixe : chaque mot normalisé
+(minuscules, sans accents) de la description et du PN est rangé dans une
+liste triée, parcourue par dichotomie (bisect). Une recherche ne renvoie que
+les meilleures propositions, classées par usage récent puis par ordre
+alphabétique, afin que la liste déroulante reste courte quelle que soit la
+taille du magasin.
+"""
+
+import re
+import heapq
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+# Nombre de propositions affichées dans la liste déroulante
+DEFAULT_LIMIT = 20
+
+# Nombre de pièces récentes prises en compte dans le classement
+RECENT_LIMIT = 50
+
+# Découpage d'un libellé en mots (lettres accentuées comprises)
+WORD_PATTERN = re.compile(r"\w+")
+
+# Borne supérieure des clés commençant par un préfixe donné
+_PREFIX_END = "\uffff"
+
+
+def normalize(text: str) -> str:
+    """Normalise un texte pour la comparaison (minuscules, sans accents).
+
+    Args:
+        text: Texte à normaliser
+
+    Returns:
+        str: Mots du texte normalisés, séparés par une espace
+    """
+    text = text or ""
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(WORD_PATTERN.findall(text.casefold()))
+
+
+class CompletionIndex:
+    """Index de complétion par préfixe sur des libellés.
+
+    Les entrées sont fournies déjà triées dans l'ordre d'affichage souhaité
+    (par description) : la position d'une entrée sert de départage.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, str, str]]) -> None:
+        """Construit l'index.
+
+        Args:
+            entries: Triplets (ID, libellé affiché, texte complémentaire
+                indexé comme le PN)
+        """
+        self.ids: List[int] = []
+        self.labels: List[str] = []
+        self._normalized: List[str] = []
+        self._position_of: Dict[int, int] = {}
+
+        postings: Dict[str, List[int]] = {}
+        for position, (item_id, label, extra) in enumerate(entries):
+            self.ids.append(item_id)
+            self.labels.append(label)
+            self._position_of[item_id] = position
+
+            normalized = normalize(label)
+            self._normalized.append(normalized)
+            for word in set(normalized.split()) | set(normalize(extra).split()):
+                postings.setdefault(word, []).append(position)
+
+        # Mots distincts triés, et pour chacun les positions qui le contiennent
+        self._keys = sorted(postings)
+        self._postings = [postings[key] for key in self._keys]
+
+    def __len__(self) -> int:
+        """Retourne le nombre d'entrées indexées."""
+        return len(self.labels)
+
+    def _prefix_positions(self, prefix: str) -> Set[int]:
+        """Positions des entrées dont un mot commence par le préfixe."""
+        low = bisect_left(self._keys, prefix)
+        high = bisect_left(self._keys, prefix + _PREFIX_END, low)
+        positions = set()
+        for posting in self._postings[low:high]:
+            positions.update(posting)
+        return positions
+
+    def complete(
+        self,
+        text: str,
+        limit: int = DEFAULT_LIMIT,
+        recent: Sequence[int] = ()
+    ) -> List[str]:
+        """Retourne les meilleurs libellés pour le texte saisi.
+
+        Chaque mot saisi doit être le début d'un mot du libellé ou du PN.
+        Les entrées récemment utilisées passent en tête, puis celles dont le
+        libellé commence par le texte saisi, puis l'ordre alphabétique.
+
+        Args:
+            text: Texte saisi dans la liste déroulante
+            limit: Nombre maximum de propositions
+            recent: ID récemment utilisés, du plus récent au plus ancien
+
+        Returns:
+            List[str]: Libellés proposés
+        """
+        rank = {}
+        for item_id in recent:
+            position = self._position_of.get(item_id)
+            if position is not None and position not in rank:
+                rank[position] = len(rank)
+
+        query = normalize(text)
+        if not query:
+            # Sans saisie : les récents, puis le début de la liste
+            positions = sorted(rank, key=rank.get)[:limit]
+            seen = set(positions)
+            for position in range(len(self.labels)):
+                if len(positions) >= limit:
+                    break
+                if position not in seen:
+                    positions.append(position)
+            return [self.labels[position] for position in positions]
+
+        candidates = None
+        for word in query.split():
+            matches = self._prefix_positions(word)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        unranked = len(rank)
+        best = heapq.nsmallest(
+            limit,
+            candidates,
+            key=lambda position: (
+                rank.get(position, unranked),
+                not self._normalized[position].startswith(query),
+                position
+            )
+        )
+        return [self.labels[position] for position in best]
@@ -0,0 +1,212 @@
+"""
+Module du magasin de configuration de l'application.
+
+Ce module fournit un accès unique au fichier config.csv, partagé par les
+préférences de l'interface (allinfos) et par l'envoi des rapports
+(send_mail). Le fichier est lu une seule fois au démarrage ; les lectures
+suivantes se font dans un cache mémoire typé. Les modifications rapprochées
+sont regroupées en une seule écriture, faite dans un fichier temporaire puis
+substituée à l'original (os.replace) : une interruption pendant la
+sauvegarde laisse l'ancien fichier intact.
+"""
+
+import os
+import csv
+import atexit
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Fichier de configuration par défaut
+RESOURCES_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG_PATH = os.path.join(RESOURCES_PATH, "config.csv")
+
+# En-tête du format clé/valeur
+HEADER = ["key", "value"]
+
+# Délai de regroupement des écritures (secondes)
+FLUSH_DELAY = 0.5
+
+# Clés connues, avec leur valeur par défaut (qui en fixe le type)
+DEFAULTS: Dict[str, Any] = {
+    "theme": "dark",
+    "last_plane": "",
+    "last_material": "",
+    "last_quantity": "",
+    "last_date": "",
+    "last_send_date": "",
+    "last_recipient": ""
+}
+
+
+def _parse_bool(text: str) -> bool:
+    """Convertit un texte en booléen ("1", "true", "oui"...)."""
+    return text.strip().lower() in ("1", "true", "vrai", "oui", "yes")
+
+
+# Conversion texte -> valeur selon le type de la valeur par défaut
+PARSERS: Dict[type, Callable[[str], Any]] = {
+    bool: _parse_bool,
+    int: int,
+    float: float,
+    str: str
+}
+
+
+class ConfigStore:
+    """Configuration clé/valeur en mémoire, persistée dans un fichier CSV."""
+
+    def __init__(self, path: str = DEFAULT_CONFIG_PATH, flush_delay: float = FLUSH_DELAY) -> None:
+        """Charge la configuration.
+
+        Args:
+            path: Chemin du fichier de configuration
+            flush_delay: Délai de regroupement des écritures (secondes)
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self._values: Dict[str, Any] = dict(DEFAULTS)
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _convert(key: str, text: str) -> Any:
+        """Convertit une valeur lue dans le type de sa valeur par défaut."""
+        default = DEFAULTS.get(key)
+        parser = PARSERS.get(type(default), str)
+        try:
+            return parser(text)
+        except (TypeError, ValueError):
+            return default
+
+    def _read_pairs(self) -> Dict[str, str]:
+        """Lit les couples clé/valeur du fichier, quel que soit son format.
+
+        Trois formats sont reconnus : le format actuel (en-tête key,value),
+        l'ancien CSV des préférences (une ligne d'en-tête, une ligne de
+        valeurs) et l'ancien format de send_mail (clé et valeur sur deux
+        lignes successives).
+
+        Returns:
+            Dict[str, str]: Valeurs lues
+        """
+        with open(self.path, "r", encoding="utf-8", newline="") as file:
+            rows = [row for row in csv.reader(file) if row]
+
+        if not rows:
+            return {}
+        if rows[0] == HEADER:
+            return {row[0]: row[1] if len(row) > 1 else "" for row in rows[1:]}
+        if len(rows[0]) > 1:
+            values = rows[1] if len(rows) > 1 else []
+            return dict(zip(rows[0], values + [""] * (len(rows[0]) - len(values))))
+
+        lines = [",".join(row) for row in rows]
+        return {lines[i]: lines[i + 1] for i in range(0, len(lines) - 1, 2)}
+
+    def load(self) -> None:
+        """(Re)charge la configuration depuis le fichier."""
+        try:
+            pairs = self._read_pairs() if os.path.exists(self.path) else {}
+        except Exception as e:
+            print(f"Erreur lors du chargement de la configuration : {e}")
+            return
+
+        with self._lock:
+            for key, text in pairs.items():
+                self._values[key] = self._convert(key, text)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Retourne une valeur de configuration (sans accès disque).
+
+        Args:
+            key: Clé de configuration
+            default: Valeur retournée si la clé est inconnue
+
+        Returns:
+            Any: Valeur, dans le type de sa valeur par défaut
+        """
+        return self._values.get(key, default)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def set(self, key: str, value: Any) -> None:
+        """Modifie une valeur ; l'écriture sur disque est différée.
+
+        Args:
+            key: Clé de configuration
+            value: Nouvelle valeur
+        """
+        self.update({key: value})
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """Modifie plusieurs valeurs ; une seule écriture suivra.
+
+        Args:
+            values: Nouvelles valeurs par clé
+        """
+        with self._lock:
+            changed = False
+            for key, value in values.items():
+                if self._values.get(key) != value:
+                    self._values[key] = value
+                    changed = True
+            if changed:
+                self._dirty = True
+                self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Programme l'écriture si elle ne l'est pas déjà."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> bool:
+        """Écrit immédiatement les modifications en attente.
+
+        Returns:
+            bool: True si le fichier est à jour
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            rows = [HEADER] + [[key, str(value)] for key, value in self._values.items()]
+
+            # Écriture complète dans un fichier temporaire du même dossier,
+            # puis remplacement atomique de l'ancien fichier
+            directory = os.path.dirname(self.path) or "."
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                    csv.writer(file, lineterminator="\n").writerows(rows)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, self.path)
+                self._dirty = False
+                return True
+            except Exception as e:
+                print(f"Erreur lors de la sauvegarde de la configuration : {e}")
+                if temp_path is not None:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+                return False
+
+
+# Instance globale, écrite une dernière fois à la fermeture
+config = ConfigStore()
+atexit.register(config.flush)
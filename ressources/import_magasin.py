@@ -1,9 +1,7 @@
 import os
 import sys
-import pyexcel_ods
 from datetime import datetime
-from typing import Dict, Any, List, Tuple
-import re
+from typing import Dict, Any, List, Tuple, Iterable, Iterator, Optional
 import pandas as pd
 import random  # Ajouter cet import en haut du fichier
 
@@ -12,11 +10,13 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from ressources.init_parts import add_material_from_excel
-
-PN_PATTERN = re.compile(r'^[A-Za-z0-9\-\./\s\(\)]+$')
-ORDER_PATTERN = re.compile(r'^[A-Z0-9-]+$')
-PROVIDER_PATTERN = re.compile(r'^[A-Za-z0-9\s\-\.\(\)]*$')
+from ressources import manip_bd
+from ressources.ods_reader import iter_ods_rows
+from ressources.bulk_import import (
+    BulkImporter, ImportReport, IMPORT_PLANES, DEFAULT_CHUNK_SIZE, default_rejects_path,
+    numero_for_date, material_fingerprint, validate_only, format_validation_summary,
+    DRY_RUN_EXAMPLES
+)
 
 def convert_to_bool(value: str) -> bool:
     """Convertit une valeur en booléen.
@@ -86,142 +86,239 @@ def convert_to_int(value: Any) -> int:
     except (ValueError, TypeError):
         return 0
 
-def import_from_ods(file_path: str) -> None:
-    """Importe les données depuis un fichier ODS."""
-    try:
-        data = pyexcel_ods.get_data(file_path)
-        sheet_name = list(data.keys())[0]
-        rows = data[sheet_name]
+def parse_magasin_rows(rows: Iterable[List[Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Convertit les lignes d'une feuille MagasinV5c en matériels.
+    
+    Le rayonnage et l'étagère vides reprennent la dernière valeur
+    renseignée, comme dans le fichier d'inventaire.
+    
+    Args:
+        rows: Lignes de données (sans l'en-tête)
+        
+    Yields:
+        Tuple[int, Dict[str, Any]]: (numéro de ligne dans le fichier, matériel)
+    """
+    # Dernier rayonnage et dernière étagère non vides
+    last_rayonnage = None
+    last_etagere = None
+    
+    for line, row in enumerate(rows, start=2):
+        # Ignorer les lignes trop courtes (au minimum jusqu'à la description)
+        if len(row) < 4:
+            continue
+        
+        def cell(index: int) -> Any:
+            return row[index] if len(row) > index else None
+        
+        # Gestion du rayonnage (colonne 2)
+        current_rayonnage = clean_string(cell(1))
+        if current_rayonnage:
+            last_rayonnage = current_rayonnage
+        rayonnage = last_rayonnage if last_rayonnage else "A1"
+        
+        # Gestion de l'étagère (colonne 3)
+        etagere = clean_string(cell(2))
+        if not etagere:
+            etagere = last_etagere if last_etagere else ""
+        last_etagere = etagere
+        
+        # Avions (colonnes 8-12) - toute valeur non vide associe l'avion
+        planes = [
+            plane for plane, index in zip(IMPORT_PLANES, range(7, 12))
+            if clean_string(cell(index))
+        ]
         
-        header = rows[0]
-        data_rows = rows[1:]
+        # Quantités (colonnes 13-14)
+        quantity = convert_to_int(cell(12) or 0)
+        
+        # Coût aléatoire (données de démonstration) et valeur du stock, tiré
+        # de la clé de la ligne : un réimport ne change pas le coût
+        pn = clean_string(cell(5))
+        cost = random.Random(f"{pn}|{rayonnage}|{etagere}").randint(1, 2000)
+        
+        # Empreinte de la ligne source (le coût aléatoire n'en fait pas partie)
+        fingerprint = material_fingerprint(
+            {"rayonnage": rayonnage, "etagere": etagere, "cells": row}
+        )
+        
+        yield line, {
+            "rayonnage": rayonnage,
+            "etagere": etagere,
+            "description": clean_string(cell(3)),
+            "providers": clean_string(cell(4)),
+            "pn": pn,
+            "order": clean_string(cell(6) if len(row) > 6 else "0"),
+            "planes": planes,
+            "quantity": quantity,
+            "minimum": convert_to_int(cell(13) or 0),
+            # Maintenance (colonnes 15-17)
+            "h50": bool(clean_string(cell(14))),
+            "h100": bool(clean_string(cell(15))),
+            "h200": bool(clean_string(cell(16))),
+            "providers_actf": clean_string(cell(17)),
+            "cost": cost,
+            "stock": cost * quantity,
+            # Remarques (colonne 21)
+            "remarks": clean_string(cell(20)),
+            "fingerprint": fingerprint
+        }
+
+def print_import_report(report: ImportReport) -> None:
+    """Affiche le bilan d'un import.
+    
+    Args:
+        report: Bilan retourné par BulkImporter
+    """
+    print("\nStatistiques d'importation :")
+    print(f"Matériels ajoutés avec succès : {report.inserted}")
+    print(f"Erreurs : {report.rejected}")
+    print(f"Total traité : {report.inserted + report.rejected}")
+    if report.updated or report.unchanged:
+        print(f"Matériels mis à jour : {report.updated}")
+        print(f"Matériels inchangés : {report.unchanged}")
+    print(f"Transactions : {report.chunks} ({report.elapsed:.2f} s)")
+    if report.rejects_path:
+        print(f"Rapport des rejets : {report.rejects_path}")
+
+def import_from_ods(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rejects_path: Optional[str] = None,
+    workers: int = 1,
+    incremental: bool = False,
+    force: bool = False
+) -> Optional[ImportReport]:
+    """Importe les données depuis un fichier ODS.
+    
+    Les lignes sont validées en mémoire puis insérées par lots de
+    transactions ; les lignes refusées sont écrites dans un rapport CSV.
+    En mode incrémental, seules les lignes nouvelles ou modifiées depuis
+    le dernier import sont écrites, et un fichier inchangé est ignoré.
+    
+    Args:
+        file_path: Chemin vers le fichier .ods
+        chunk_size: Nombre de lignes par transaction
+        rejects_path: Rapport des rejets (à côté du fichier source si None)
+        workers: Nombre de processus de validation (import complet uniquement)
+        incremental: Si True, met à jour la base au lieu de tout réinsérer
+        force: Si True, relit le fichier même s'il n'a pas changé (mode incrémental)
         
-        success_count = 0
-        error_count = 0
+    Returns:
+        Optional[ImportReport]: Bilan de l'import, None si le fichier est illisible
+    """
+    try:
+        # Lecture en flux : l'import commence dès la première ligne lue
+        rows = iter_ods_rows(file_path)
+        next(rows, None)  # En-tête
         
-        # Variable pour stocker le dernier rayonnage non vide
-        last_rayonnage = None
-        last_etagere = None
+        importer = BulkImporter(
+            chunk_size=chunk_size,
+            rejects_path=rejects_path or default_rejects_path(file_path)
+        )
+        if incremental:
+            report = importer.import_incremental(
+                parse_magasin_rows(rows), source_path=file_path, force=force
+            )
+        else:
+            report = importer.import_materials(parse_magasin_rows(rows), workers=workers)
+        print_import_report(report)
+        return report
         
-        for row in data_rows:
-            try:
-                # Ignorer les lignes trop courtes
-                if len(row) < 4:  # Au minimum besoin jusqu'à la description
-                    print(f"Ligne ignorée (pas assez de colonnes): {row}")
-                    error_count += 1
-                    continue
-                
-                # Gestion du rayonnage (colonne 2)
-                current_rayonnage = clean_string(row[1] if len(row) > 1 else None)
-                if current_rayonnage:  # Si un nouveau rayonnage est spécifié
-                    last_rayonnage = current_rayonnage
-                rayonnage = last_rayonnage if last_rayonnage else "A1"
-                print(f"Debug - Traitement rayonnage:")
-                print(f"  Current: '{current_rayonnage}'")
-                print(f"  Last: '{last_rayonnage}'")
-                print(f"  Final: '{rayonnage}'")
-                
-                # Gestion de l'étagère (colonne 3)
-                etagere = clean_string(row[2] if len(row) > 2 else None)
-                if not etagere:
-                    etagere = last_etagere if last_etagere else ""
-                last_etagere = etagere
-                
-                # Autres champs
-                description = clean_string(row[3] if len(row) > 3 else None)
-                providers = clean_string(row[4] if len(row) > 4 else None)
-                pn = clean_string(row[5] if len(row) > 5 else None)
-                order = clean_string(row[6] if len(row) > 6 else "0")
-                
-                # Avions (colonnes 8-12) - convertir toute valeur non vide en True
-                aquila = bool(clean_string(row[7] if len(row) > 7 else None))
-                pa28 = bool(clean_string(row[8] if len(row) > 8 else None))
-                da40 = bool(clean_string(row[9] if len(row) > 9 else None))
-                sr20 = bool(clean_string(row[10] if len(row) > 10 else None))
-                sr22 = bool(clean_string(row[11] if len(row) > 11 else None))
-                
-                # Quantités (colonnes 13-14)
-                quantity = convert_to_int(row[12] if len(row) > 12 else 0)
-                minimum = convert_to_int(row[13] if len(row) > 13 else 0)
-                
-                # Maintenance (colonnes 15-17)
-                h50 = bool(clean_string(row[14] if len(row) > 14 else None))
-                h100 = bool(clean_string(row[15] if len(row) > 15 else None))
-                h200 = bool(clean_string(row[16] if len(row) > 16 else None))
-                
-                # Autres informations
-                providers_actf = clean_string(row[17] if len(row) > 17 else None)
-                
-                # Remplacer la gestion du coût par un nombre aléatoire
-                cost = random.randint(1, 2000)
-                
-                print(f"Debug - Coût aléatoire généré: {cost}")
-                
-                # Calcul du stock (coût * quantité)
-                stock = cost * quantity
-                
-                # Remarques (colonne 21)
-                remarks = clean_string(row[20] if len(row) > 20 else None)
-                
-                # Vérification des données minimales requises
-                if not description:
-                    print(f"Ligne ignorée (description manquante): {row}")
-                    error_count += 1
-                    continue
-                
-                # Debug print pour vérifier les valeurs
-                print(f"Debug - Rayonnage: {rayonnage}, Étagère: {etagere}, Coût: {cost}")
-                
-                # Ajouter plus de debug avant l'envoi à add_material_from_excel
-                print(f"Debug - Données envoyées :")
-                print(f"  Rayonnage: '{rayonnage}'")
-                print(f"  Étagère: '{etagere}'")
-                print(f"  Description: '{description}'")
-                print(f"  Coût: {cost}")
-                
-                success, message = add_material_from_excel(
-                    date=datetime.now().strftime("%Y-%m-%d"),
-                    rayonnage=rayonnage,
-                    etagere=etagere,
-                    description=description,
-                    providers=providers,
-                    pn=pn,
-                    order=order,
-                    aquila=aquila,
-                    pa28=pa28,
-                    da40=da40,
-                    sr20=sr20,
-                    sr22=sr22,
-                    quantity=quantity,
-                    minimum=minimum,
-                    h50=h50,
-                    h100=h100,
-                    h200=h200,
-                    providers_actf=providers_actf,
-                    cost=cost,
-                    stock=stock,
-                    remarks=remarks
-                )
-                
-                if success:
-                    success_count += 1
-                    print(f"Matériel ajouté avec succès : {description}")
-                else:
-                    error_count += 1
-                    print(f"Erreur lors de l'ajout du matériel {description} : {message}")
-                    
-            except Exception as e:
-                error_count += 1
-                print(f"Erreur lors du traitement de la ligne : {str(e)}")
-                print(f"Ligne problématique : {row}")
+    except Exception as e:
+        print(f"Erreur lors de la lecture du fichier : {str(e)}")
+        return None
+
+def validate_ods(file_path: str, examples: int = DRY_RUN_EXAMPLES) -> Optional[Dict[str, Any]]:
+    """Valide un fichier ODS sans rien écrire dans la base (mode --dry-run).
+    
+    Le fichier passe par la même conversion et les mêmes règles de
+    validation que l'import ; seule une synthèse est affichée.
+    
+    Args:
+        file_path: Chemin vers le fichier .ods
+        examples: Nombre d'exemples affichés par type d'erreur
         
-        print("\nStatistiques d'importation :")
-        print(f"Matériels ajoutés avec succès : {success_count}")
-        print(f"Erreurs : {error_count}")
-        print(f"Total traité : {success_count + error_count}")
+    Returns:
+        Optional[Dict[str, Any]]: Synthèse de validation, None si le fichier est illisible
+    """
+    try:
+        rows = iter_ods_rows(file_path)
+        next(rows, None)  # En-tête
+        summary = validate_only(parse_magasin_rows(rows), examples=examples)
+        print(f"\nValidation de {file_path} (aucune écriture) :")
+        print(format_validation_summary(summary))
+        return summary
         
     except Exception as e:
         print(f"Erreur lors de la lecture du fichier : {str(e)}")
+        return None
+
+def import_many_ods(
+    file_paths: List[str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rejects_path: Optional[str] = None
+) -> Optional[ImportReport]:
+    """Importe plusieurs fichiers ODS (par exemple un par hangar) en parallèle.
+    
+    Chaque fichier est lu et validé dans son propre processus ; les
+    insertions restent faites par un seul écrivain.
+    
+    Args:
+        file_paths: Chemins des fichiers .ods
+        workers: Nombre de processus (un par fichier si None)
+        chunk_size: Nombre de lignes par transaction
+        rejects_path: Rapport des rejets (à côté du premier fichier si None)
+        
+    Returns:
+        Optional[ImportReport]: Bilan de l'import, None en cas d'erreur
+    """
+    try:
+        if not file_paths:
+            return None
+        importer = BulkImporter(
+            chunk_size=chunk_size,
+            rejects_path=rejects_path or default_rejects_path(file_paths[0])
+        )
+        report = importer.import_files(file_paths, parse_magasin_rows, workers=workers)
+        print_import_report(report)
+        return report
+        
+    except Exception as e:
+        print(f"Erreur lors de l'import des fichiers : {str(e)}")
+        return None
+
+def iter_magasin_ods(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Produit les matériels du fichier ODS du magasin un par un.
+    
+    La ligne d'en-tête donne les clés ; le convertisseur de chaque colonne
+    est choisi une seule fois à partir de son en-tête.
+    
+    Args:
+        file_path (str): Chemin vers le fichier .ods
+        
+    Yields:
+        Dict[str, Any]: Matériel indexé par en-tête de colonne
+    """
+    rows = iter_ods_rows(file_path)
+    headers = [str(col).strip() for col in next(rows, [])]
+    
+    converters = []
+    for header in headers:
+        if header in ['Quantity', 'Minimum']:
+            converters.append(convert_to_int)
+        elif header in ['Cost_Estimate', 'Stock_Estimate_HT']:
+            converters.append(convert_to_float)
+        elif header in ['AQUILA', 'PA28', 'DA40', 'SR20', 'SR22', '50H', '100H', '200H']:
+            converters.append(convert_to_bool)
+        else:
+            converters.append(clean_string)
+    
+    for row in rows:
+        yield {
+            header: convert(row[i] if i < len(row) else '')
+            for i, (header, convert) in enumerate(zip(headers, converters))
+        }
 
 def read_magasin_ods(file_path: str) -> Tuple[bool, str, List[Dict]]:
     """Lit le fichier ODS du magasin et retourne une liste de dictionnaires.
@@ -239,45 +336,11 @@ def read_magasin_ods(file_path: str) -> Tuple[bool, str, List[Dict]]:
         # Vérifier que le fichier existe
         if not os.path.exists(file_path):
             return False, f"Le fichier {file_path} n'existe pas", []
-
-        # Lire le fichier ODS avec pyexcel_ods
-        data = pyexcel_ods.get_data(file_path)
         
-        if not data:
-            return False, "Le fichier est vide", []
-            
-        # Récupérer la première feuille
-        sheet_name = list(data.keys())[0]
-        rows = data[sheet_name]
+        materials = list(iter_magasin_ods(file_path))
         
-        if len(rows) < 2:  # Au moins l'en-tête et une ligne de données
+        if not materials:  # Au moins l'en-tête et une ligne de données
             return False, "Le fichier ne contient pas assez de lignes", []
-            
-        # Récupérer les en-têtes
-        headers = [str(col).strip() for col in rows[0]]
-        
-        # Convertir les lignes en dictionnaires
-        materials = []
-        for row in rows[1:]:  # Ignorer l'en-tête
-            # S'assurer que la ligne a assez de colonnes
-            if len(row) < len(headers):
-                row.extend([''] * (len(headers) - len(row)))
-            
-            material = {}
-            for i, header in enumerate(headers):
-                value = row[i] if i < len(row) else ''
-                
-                # Convertir les valeurs selon leur type
-                if header in ['Quantity', 'Minimum']:
-                    material[header] = convert_to_int(value)
-                elif header in ['Cost_Estimate', 'Stock_Estimate_HT']:
-                    material[header] = convert_to_float(value)
-                elif header in ['AQUILA', 'PA28', 'DA40', 'SR20', 'SR22', '50H', '100H', '200H']:
-                    material[header] = convert_to_bool(value)
-                else:
-                    material[header] = clean_string(value)
-            
-            materials.append(material)
 
         return True, f"{len(materials)} lignes trouvées", materials
 
@@ -285,11 +348,141 @@ def read_magasin_ods(file_path: str) -> Tuple[bool, str, List[Dict]]:
         print(f"Exception détaillée : {str(e)}")
         return False, f"Erreur lors de la lecture du fichier : {str(e)}", []
 
-def import_materials_from_df(df: pd.DataFrame) -> Tuple[int, int, int]:
+# Colonne du DataFrame de chaque argument de manip_bd.validate_material
+DF_COLUMNS = {
+    "description": "Description", "providers": "Providers",
+    "providers_actf": "Providers_ACTF", "pn": "PN", "order": "Order",
+    "rayonnage": "Rayonnage", "etagere": "Etagere", "quantity": "Quantity",
+    "minimum": "Minimum", "cost": "Cost_Estimate", "stock": "Stock_Estimate_HT"
+}
+# Champs numériques convertis en entiers (les autres en flottants)
+DF_INTEGER_KEYS = ("quantity", "minimum")
+# Colonnes texte, dans l'ordre de validate_material :
+# (clé du matériel, colonne, champ validé, pattern, longueur max, obligatoire)
+DF_TEXT_COLUMNS = tuple(
+    (key, DF_COLUMNS[key], field, pattern, max_length, required)
+    for key, field, pattern, max_length, required in manip_bd.MATERIAL_TEXT_RULES
+) + (("remarks", "Remarks", None, None, None, False),)
+# (clé du matériel, colonne, champ validé, minimum, maximum, entier)
+DF_NUMERIC_COLUMNS = tuple(
+    (key, DF_COLUMNS[key], field, min_value, max_value, key in DF_INTEGER_KEYS)
+    for key, field, min_value, max_value in manip_bd.MATERIAL_NUMERIC_RULES
+)
+# Colonnes d'avions du DataFrame et nom de l'avion en base
+DF_PLANE_COLUMNS = (
+    ("AQUILA", "AQUILA"), ("PA28", "PA28-181"), ("DA40", "DA40"), ("SR20", "SR20"), ("SR22", "SR22")
+)
+DF_MAINTENANCE_COLUMNS = (("h50", "50H"), ("h100", "100H"), ("h200", "200H"))
+TRUE_WORDS = ['x', '1', 'true', 'oui', 'yes']
+
+def _df_text(df: pd.DataFrame, column: str) -> pd.Series:
+    """Retourne une colonne texte nettoyée ("" pour les cellules vides ou absentes)."""
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].fillna("").astype(str).str.strip()
+
+def _df_flag(df: pd.DataFrame, column: str) -> pd.Series:
+    """Retourne une colonne booléenne, avec les règles de convert_to_bool."""
+    if column not in df.columns:
+        return pd.Series(False, index=df.index)
+    values = df[column]
+    numeric = pd.to_numeric(values, errors="coerce").fillna(0).ne(0)
+    words = values.fillna("").astype(str).str.strip().str.lower().isin(TRUE_WORDS)
+    return numeric | words
+
+def _flag_reason(reasons: pd.Series, mask: pd.Series, message: str) -> pd.Series:
+    """Inscrit un motif de rejet sur les lignes qui n'en ont pas encore."""
+    return reasons.mask(mask & reasons.eq(""), message)
+
+def validate_materials_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """Convertit et valide un DataFrame de matériels colonne par colonne.
+    
+    Les règles et messages sont ceux de manip_bd.validate_material ; seul
+    le premier motif de rejet de chaque ligne est conservé.
+    
+    Args:
+        df (pd.DataFrame): DataFrame contenant les données à importer
+        
+    Returns:
+        Tuple[pd.DataFrame, pd.Series]: (colonnes converties, indexées par
+        clé de matériel ; motif de rejet par ligne, "" si la ligne est valide)
+    """
+    frame = pd.DataFrame(index=df.index)
+    reasons = pd.Series("", index=df.index, dtype=object)
+    
+    for key, column, field, pattern, max_length, required in DF_TEXT_COLUMNS:
+        values = _df_text(df, column)
+        frame[key] = values
+        if field is None:
+            continue
+        if required:
+            reasons = _flag_reason(
+                reasons, values.eq(""), f"Le champ {field} ne peut pas être vide"
+            )
+        reasons = _flag_reason(
+            reasons, values.str.len().gt(max_length),
+            f"Le champ {field} est trop long (max {max_length} caractères)"
+        )
+        reasons = _flag_reason(
+            reasons, values.ne("") & ~values.str.match(pattern.pattern),
+            f"Le champ {field} contient des caractères invalides"
+        )
+    
+    for key, column, field, min_value, max_value, integer in DF_NUMERIC_COLUMNS:
+        if column in df.columns:
+            # Les cellules vides valent 0 ; le reste doit être numérique
+            raw = df[column].where(df[column].astype(str).str.strip().ne(""))
+            values = pd.to_numeric(raw, errors="coerce")
+            reasons = _flag_reason(
+                reasons, values.isna() & raw.notna(),
+                f"Le champ {field} doit être un nombre"
+            )
+            values = values.fillna(0)
+        else:
+            values = pd.Series(0, index=df.index)
+        reasons = _flag_reason(
+            reasons, values.lt(min_value) | values.gt(max_value),
+            f"Le champ {field} doit être entre {min_value} et {max_value}"
+        )
+        frame[key] = values.astype("int64") if integer else values.astype(float)
+    
+    for key, column in DF_MAINTENANCE_COLUMNS:
+        frame[key] = _df_flag(df, column)
+    
+    return frame, reasons
+
+def plane_links_frame(df: pd.DataFrame) -> pd.Series:
+    """Transforme les colonnes d'avions cochées en listes d'avions par ligne.
+    
+    Args:
+        df (pd.DataFrame): DataFrame contenant les colonnes d'avions
+        
+    Returns:
+        pd.Series: Noms des avions associés à chaque ligne (liste vide sinon)
+    """
+    flags = pd.DataFrame(
+        {plane: _df_flag(df, column) for column, plane in DF_PLANE_COLUMNS},
+        index=df.index
+    )
+    links = flags.melt(ignore_index=False, var_name="plane", value_name="linked")
+    links = links[links["linked"]]
+    planes = links.groupby(level=0, sort=False)["plane"].agg(list)
+    return planes.reindex(df.index).apply(lambda value: value if isinstance(value, list) else [])
+
+def import_materials_from_df(
+    df: pd.DataFrame,
+    rejects_path: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[int, int, int]:
     """Importe les matériels depuis le DataFrame dans la base de données.
     
+    La conversion et la validation sont faites colonne par colonne ; les
+    lignes valides sont ensuite insérées par lots avec leurs liens avions.
+    
     Args:
         df (pd.DataFrame): DataFrame contenant les données à importer
+        rejects_path: Rapport CSV des lignes refusées (aucun rapport si None)
+        chunk_size: Nombre de lignes par transaction
         
     Returns:
         Tuple[int, int, int]: 
@@ -297,64 +490,79 @@ def import_materials_from_df(df: pd.DataFrame) -> Tuple[int, int, int]:
             - Nombre d'erreurs
             - Nombre total de lignes traitées
     """
-    success_count = 0
-    error_count = 0
-    total_count = 0
-
-    for index, row in df.iterrows():
-        try:
-            # Convertir la ligne en dictionnaire
-            material_data = {
-                'date': datetime.now().strftime("%Y-%m-%d"),
-                'rayonnage': str(row.get('Rayonnage', '')),
-                'etagere': str(row.get('Etagere', '')),
-                'description': str(row.get('Description', '')),
-                'providers': str(row.get('Providers', '')),
-                'pn': str(row.get('PN', '')),
-                'order': str(row.get('Order', '')),
-                'quantity': int(row.get('Quantity', 0)),
-                'minimum': int(row.get('Minimum', 0)),
-                'providers_actf': str(row.get('Providers_ACTF', '')),
-                'cost': float(row.get('Cost_Estimate', 0.0)),
-                'stock': float(row.get('Stock_Estimate_HT', 0.0)),
-                'remarks': str(row.get('Remarks', '')),
-                # Colonnes pour les avions (à adapter selon votre structure)
-                'aquila': bool(row.get('AQUILA', False)),
-                'pa28': bool(row.get('PA28', False)),
-                'da40': bool(row.get('DA40', False)),
-                'sr20': bool(row.get('SR20', False)),
-                'sr22': bool(row.get('SR22', False)),
-                # Colonnes pour la maintenance
-                'h50': bool(row.get('50H', False)),
-                'h100': bool(row.get('100H', False)),
-                'h200': bool(row.get('200H', False))
-            }
-
-            # Ajouter le matériel
-            success, message = add_material_from_excel(**material_data)
-            
-            if success:
-                success_count += 1
-                print(f"Matériel ajouté avec succès : {material_data['description']}")
-            else:
-                error_count += 1
-                print(f"Erreur lors de l'ajout du matériel {material_data['description']} : {message}")
-
-        except Exception as e:
-            error_count += 1
-            print(f"Erreur inattendue à la ligne {index + 2} : {str(e)}")
+    total_count = len(df)
+    if total_count == 0:
+        return 0, 0, 0
+    
+    try:
+        frame, reasons = validate_materials_frame(df)
+        planes = plane_links_frame(df)
+        frame["numero"] = numero_for_date(datetime.now().strftime("%Y-%m-%d"))
+        # Numéro de ligne dans le fichier source (en-tête en ligne 1)
+        lines = pd.Series(range(2, total_count + 2), index=df.index)
         
-        total_count += 1
-
-    return success_count, error_count, total_count
+        importer = BulkImporter(chunk_size=chunk_size, rejects_path=rejects_path)
+        known = set(importer.resolve_planes())
+        unknown = planes.apply(lambda names: [name for name in names if name not in known])
+        reasons = _flag_reason(
+            reasons, unknown.str.len().gt(0),
+            "Avion(s) inconnu(s) : " + unknown.str.join(", ")
+        )
+        
+        summary = ["description", "pn", "rayonnage", "etagere"]
+        valid = reasons.eq("")
+        values = frame.loc[valid, [
+            "numero", "rayonnage", "etagere", "description", "providers", "pn",
+            "order", "quantity", "minimum", "h50", "h100", "h200",
+            "providers_actf", "cost", "stock", "remarks"
+        ]]
+        prepared = zip(
+            lines[valid].tolist(),
+            values.itertuples(index=False, name=None),
+            planes[valid].tolist(),
+            frame.loc[valid, summary].to_dict("records")
+        )
+        rejects = zip(
+            lines[~valid].tolist(),
+            reasons[~valid].tolist(),
+            frame.loc[~valid, summary].to_dict("records")
+        )
+        
+        report = importer.import_prepared(prepared, rejects)
+        print_import_report(report)
+        return report.inserted, report.rejected, total_count
+        
+    except Exception as e:
+        print(f"Erreur inattendue lors de l'import du DataFrame : {str(e)}")
+        return 0, total_count, total_count
 
 def main():
-    """Fonction principale pour l'import des données."""
-    file_path = os.path.join(current_dir, "MagasinV5c.ods")
-    print(f"Lecture du fichier : {file_path}")
+    """Fonction principale pour l'import des données.
+    
+    Sans argument, importe MagasinV5c.ods ; avec plusieurs fichiers en
+    argument, les importe en parallèle. Avec --incremental, chaque fichier
+    ne met à jour que les lignes modifiées depuis son dernier import (--force
+    relit aussi les fichiers inchangés) ; avec --dry-run, les fichiers sont
+    seulement validés.
+    """
+    args = sys.argv[1:]
+    incremental = "--incremental" in args
+    force = "--force" in args
+    dry_run = "--dry-run" in args
+    file_paths = [arg for arg in args if not arg.startswith("--")]
+    file_paths = file_paths or [os.path.join(current_dir, "MagasinV5c.ods")]
+    print(f"Lecture du/des fichier(s) : {', '.join(file_paths)}")
     
-    # Utiliser directement import_from_ods au lieu de read_magasin_ods
-    import_from_ods(file_path)
+    if dry_run:
+        for file_path in file_paths:
+            validate_ods(file_path)
+    elif incremental:
+        for file_path in file_paths:
+            import_from_ods(file_path, incremental=True, force=force)
+    elif len(file_paths) == 1:
+        import_from_ods(file_paths[0])
+    else:
+        import_many_ods(file_paths)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -10,6 +10,7 @@ import hashlib
 from typing import List, Tuple
 
 from ressources import allinfos as infos
+from ressources.pool_bd import pool
 
 
 # Liste des utilisateurs par défaut
@@ -37,7 +38,8 @@ DEFAULT_USERS: List[Tuple[str, str, str, str, str, str, bool]] = [
 
 def init_database() -> None:
     """Initialise la base de données avec les utilisateurs par défaut."""
-    conn = sqlite3.connect(os.path.join(infos.PATH, "bdd_all.db"))
+    db_path = os.path.join(infos.PATH, "bdd_all.db")
+    conn = pool.acquire(db_path)
     cursor = conn.cursor()
     
     # Création de la table users si elle n'existe pas
@@ -72,7 +74,7 @@ def init_database() -> None:
             print(f"❌ Erreur lors de l'ajout de {username} : {e}")
     
     conn.commit()
-    conn.close()
+    pool.release(conn, db_path)
 
 
 if __name__ == "__main__":
@@ -5,9 +5,14 @@ Ce module gère la création et l'initialisation des tables de la base de donné
 """
 
 import os
+import sys
 import sqlite3
 from typing import Optional, Tuple, Dict, List
 
+# Ajout du répertoire parent au path Python pour permettre l'importation des modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ressources.pool_bd import pool
+
 # Constantes de sécurité
 MAX_TEXT_LENGTH = 1000
 MAX_QUANTITY = 10000
@@ -17,6 +22,56 @@ MIN_COST = 0
 DB_TIMEOUT = 30
 MAX_RETRIES = 3
 
+# Index plein texte de la table magasin
+FTS_TABLE = "magasin_fts"
+FTS_COLUMNS = (
+    "Numero", "Description", "PN", "Providers", "Providers_ACTF",
+    "Remarks", "Rayonnage", "Etagere"
+)
+# Poids bm25 de chaque colonne, dans l'ordre de FTS_COLUMNS
+FTS_WEIGHTS = (5.0, 10.0, 8.0, 3.0, 3.0, 1.0, 2.0, 2.0)
+FTS_TRIGGERS = ("magasin_fts_insert", "magasin_fts_delete", "magasin_fts_update")
+
+# Journal des mouvements de stock et agrégats
+LEDGER_TABLES = (
+    "stock_movements", "stock_movements_daily", "stock_movements_weekly", "recent_materials"
+)
+LEDGER_TRIGGERS = ("stock_movements_rollup", "stock_movements_recent")
+LEDGER_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        "ID movement" INTEGER PRIMARY KEY AUTOINCREMENT,
+        "ID stuff" INTEGER NOT NULL,
+        "ID plane" INTEGER,
+        "username" TEXT,
+        "delta" INTEGER NOT NULL CHECK("delta" != 0),
+        "quantity_after" INTEGER,
+        "created_at" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY ("ID stuff") REFERENCES magasin("ID stuff") ON DELETE RESTRICT,
+        FOREIGN KEY ("ID plane") REFERENCES planes("ID plane") ON DELETE SET NULL
+    )
+'''
+
+# Tables de suivi des imports incrémentaux
+IMPORT_TRACKING_TABLES = ("magasin_import_keys", "import_files")
+
+# Journal des modifications de magasin (rafraîchissement du catalogue)
+CHANGE_TABLE = "magasin_changes"
+CHANGE_TRIGGERS = ("magasin_changes_insert", "magasin_changes_update", "magasin_changes_delete")
+CHANGE_COLUMNS = (
+    "Numero", "Rayonnage", "Etagere", "Description", "Providers", "PN", "Order",
+    "Quantity", "Minimum", "50H", "100H", "200H_ou_annuelle", "Providers_ACTF",
+    "Cost_Estimate", "Stock_Estimate_HT", "Remarks"
+)
+
+# Tables de synthèse des statistiques, tenues à jour par triggers
+STATS_TRIGGERS = (
+    "stats_magasin_insert", "stats_magasin_delete", "stats_magasin_update",
+    "stats_links_insert", "stats_links_delete", "stats_links_update",
+    "stats_planes_delete"
+)
+# Écart toléré sur les sommes de coûts (cumul d'arrondis flottants)
+STATS_COST_TOLERANCE = 1e-6
+
 # Chemin absolu du dossier ressources
 RESOURCES_PATH = os.path.dirname(os.path.abspath(__file__))
 
@@ -44,9 +99,660 @@ def check_db_path() -> Tuple[bool, str]:
     except Exception as e:
         return False, f"Erreur lors de la vérification du chemin : {str(e)}"
 
-def init_db() -> bool:
+def create_fts_index(cursor: sqlite3.Cursor) -> bool:
+    """Crée l'index plein texte FTS5 de la table magasin et ses triggers.
+    
+    L'index est une table à contenu externe : il ne stocke que les termes
+    (sans accents, via remove_diacritics) et relit les colonnes dans
+    magasin. Les triggers le maintiennent synchronisé ; les mises à jour de
+    quantité ne le modifient pas.
+    
+    Args:
+        cursor: Curseur sur la base de données
+        
+    Returns:
+        bool: True si l'index vient d'être créé et a été rempli
+        
+    Raises:
+        sqlite3.OperationalError: Si SQLite est compilé sans FTS5
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (FTS_TABLE,)
+    )
+    exists = cursor.fetchone() is not None
+    
+    columns = ", ".join(f'"{column}"' for column in FTS_COLUMNS)
+    new_values = ", ".join(f'NEW."{column}"' for column in FTS_COLUMNS)
+    old_values = ", ".join(f'OLD."{column}"' for column in FTS_COLUMNS)
+    
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {columns},
+            content='magasin',
+            content_rowid='ID stuff',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS magasin_fts_insert
+        AFTER INSERT ON magasin
+        BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns})
+            VALUES (NEW."ID stuff", {new_values});
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS magasin_fts_delete
+        AFTER DELETE ON magasin
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns})
+            VALUES ('delete', OLD."ID stuff", {old_values});
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS magasin_fts_update
+        AFTER UPDATE OF {columns} ON magasin
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns})
+            VALUES ('delete', OLD."ID stuff", {old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {columns})
+            VALUES (NEW."ID stuff", {new_values});
+        END;
+    ''')
+    
+    # Classement bm25 pondéré par colonne, utilisé par ORDER BY rank. Le
+    # réglage n'est écrit que s'il change : init_db s'exécute à chaque
+    # démarrage et ne doit pas verrouiller la base partagée en écriture
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    rank = f"bm25({weights})"
+    cursor.execute(f"SELECT v FROM {FTS_TABLE}_config WHERE k = 'rank'")
+    stored = cursor.fetchone()
+    if stored is None or stored[0] != rank:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', ?)",
+            (rank,)
+        )
+    
+    if not exists:
+        # Indexation des lignes déjà présentes dans magasin
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return not exists
+
+def _migrate_ledger_foreign_key(cursor: sqlite3.Cursor) -> None:
+    """Remplace l'ancienne clé étrangère ON DELETE CASCADE du journal.
+    
+    La suppression d'une pièce effaçait son historique sans passer par
+    les agrégats. SQLite ne permettant pas de modifier une contrainte, la
+    table est recréée et ses lignes recopiées (sans rejouer le trigger
+    des agrégats, déjà à jour), hormis celles de pièces qui n'existent
+    plus ; index et trigger sont recréés ensuite par create_stock_ledger.
+    
+    Args:
+        cursor: Curseur sur la base de données
+    """
+    cursor.execute("PRAGMA foreign_key_list(stock_movements)")
+    cascades = [row for row in cursor.fetchall() if row[2] == "magasin" and row[6] == "CASCADE"]
+    if not cascades:
+        return
+    
+    cursor.execute(LEDGER_TABLE_SQL.format(table="stock_movements_new"))
+    cursor.execute('''
+        INSERT INTO stock_movements_new (
+            "ID movement", "ID stuff", "ID plane", "username", "delta",
+            "quantity_after", "created_at"
+        )
+        SELECT "ID movement", "ID stuff", "ID plane", "username", "delta",
+               "quantity_after", "created_at"
+        FROM stock_movements
+        WHERE "ID stuff" IN (SELECT "ID stuff" FROM magasin)
+    ''')
+    cursor.execute("DROP TABLE stock_movements")
+    cursor.execute("ALTER TABLE stock_movements_new RENAME TO stock_movements")
+
+def create_stock_ledger(cursor: sqlite3.Cursor) -> None:
+    """Crée le journal des mouvements de stock et ses tables d'agrégats.
+    
+    Le journal stock_movements est en ajout seul. Chaque insertion met à
+    jour, par trigger, les agrégats journaliers et hebdomadaires par pièce
+    et par avion : les requêtes de consommation ne lisent jamais le
+    journal brut, qui peut donc être purgé une fois agrégé. De même,
+    recent_materials conserve le dernier mouvement de chaque pièce par
+    utilisateur, pour classer les pièces récentes sans relire le journal.
+    Une pièce qui a un historique ne peut pas être supprimée (ON DELETE
+    RESTRICT), ce qui préserve le journal et la cohérence des agrégats.
+    
+    Args:
+        cursor: Curseur sur la base de données
+    """
+    _migrate_ledger_foreign_key(cursor)
+    cursor.execute(LEDGER_TABLE_SQL.format(table="stock_movements"))
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_stock_movements_created ON stock_movements("created_at")'
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_stock_movements_stuff ON stock_movements("ID stuff")'
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_stock_movements_user '
+        'ON stock_movements("username", "ID movement")'
+    )
+    
+    # Agrégats : "ID plane" vaut 0 pour les mouvements sans avion
+    for table, period in (
+        ("stock_movements_daily", "day"),
+        ("stock_movements_weekly", "week_start")
+    ):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                "{period}" TEXT NOT NULL,
+                "ID stuff" INTEGER NOT NULL,
+                "ID plane" INTEGER NOT NULL DEFAULT 0,
+                "added" INTEGER NOT NULL DEFAULT 0,
+                "withdrawn" INTEGER NOT NULL DEFAULT 0,
+                "movements" INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ("{period}", "ID stuff", "ID plane")
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS idx_{table}_plane ON {table}("ID plane", "{period}")'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS idx_{table}_stuff ON {table}("ID stuff", "{period}")'
+        )
+    
+    # Mise à jour incrémentale des agrégats à chaque mouvement
+    # (la semaine est identifiée par la date de son lundi)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stock_movements_rollup
+        AFTER INSERT ON stock_movements
+        BEGIN
+            INSERT INTO stock_movements_daily (
+                "day", "ID stuff", "ID plane", "added", "withdrawn", "movements"
+            )
+            VALUES (
+                date(NEW."created_at"),
+                NEW."ID stuff",
+                COALESCE(NEW."ID plane", 0),
+                MAX(NEW."delta", 0),
+                MAX(-NEW."delta", 0),
+                1
+            )
+            ON CONFLICT ("day", "ID stuff", "ID plane") DO UPDATE SET
+                "added" = "added" + excluded."added",
+                "withdrawn" = "withdrawn" + excluded."withdrawn",
+                "movements" = "movements" + 1;
+            
+            INSERT INTO stock_movements_weekly (
+                "week_start", "ID stuff", "ID plane", "added", "withdrawn", "movements"
+            )
+            VALUES (
+                date(NEW."created_at", 'weekday 0', '-6 days'),
+                NEW."ID stuff",
+                COALESCE(NEW."ID plane", 0),
+                MAX(NEW."delta", 0),
+                MAX(-NEW."delta", 0),
+                1
+            )
+            ON CONFLICT ("week_start", "ID stuff", "ID plane") DO UPDATE SET
+                "added" = "added" + excluded."added",
+                "withdrawn" = "withdrawn" + excluded."withdrawn",
+                "movements" = "movements" + 1;
+        END;
+    ''')
+    
+    # Dernier mouvement par utilisateur et par pièce (survit à la purge)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recent_materials'")
+    recent_exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS recent_materials (
+            "username" TEXT NOT NULL,
+            "ID stuff" INTEGER NOT NULL,
+            "last_movement" INTEGER NOT NULL,
+            PRIMARY KEY ("username", "ID stuff"),
+            FOREIGN KEY ("ID stuff") REFERENCES magasin("ID stuff") ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_recent_materials_user '
+        'ON recent_materials("username", "last_movement")'
+    )
+    if not recent_exists:
+        cursor.execute('''
+            INSERT INTO recent_materials ("username", "ID stuff", "last_movement")
+            SELECT "username", "ID stuff", MAX("ID movement")
+            FROM stock_movements
+            WHERE "username" IS NOT NULL
+            GROUP BY "username", "ID stuff"
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stock_movements_recent
+        AFTER INSERT ON stock_movements
+        WHEN NEW."username" IS NOT NULL
+        BEGIN
+            INSERT INTO recent_materials ("username", "ID stuff", "last_movement")
+            VALUES (NEW."username", NEW."ID stuff", NEW."ID movement")
+            ON CONFLICT ("username", "ID stuff") DO UPDATE SET
+                "last_movement" = excluded."last_movement";
+        END;
+    ''')
+
+def create_import_tracking(cursor: sqlite3.Cursor) -> None:
+    """Crée les tables de suivi des imports incrémentaux.
+    
+    magasin_import_keys associe la clé naturelle d'une ligne importée
+    (PN, Rayonnage, Etagere) à sa pièce et à l'empreinte de sa dernière
+    version ; import_files conserve l'empreinte de chaque fichier importé.
+    La table magasin contient des doublons historiques sur cette clé : la
+    contrainte d'unicité porte donc sur la table de suivi.
+    
+    Args:
+        cursor: Curseur sur la base de données
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS magasin_import_keys (
+            "PN" TEXT NOT NULL,
+            "Rayonnage" TEXT NOT NULL,
+            "Etagere" TEXT NOT NULL,
+            "ID stuff" INTEGER NOT NULL,
+            "fingerprint" TEXT,
+            "updated_at" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY ("PN", "Rayonnage", "Etagere"),
+            FOREIGN KEY ("ID stuff") REFERENCES magasin("ID stuff") ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_import_keys_fingerprint ON magasin_import_keys("fingerprint")'
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_import_keys_stuff ON magasin_import_keys("ID stuff")'
+    )
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_files (
+            "path" TEXT PRIMARY KEY,
+            "sha256" TEXT NOT NULL,
+            "imported_at" TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def create_change_log(cursor: sqlite3.Cursor) -> bool:
+    """Crée le journal des modifications de magasin et ses triggers.
+    
+    Chaque insertion ou modification d'une pièce lui attribue un nouveau
+    numéro "seq" (AUTOINCREMENT : strictement croissant, jamais réutilisé).
+    Le catalogue en mémoire relit les pièces de numéro supérieur au dernier
+    vu ; contrairement à updated_at, ce numéro ne dépend pas de l'horloge
+    des postes qui écrivent dans la base partagée.
+    
+    Args:
+        cursor: Curseur sur la base de données
+        
+    Returns:
+        bool: True si le journal vient d'être créé (et rempli)
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (CHANGE_TABLE,)
+    )
+    exists = cursor.fetchone() is not None
+    
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+            "seq" INTEGER PRIMARY KEY AUTOINCREMENT,
+            "ID stuff" INTEGER NOT NULL UNIQUE
+        )
+    ''')
+    
+    # REPLACE supprime l'ancienne entrée de la pièce et lui donne un nouveau numéro
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS magasin_changes_insert
+        AFTER INSERT ON magasin
+        BEGIN
+            INSERT OR REPLACE INTO {CHANGE_TABLE} ("ID stuff") VALUES (NEW."ID stuff");
+        END;
+    ''')
+    # La mise à jour de updated_at par update_magasin_timestamp n'est pas comptée
+    columns = ", ".join(f'"{column}"' for column in CHANGE_COLUMNS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS magasin_changes_update
+        AFTER UPDATE OF "ID stuff", {columns} ON magasin
+        BEGIN
+            DELETE FROM {CHANGE_TABLE} WHERE "ID stuff" = OLD."ID stuff";
+            INSERT OR REPLACE INTO {CHANGE_TABLE} ("ID stuff") VALUES (NEW."ID stuff");
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS magasin_changes_delete
+        AFTER DELETE ON magasin
+        BEGIN
+            DELETE FROM {CHANGE_TABLE} WHERE "ID stuff" = OLD."ID stuff";
+        END;
+    ''')
+    
+    if not exists:
+        cursor.execute(
+            f'INSERT INTO {CHANGE_TABLE} ("ID stuff") SELECT "ID stuff" FROM magasin ORDER BY "ID stuff"'
+        )
+    return not exists
+
+def create_email_outbox(cursor: sqlite3.Cursor) -> None:
+    """Crée la file d'envoi persistante des emails.
+    
+    Chaque email à envoyer y est inscrit avant d'être transmis par le thread
+    d'envoi : un email non parti (serveur injoignable, application fermée)
+    est retenté plus tard. next_attempt_at est un horodatage Unix. queued_by
+    identifie le poste qui a mis l'email en file : seul ce poste l'envoie,
+    avec ses propres diagrammes et sa propre date de dernier envoi.
+    
+    Args:
+        cursor: Curseur sur la base de données
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            "ID mail" INTEGER PRIMARY KEY AUTOINCREMENT,
+            "queued_by" TEXT NOT NULL DEFAULT '',
+            "recipient" TEXT NOT NULL,
+            "subject" TEXT NOT NULL,
+            "body" TEXT NOT NULL,
+            "with_charts" INTEGER NOT NULL DEFAULT 0 CHECK("with_charts" IN (0, 1)),
+            "status" TEXT NOT NULL DEFAULT 'pending'
+                CHECK("status" IN ('pending', 'sending', 'sent', 'failed')),
+            "attempts" INTEGER NOT NULL DEFAULT 0,
+            "next_attempt_at" REAL NOT NULL DEFAULT 0,
+            "last_error" TEXT,
+            "created_at" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            "sent_at" TIMESTAMP
+        )
+    ''')
+    # Files créées avant l'ajout de queued_by : les emails existants
+    # restent envoyables par n'importe quel poste
+    cursor.execute("PRAGMA table_info(email_outbox)")
+    if "queued_by" not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute(
+            'ALTER TABLE email_outbox ADD COLUMN "queued_by" TEXT NOT NULL DEFAULT \'\''
+        )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_email_outbox_due '
+        'ON email_outbox("status", "next_attempt_at")'
+    )
+
+def _stats_link_add(stuff: str, plane: str) -> str:
+    """Ajoute une liaison matériel/avion à stats_plane_cost (corps de trigger)."""
+    return f'''
+            INSERT INTO stats_plane_cost ("ID plane", "links", "cost_count", "cost_sum")
+            SELECT {plane}, 1, m."Cost_Estimate" IS NOT NULL, COALESCE(m."Cost_Estimate", 0)
+            FROM magasin m
+            WHERE m."ID stuff" = {stuff}
+            ON CONFLICT ("ID plane") DO UPDATE SET
+                "links" = "links" + 1,
+                "cost_count" = "cost_count" + excluded."cost_count",
+                "cost_sum" = "cost_sum" + excluded."cost_sum";
+    '''
+
+def _stats_link_remove(stuff: str, plane: str) -> str:
+    """Retire une liaison matériel/avion de stats_plane_cost (corps de trigger).
+    
+    Sans effet si le matériel n'existe plus : sa suppression a déjà retiré
+    ses liaisons (trigger BEFORE DELETE sur magasin) avant la cascade.
+    """
+    cost = f'(SELECT "Cost_Estimate" FROM magasin WHERE "ID stuff" = {stuff})'
+    return f'''
+            UPDATE stats_plane_cost SET
+                "links" = "links" - 1,
+                "cost_count" = "cost_count" - ({cost} IS NOT NULL),
+                "cost_sum" = "cost_sum" - COALESCE({cost}, 0)
+            WHERE "ID plane" = {plane}
+              AND EXISTS (SELECT 1 FROM magasin WHERE "ID stuff" = {stuff});
+    '''
+
+def create_stats_summary(cursor: sqlite3.Cursor) -> bool:
+    """Crée les tables de synthèse des statistiques et leurs triggers.
+    
+    stats_magasin contient une seule ligne (pièces disponibles, pièces sous
+    le minimum, valeur du stock) et stats_plane_cost la somme et le nombre
+    de coûts par avion. Les triggers les tiennent à jour à chaque écriture :
+    les statistiques se lisent sans parcourir magasin.
+    
+    Args:
+        cursor: Curseur sur la base de données
+        
+    Returns:
+        bool: True si les tables viennent d'être créées (et remplies)
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_magasin'"
+    )
+    exists = cursor.fetchone() is not None
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_magasin (
+            "id" INTEGER PRIMARY KEY CHECK("id" = 1),
+            "available" INTEGER NOT NULL DEFAULT 0,
+            "below_minimum" INTEGER NOT NULL DEFAULT 0,
+            "stock_value" REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_plane_cost (
+            "ID plane" INTEGER PRIMARY KEY,
+            "links" INTEGER NOT NULL DEFAULT 0,
+            "cost_count" INTEGER NOT NULL DEFAULT 0,
+            "cost_sum" REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    
+    # Une pièce est disponible si Quantity >= Minimum (NULL : sous le minimum)
+    def available(row: str) -> str:
+        return f'COALESCE({row}."Quantity" >= {row}."Minimum", 0)'
+    
+    def value(row: str) -> str:
+        return f'COALESCE({row}."Quantity" * {row}."Cost_Estimate", 0)'
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_magasin_insert
+        AFTER INSERT ON magasin
+        BEGIN
+            UPDATE stats_magasin SET
+                "available" = "available" + {available("NEW")},
+                "below_minimum" = "below_minimum" + 1 - {available("NEW")},
+                "stock_value" = "stock_value" + {value("NEW")}
+            WHERE "id" = 1;
+        END;
+    ''')
+    # BEFORE : les liaisons existent encore, la cascade les supprime ensuite
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_magasin_delete
+        BEFORE DELETE ON magasin
+        BEGIN
+            UPDATE stats_magasin SET
+                "available" = "available" - {available("OLD")},
+                "below_minimum" = "below_minimum" - 1 + {available("OLD")},
+                "stock_value" = "stock_value" - {value("OLD")}
+            WHERE "id" = 1;
+            
+            UPDATE stats_plane_cost SET
+                "links" = "links" - 1,
+                "cost_count" = "cost_count" - (OLD."Cost_Estimate" IS NOT NULL),
+                "cost_sum" = "cost_sum" - COALESCE(OLD."Cost_Estimate", 0)
+            WHERE "ID plane" IN (
+                SELECT "ID plane" FROM planes_magasin WHERE "ID stuff" = OLD."ID stuff"
+            );
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_magasin_update
+        AFTER UPDATE OF "Quantity", "Minimum", "Cost_Estimate" ON magasin
+        BEGIN
+            UPDATE stats_magasin SET
+                "available" = "available" - {available("OLD")} + {available("NEW")},
+                "below_minimum" = "below_minimum" + {available("OLD")} - {available("NEW")},
+                "stock_value" = "stock_value" - {value("OLD")} + {value("NEW")}
+            WHERE "id" = 1;
+            
+            UPDATE stats_plane_cost SET
+                "cost_count" = "cost_count"
+                    - (OLD."Cost_Estimate" IS NOT NULL) + (NEW."Cost_Estimate" IS NOT NULL),
+                "cost_sum" = "cost_sum"
+                    - COALESCE(OLD."Cost_Estimate", 0) + COALESCE(NEW."Cost_Estimate", 0)
+            WHERE OLD."Cost_Estimate" IS NOT NEW."Cost_Estimate"
+              AND "ID plane" IN (
+                SELECT "ID plane" FROM planes_magasin WHERE "ID stuff" = NEW."ID stuff"
+              );
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_links_insert
+        AFTER INSERT ON planes_magasin
+        BEGIN
+            {_stats_link_add('NEW."ID stuff"', 'NEW."ID plane"')}
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_links_delete
+        AFTER DELETE ON planes_magasin
+        BEGIN
+            {_stats_link_remove('OLD."ID stuff"', 'OLD."ID plane"')}
+        END;
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stats_links_update
+        AFTER UPDATE OF "ID stuff", "ID plane" ON planes_magasin
+        BEGIN
+            {_stats_link_remove('OLD."ID stuff"', 'OLD."ID plane"')}
+            {_stats_link_add('NEW."ID stuff"', 'NEW."ID plane"')}
+        END;
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_planes_delete
+        AFTER DELETE ON planes
+        BEGIN
+            DELETE FROM stats_plane_cost WHERE "ID plane" = OLD."ID plane";
+        END;
+    ''')
+    
+    if not exists:
+        # Synthèse des lignes déjà présentes
+        rebuild_stats_summary(cursor)
+    return not exists
+
+def rebuild_stats_summary(cursor: Optional[sqlite3.Cursor] = None) -> bool:
+    """Recalcule entièrement les tables de synthèse depuis magasin et planes_magasin.
+    
+    Args:
+        cursor: Curseur à utiliser (connexion du pool, validée ici, si None)
+        
+    Returns:
+        bool: True si le recalcul est réussi, False sinon
+    """
+    statements = (
+        'DELETE FROM stats_magasin',
+        '''
+        INSERT INTO stats_magasin ("id", "available", "below_minimum", "stock_value")
+        SELECT 1,
+               TOTAL(COALESCE("Quantity" >= "Minimum", 0)),
+               COUNT(*) - TOTAL(COALESCE("Quantity" >= "Minimum", 0)),
+               TOTAL("Quantity" * "Cost_Estimate")
+        FROM magasin
+        ''',
+        'DELETE FROM stats_plane_cost',
+        '''
+        INSERT INTO stats_plane_cost ("ID plane", "links", "cost_count", "cost_sum")
+        SELECT pm."ID plane", COUNT(*), COUNT(m."Cost_Estimate"), TOTAL(m."Cost_Estimate")
+        FROM planes_magasin pm
+        JOIN magasin m ON m."ID stuff" = pm."ID stuff"
+        GROUP BY pm."ID plane"
+        '''
+    )
+    if cursor is not None:
+        for statement in statements:
+            cursor.execute(statement)
+        return True
+    
+    try:
+        with pool.connection() as conn:
+            for statement in statements:
+                conn.execute(statement)
+        return True
+    except Exception as e:
+        print(f"Erreur lors du recalcul des statistiques : {str(e)}")
+        return False
+
+def check_stats_summary() -> Tuple[bool, List[str]]:
+    """Compare les tables de synthèse aux agrégats recalculés sur magasin.
+    
+    Returns:
+        Tuple[bool, List[str]]: (True si cohérentes, liste des écarts)
+    """
+    problems = []
+    try:
+        with pool.connection() as conn:
+            summary = conn.execute(
+                'SELECT "available", "below_minimum", "stock_value" FROM stats_magasin'
+            ).fetchone() or (0, 0, 0.0)
+            live = conn.execute('''
+                SELECT TOTAL(COALESCE("Quantity" >= "Minimum", 0)),
+                       COUNT(*) - TOTAL(COALESCE("Quantity" >= "Minimum", 0)),
+                       TOTAL("Quantity" * "Cost_Estimate")
+                FROM magasin
+            ''').fetchone()
+            
+            for label, stored, expected in zip(
+                ("pièces disponibles", "pièces sous le minimum", "valeur du stock"),
+                summary, live
+            ):
+                if abs(stored - expected) > STATS_COST_TOLERANCE * max(1.0, abs(expected)):
+                    problems.append(f"Synthèse incohérente ({label}) : {stored} au lieu de {expected}")
+            
+            stored_planes = {
+                row[0]: row[1:] for row in conn.execute(
+                    'SELECT "ID plane", "links", "cost_count", "cost_sum" '
+                    'FROM stats_plane_cost WHERE "links" != 0'
+                )
+            }
+            live_planes = {
+                row[0]: row[1:] for row in conn.execute('''
+                    SELECT pm."ID plane", COUNT(*), COUNT(m."Cost_Estimate"), TOTAL(m."Cost_Estimate")
+                    FROM planes_magasin pm
+                    JOIN magasin m ON m."ID stuff" = pm."ID stuff"
+                    GROUP BY pm."ID plane"
+                ''')
+            }
+            for plane_id in sorted(set(stored_planes) | set(live_planes)):
+                stored = stored_planes.get(plane_id, (0, 0, 0.0))
+                expected = live_planes.get(plane_id, (0, 0, 0.0))
+                if stored[:2] != expected[:2] or abs(stored[2] - expected[2]) > \
+                        STATS_COST_TOLERANCE * max(1.0, abs(expected[2])):
+                    problems.append(
+                        f"Synthèse incohérente pour l'avion {plane_id} : {stored} au lieu de {expected}"
+                    )
+        
+        return not problems, problems
+        
+    except Exception as e:
+        return False, [f"Erreur lors de la vérification des statistiques : {str(e)}"]
+
+def rebuild_fts_index() -> bool:
+    """Reconstruit entièrement l'index plein texte depuis la table magasin.
+    
+    Returns:
+        bool: True si la reconstruction est réussie, False sinon
+    """
+    try:
+        with pool.connection() as conn:
+            conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return True
+    except Exception as e:
+        print(f"Erreur lors de la reconstruction de l'index plein texte : {str(e)}")
+        return False
+
+def init_db(db_path: Optional[str] = None) -> bool:
     """Initialise la base de données et crée les tables si elles n'existent pas.
     
+    Args:
+        db_path: Chemin d'une autre base à initialiser (base par défaut si None)
+    
     Returns:
         bool: True si l'initialisation est réussie, False sinon
         
@@ -59,13 +765,9 @@ def init_db() -> bool:
         if not valid:
             raise AssertionError(message)
         
-        db_path = os.path.join(RESOURCES_PATH, "bdd_all.db")
-        conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
+        conn = pool.acquire(db_path)
         cursor = conn.cursor()
         
-        # Activation des clés étrangères
-        cursor.execute("PRAGMA foreign_keys = ON")
-        
         # Création de la table users avec la colonne last_login
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -130,6 +832,7 @@ def init_db() -> bool:
         # Création des index pour optimiser les recherches
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_magasin_numero ON magasin("Numero")')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_magasin_description ON magasin("Description")')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_magasin_updated_at ON magasin("updated_at")')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_planes_name ON planes("name")')
         
         # Création des triggers pour la mise à jour automatique
@@ -142,8 +845,28 @@ def init_db() -> bool:
             END;
         ''')
         
+        # Journal des mouvements de stock
+        create_stock_ledger(cursor)
+        
+        # Suivi des imports incrémentaux
+        create_import_tracking(cursor)
+        
+        # Journal des modifications pour le catalogue en mémoire
+        create_change_log(cursor)
+        
+        # File d'envoi des emails
+        create_email_outbox(cursor)
+        
+        # Synthèse des statistiques tenue à jour par triggers
+        create_stats_summary(cursor)
+        
+        # Index plein texte pour la recherche de matériel
+        try:
+            create_fts_index(cursor)
+        except sqlite3.OperationalError as e:
+            print(f"Index plein texte indisponible : {str(e)}")
+        
         conn.commit()
-        conn.close()
         print("Base de données initialisée avec succès")
         return True
         
@@ -153,46 +876,34 @@ def init_db() -> bool:
     except Exception as e:
         print(f"Erreur lors de l'initialisation de la base de données : {str(e)}")
         return False
+    finally:
+        if 'conn' in locals() and conn:
+            pool.release(conn, db_path)
 
 def get_db_connection() -> Optional[sqlite3.Connection]:
-    """Établit et retourne une connexion à la base de données.
+    """Récupère la connexion du thread courant depuis le pool partagé.
     
     Returns:
         Optional[sqlite3.Connection]: Connexion à la base de données ou None si erreur
         
     Note:
-        La connexion doit être fermée par l'appelant après utilisation
+        La connexion doit être rendue au pool par l'appelant avec
+        pool.release(), et non fermée
     """
-    retries = 0
-    while retries < MAX_RETRIES:
-        try:
-            # Vérification du chemin
-            valid, message = check_db_path()
-            if not valid:
-                print(message)
-                return None
-            
-            db_path = os.path.join(RESOURCES_PATH, "bdd_all.db")
-            conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
-            
-            # Activation des clés étrangères
-            conn.execute("PRAGMA foreign_keys = ON")
-            
-            return conn
-            
-        except sqlite3.Error as e:
-            print(f"Tentative {retries + 1}/{MAX_RETRIES} - Erreur : {str(e)}")
-            retries += 1
-            if retries < MAX_RETRIES:
-                import time
-                time.sleep(1)  # Attente d'une seconde avant la prochaine tentative
-    
-    print(f"Échec de connexion après {MAX_RETRIES} tentatives")
-    return None
+    try:
+        return pool.acquire()
+    except sqlite3.Error as e:
+        print(str(e))
+        return None
 
 def drop_tables() -> bool:
     """Supprime complètement les tables planes et magasin de la base de données.
     
+    Les tables qui en dépendent sont supprimées avec elles : index plein
+    texte, journal des mouvements et ses agrégats, suivi des imports,
+    journal des modifications et synthèses des statistiques. init_db les
+    recrée vides.
+    
     Returns:
         bool: True si la suppression est réussie, False sinon
         
@@ -214,12 +925,26 @@ def drop_tables() -> bool:
         cursor.execute('DROP TABLE IF EXISTS planes_magasin')
         cursor.execute('DROP TABLE IF EXISTS planes')
         cursor.execute('DROP TABLE IF EXISTS magasin')
+
+        # L'index plein texte pointe vers les anciens IDs de magasin : il est
+        # supprimé avec ses triggers et sera recréé puis rempli par init_db
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+        # Le journal, ses agrégats et le suivi des imports référencent les
+        # IDs de magasin, qui seront réattribués
+        for table in LEDGER_TABLES + IMPORT_TRACKING_TABLES + (CHANGE_TABLE,):
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        
+        # Les synthèses perdent leurs triggers avec magasin : elles sont recréées
+        cursor.execute('DROP TABLE IF EXISTS stats_plane_cost')
+        cursor.execute('DROP TABLE IF EXISTS stats_magasin')
         
         # Réactivation des clés étrangères
         cursor.execute("PRAGMA foreign_keys = ON")
         
         conn.commit()
-        conn.close()
         print("Tables supprimées avec succès")
         return True
         
@@ -228,10 +953,12 @@ def drop_tables() -> bool:
         if 'conn' in locals() and conn:
             try:
                 conn.rollback()
-                conn.close()
             except:
                 pass
         return False
+    finally:
+        if 'conn' in locals() and conn:
+            pool.release(conn)
 
 def check_db_integrity() -> Tuple[bool, List[str]]:
     """Vérifie l'intégrité de la base de données.
@@ -266,6 +993,7 @@ def check_db_integrity() -> Tuple[bool, List[str]]:
         required_indexes = [
             "idx_magasin_numero",
             "idx_magasin_description",
+            "idx_magasin_updated_at",
             "idx_planes_name"
         ]
         existing_indexes = [idx[0] for idx in indexes]
@@ -276,10 +1004,43 @@ def check_db_integrity() -> Tuple[bool, List[str]]:
         # Vérification des triggers
         cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger'")
         triggers = cursor.fetchall()
-        if "update_magasin_timestamp" not in [t[0] for t in triggers]:
+        existing_triggers = [t[0] for t in triggers]
+        if "update_magasin_timestamp" not in existing_triggers:
             problems.append("Trigger de mise à jour manquant: update_magasin_timestamp")
-            
-        conn.close()
+        
+        for trigger in LEDGER_TRIGGERS:
+            if trigger not in existing_triggers:
+                problems.append(f"Trigger du journal des mouvements manquant: {trigger}")
+        
+        for trigger in STATS_TRIGGERS:
+            if trigger not in existing_triggers:
+                problems.append(f"Trigger de synthèse des statistiques manquant: {trigger}")
+        
+        for trigger in CHANGE_TRIGGERS:
+            if trigger not in existing_triggers:
+                problems.append(f"Trigger du journal des modifications manquant: {trigger}")
+        
+        # Cohérence des tables de synthèse avec magasin
+        _, stats_problems = check_stats_summary()
+        problems.extend(stats_problems)
+        
+        # Vérification de l'index plein texte
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (FTS_TABLE,)
+        )
+        if cursor.fetchone() is None:
+            problems.append(f"Index plein texte manquant: {FTS_TABLE}")
+        else:
+            for trigger in FTS_TRIGGERS:
+                if trigger not in existing_triggers:
+                    problems.append(f"Trigger de l'index plein texte manquant: {trigger}")
+            try:
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')"
+                )
+            except sqlite3.DatabaseError as e:
+                problems.append(f"Index plein texte désynchronisé: {str(e)}")
         
         if not problems:
             return True, []
@@ -289,6 +1050,9 @@ def check_db_integrity() -> Tuple[bool, List[str]]:
     except Exception as e:
         error_msg = f"Erreur lors de la vérification de l'intégrité : {str(e)}"
         return False, [error_msg]
+    finally:
+        if 'conn' in locals() and conn:
+            pool.release(conn)
 
 def repair_db() -> bool:
     """Tente de réparer la base de données.
@@ -309,6 +1073,7 @@ def repair_db() -> bool:
         # Recréation des index manquants
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_magasin_numero ON magasin("Numero")')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_magasin_description ON magasin("Description")')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_magasin_updated_at ON magasin("updated_at")')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_planes_name ON planes("name")')
         
         # Recréation du trigger de mise à jour
@@ -321,18 +1086,39 @@ def repair_db() -> bool:
             END;
         ''')
         
+        # Recréation du journal des mouvements et de ses agrégats
+        create_stock_ledger(cursor)
+        
+        # Recréation des tables de suivi des imports
+        create_import_tracking(cursor)
+        
+        # Recréation du journal des modifications
+        create_change_log(cursor)
+        
+        # Recréation de la file d'envoi des emails
+        create_email_outbox(cursor)
+        
+        # Recréation des triggers de synthèse et recalcul des statistiques
+        if not create_stats_summary(cursor):
+            rebuild_stats_summary(cursor)
+        
+        # Recréation et resynchronisation de l'index plein texte
+        if not create_fts_index(cursor):
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        
         conn.commit()
-        conn.close()
         return True
         
     except Exception as e:
         if 'conn' in locals() and conn:
             try:
                 conn.rollback()
-                conn.close()
             except:
                 pass
         return False
+    finally:
+        if 'conn' in locals() and conn:
+            pool.release(conn)
 
 def migrate_users_table() -> bool:
     """Met à jour la structure de la table users si nécessaire.
@@ -384,7 +1170,6 @@ def migrate_users_table() -> bool:
             print("Table users mise à jour avec succès")
         
         conn.commit()
-        conn.close()
         return True
         
     except Exception as e:
@@ -392,12 +1177,28 @@ def migrate_users_table() -> bool:
         if 'conn' in locals() and conn:
             try:
                 conn.rollback()
-                conn.close()
             except:
                 pass
         return False
+    finally:
+        if 'conn' in locals() and conn:
+            pool.release(conn)
 
 if __name__ == "__main__":
+    # Recalcul des tables de synthèse seul : python init_bd.py --rebuild-stats
+    if "--rebuild-stats" in sys.argv[1:]:
+        if rebuild_stats_summary():
+            consistent, problems = check_stats_summary()
+            print("Statistiques recalculées" if consistent else "\n".join(problems))
+        sys.exit(0)
+    
+    # Purge du journal déjà agrégé : python init_bd.py --compact-ledger
+    if "--compact-ledger" in sys.argv[1:]:
+        from ressources.manip_bd import compact_stock_movements
+        success, message = compact_stock_movements()
+        print(message)
+        sys.exit(0 if success else 1)
+    
     # Initialisation et vérification de la base
     if init_db():
         # Migration de la table users si nécessaire
@@ -214,4 +214,5 @@ def add_material_from_excel(
         return False, f"Erreur inattendue : {str(e)}"
 
 if __name__ == "__main__":
+    bdd_users.init_db()
     add_materials()
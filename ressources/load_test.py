@@ -0,0 +1,521 @@
+"""
+Module de test de charge multi-processus sur une base SQLite partagée.
+
+Ce module simule plusieurs postes de travail utilisant le même fichier
+bdd_all.db : N processus exécutent pendant une durée donnée un mélange
+configurable de recherches, de retraits, de remises en stock et d'imports,
+en passant par les fonctions de l'application (search_material,
+apply_stock_movement, BulkImporter). Les retraits visent un petit ensemble
+de pièces « chaudes » pour provoquer la contention.
+
+Le rapport donne le débit, les centiles de latence par opération, le
+nombre d'erreurs SQLITE_BUSY (« database is locked ») et les violations
+d'invariants constatées à la fin : stock négatif, mise à jour perdue (stock
+final différent du stock initial augmenté des mouvements acquittés),
+journal des mouvements incomplet, pièces importées manquantes, tables de
+synthèse incohérentes.
+
+Usage :
+    python ressources/load_test.py --processes 8 --duration 20
+    python ressources/load_test.py --db /tmp/bench.db --mix search=50,withdraw=50 --busy-timeout 0.5
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter, defaultdict
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ajout du répertoire parent au path Python pour permettre l'importation des modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ressources import pool_bd
+from ressources.pool_bd import pool
+
+# Paramètres par défaut
+DEFAULT_PROCESSES = 4
+DEFAULT_DURATION = 10.0         # Durée de la charge (s)
+DEFAULT_MIX = {"search": 60, "withdraw": 30, "restock": 5, "import": 5}
+DEFAULT_HOT_PARTS = 20          # Pièces visées par les mouvements de stock
+DEFAULT_IMPORT_ROWS = 100       # Lignes par import
+DEFAULT_PARTS = 10000           # Taille de la base générée si --db est absent
+DEFAULT_PLANES = 50
+START_TIMEOUT = 120             # Attente maximale du démarrage des processus (s)
+USERNAME_PREFIX = "loadtest-"
+
+OPERATIONS = ("search", "withdraw", "restock", "import")
+
+# Messages SQLite d'une base verrouillée par un autre écrivain
+BUSY_MARKERS = ("database is locked", "database is busy", "database table is locked")
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Lit un mélange d'opérations (« search=60,withdraw=30,... »).
+
+    Args:
+        text: Poids par opération, séparés par des virgules
+
+    Returns:
+        Dict[str, int]: Poids par opération
+
+    Raises:
+        ValueError: Si une opération est inconnue ou un poids invalide
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Opération inconnue : {name} (attendu : {', '.join(OPERATIONS)})")
+        mix[name] = int(weight)
+        if mix[name] < 0:
+            raise ValueError(f"Poids négatif pour {name}")
+    if not sum(mix.values()):
+        raise ValueError("Le mélange d'opérations est vide")
+    return mix
+
+
+def is_busy(message: str) -> bool:
+    """Indique si un message d'erreur correspond à SQLITE_BUSY."""
+    message = message.lower()
+    return any(marker in message for marker in BUSY_MARKERS)
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Centile d'une liste triée (0 si elle est vide)."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# ----------------------------------------------------------------------
+# Processus de charge
+# ----------------------------------------------------------------------
+
+def _run_operation(
+    name: str,
+    rng: random.Random,
+    context: Dict[str, Any],
+    state: Dict[str, Any]
+) -> str:
+    """Exécute une opération et retourne son issue.
+
+    Les fonctions de l'application signalent leurs erreurs par print() et
+    des valeurs de retour : la sortie est capturée pour distinguer une base
+    verrouillée des autres échecs.
+
+    Returns:
+        str: "ok", "refused" (refus métier, ex. stock insuffisant), "busy"
+        ou "error"
+    """
+    from ressources.manip_bd import apply_stock_movement
+    from ressources.bulk_import import BulkImporter
+    from ressources import bench_data
+
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            if name == "search":
+                state["queries"].search_material(rng.choice(context["terms"]))
+                outcome = "ok"
+
+            elif name in ("withdraw", "restock"):
+                part_id = rng.choice(context["hot_parts"])
+                delta = -rng.randint(1, 2) if name == "withdraw" else rng.randint(1, 3)
+                success, message, _ = apply_stock_movement(
+                    part_id, delta, state["username"]
+                )
+                if success:
+                    state["deltas"][part_id] += delta
+                    state["movements"] += 1
+                    outcome = "ok"
+                elif is_busy(message):
+                    outcome = "busy"
+                elif message.startswith("Erreur"):
+                    outcome = "error"
+                else:
+                    outcome = "refused"
+
+            else:
+                state["imports"] += 1
+                materials = bench_data.synthetic_fleet_materials(
+                    context["import_rows"], context["planes"],
+                    seed=context["seed"] * 1000003 + state["index"] * 1009 + state["imports"]
+                )
+                importer = BulkImporter(db_path=context["db_path"])
+                try:
+                    importer.import_materials(materials)
+                finally:
+                    # Lots déjà validés avant une éventuelle erreur
+                    state["inserted"] += importer.inserted
+                outcome = "ok"
+
+    except sqlite3.Error as e:
+        outcome = "busy" if is_busy(str(e)) else "error"
+        output.write(str(e))
+
+    # search_material et consorts n'échouent qu'en l'écrivant
+    if outcome == "ok" and "Erreur" in output.getvalue():
+        outcome = "busy" if is_busy(output.getvalue()) else "error"
+    if outcome == "error" and len(state["errors"]) < 5:
+        state["errors"].append(output.getvalue().strip()[:300])
+    return outcome
+
+
+def worker(
+    index: int,
+    context: Dict[str, Any],
+    barrier: Any,
+    results: Any
+) -> None:
+    """Processus de charge : exécute le mélange jusqu'à la fin de la durée.
+
+    Args:
+        index: Numéro du processus
+        context: Paramètres partagés (base, durée, mélange, pièces visées...)
+        barrier: Barrière de démarrage commune à tous les processus
+        results: File où est déposé le bilan du processus
+    """
+    from ressources.request_bd import DatabaseConfig, DatabaseQueries
+
+    # Tous les accès de ce processus vont à la base testée
+    pool_bd.DB_TIMEOUT = context["busy_timeout"]
+    pool.default_path = context["db_path"]
+
+    rng = random.Random(context["seed"] * 7919 + index)
+    operations = list(context["mix"])
+    weights = [context["mix"][name] for name in operations]
+    state = {
+        "index": index,
+        "username": f"{USERNAME_PREFIX}{index}",
+        "queries": DatabaseQueries(DatabaseConfig(context["db_path"])),
+        "deltas": defaultdict(int),
+        "movements": 0,
+        "inserted": 0,
+        "imports": 0,
+        "errors": []
+    }
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, Counter] = defaultdict(Counter)
+
+    try:
+        barrier.wait(START_TIMEOUT)
+        end = time.perf_counter() + context["duration"]
+        while time.perf_counter() < end:
+            name = rng.choices(operations, weights)[0]
+            begin = time.perf_counter()
+            outcome = _run_operation(name, rng, context, state)
+            latencies[name].append((time.perf_counter() - begin) * 1000)
+            outcomes[name][outcome] += 1
+    except Exception as e:
+        state["errors"].append(f"Processus {index} interrompu : {str(e)}")
+    finally:
+        pool.close_all()
+        results.put({
+            "index": index,
+            "latencies": dict(latencies),
+            "outcomes": {name: dict(counts) for name, counts in outcomes.items()},
+            "deltas": dict(state["deltas"]),
+            "movements": state["movements"],
+            "inserted": state["inserted"],
+            "errors": state["errors"]
+        })
+
+
+# ----------------------------------------------------------------------
+# Préparation et vérification
+# ----------------------------------------------------------------------
+
+def snapshot(db_path: str, hot_parts: List[int]) -> Dict[str, Any]:
+    """Relève l'état de la base utile à la vérification des invariants.
+
+    Args:
+        db_path: Chemin de la base
+        hot_parts: Pièces visées par les mouvements de stock
+
+    Returns:
+        Dict[str, Any]: Nombre de pièces, dernier mouvement, stocks des pièces visées
+    """
+    with pool.connection(db_path) as conn:
+        placeholders = ", ".join("?" for _ in hot_parts)
+        quantities = dict(conn.execute(
+            f'SELECT "ID stuff", "Quantity" FROM magasin WHERE "ID stuff" IN ({placeholders})',
+            hot_parts
+        ).fetchall()) if hot_parts else {}
+        return {
+            "parts": conn.execute("SELECT COUNT(*) FROM magasin").fetchone()[0],
+            "last_movement": conn.execute(
+                'SELECT COALESCE(MAX("ID movement"), 0) FROM stock_movements'
+            ).fetchone()[0],
+            "quantities": quantities
+        }
+
+
+def check_invariants(
+    db_path: str,
+    before: Dict[str, Any],
+    deltas: Dict[int, int],
+    movements: int,
+    inserted: int
+) -> List[str]:
+    """Vérifie la base après la charge.
+
+    Args:
+        db_path: Chemin de la base
+        before: État relevé par snapshot() avant la charge
+        deltas: Variation de stock acquittée par pièce, tous processus confondus
+        movements: Nombre de mouvements acquittés
+        inserted: Nombre de pièces importées acquittées
+
+    Returns:
+        List[str]: Violations constatées (vide si tout est cohérent)
+    """
+    from ressources.init_bd import check_stats_summary
+
+    violations = []
+    after = snapshot(db_path, list(before["quantities"]))
+    with pool.connection(db_path) as conn:
+        negative = conn.execute('SELECT COUNT(*) FROM magasin WHERE "Quantity" < 0').fetchone()[0]
+        ledger = conn.execute(
+            '''
+            SELECT "ID stuff", SUM("delta"), COUNT(*)
+            FROM stock_movements
+            WHERE "ID movement" > ? AND "username" LIKE ?
+            GROUP BY "ID stuff"
+            ''',
+            (before["last_movement"], USERNAME_PREFIX + "%")
+        ).fetchall()
+
+    if negative:
+        violations.append(f"Stock négatif : {negative} pièce(s)")
+
+    for part_id, initial in before["quantities"].items():
+        expected = initial + deltas.get(part_id, 0)
+        final = after["quantities"].get(part_id)
+        if final != expected:
+            violations.append(
+                f"Mise à jour perdue sur la pièce {part_id} : stock {final}, "
+                f"attendu {expected} ({initial} + {deltas.get(part_id, 0)})"
+            )
+
+    ledger_deltas = {part_id: total for part_id, total, _ in ledger}
+    ledger_count = sum(count for _, _, count in ledger)
+    if ledger_count != movements:
+        violations.append(
+            f"Journal des mouvements : {ledger_count} ligne(s) pour {movements} mouvement(s) acquitté(s)"
+        )
+    for part_id in sorted(set(ledger_deltas) | set(deltas)):
+        if ledger_deltas.get(part_id, 0) != deltas.get(part_id, 0):
+            violations.append(
+                f"Journal incohérent pour la pièce {part_id} : {ledger_deltas.get(part_id, 0)} "
+                f"au lieu de {deltas.get(part_id, 0)}"
+            )
+
+    if after["parts"] != before["parts"] + inserted:
+        violations.append(
+            f"Import : {after['parts'] - before['parts']} pièce(s) ajoutée(s) "
+            f"pour {inserted} acquittée(s)"
+        )
+
+    previous = pool.default_path
+    pool.default_path = db_path
+    try:
+        consistent, problems = check_stats_summary()
+    finally:
+        pool.default_path = previous
+    if not consistent:
+        violations.extend(problems)
+    return violations
+
+
+def prepare_context(db_path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Choisit les pièces visées, les termes de recherche et les avions."""
+    from ressources import bench_data
+
+    with pool.connection(db_path) as conn:
+        candidates = [row[0] for row in conn.execute(
+            'SELECT "ID stuff" FROM magasin WHERE "Quantity" BETWEEN 5 AND 9000 ORDER BY "ID stuff"'
+        )]
+        planes = [row[0] for row in conn.execute('SELECT "name" FROM planes ORDER BY "name"')]
+    if not candidates:
+        raise RuntimeError("Aucune pièce en stock dans la base")
+
+    rng = random.Random(args.seed)
+    return {
+        "db_path": db_path,
+        "duration": args.duration,
+        "mix": args.mix,
+        "busy_timeout": args.busy_timeout,
+        "seed": args.seed,
+        "hot_parts": rng.sample(candidates, min(args.hot_parts, len(candidates))),
+        "planes": planes,
+        "import_rows": args.import_rows,
+        "terms": [
+            bench_data.PART_NOUNS[0], bench_data.PART_NOUNS[-1],
+            bench_data.PART_QUALIFIERS[0], bench_data.PROVIDERS[0], "MS2"
+        ]
+    }
+
+
+# ----------------------------------------------------------------------
+# Exécution et rapport
+# ----------------------------------------------------------------------
+
+def run_load_test(db_path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Lance les processus de charge et vérifie la base.
+
+    Args:
+        db_path: Chemin de la base testée
+        args: Options de la ligne de commande
+
+    Returns:
+        Dict[str, Any]: Bilan (débit, latences, issues, violations)
+    """
+    context = prepare_context(db_path, args)
+    before = snapshot(db_path, context["hot_parts"])
+    pool.close_all()  # Aucune connexion du parent ouverte pendant la charge
+
+    # spawn : processus indépendants, comme des postes distincts
+    mp_context = multiprocessing.get_context("spawn")
+    barrier = mp_context.Barrier(args.processes + 1)
+    results = mp_context.Queue()
+    processes = [
+        mp_context.Process(target=worker, args=(index, context, barrier, results))
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    barrier.wait(START_TIMEOUT)
+    start = time.perf_counter()
+    reports = [results.get(timeout=args.duration + START_TIMEOUT) for _ in processes]
+    wall = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, Counter] = defaultdict(Counter)
+    deltas: Counter = Counter()
+    errors = []
+    for report in reports:
+        for name, values in report["latencies"].items():
+            latencies[name].extend(values)
+        for name, counts in report["outcomes"].items():
+            outcomes[name].update(counts)
+        deltas.update(report["deltas"])
+        errors.extend(report["errors"])
+
+    movements = sum(report["movements"] for report in reports)
+    inserted = sum(report["inserted"] for report in reports)
+    violations = check_invariants(db_path, before, dict(deltas), movements, inserted)
+    pool.close_all()
+
+    operations = {}
+    for name in sorted(latencies):
+        ordered = sorted(latencies[name])
+        operations[name] = {
+            "count": len(ordered),
+            "outcomes": dict(outcomes[name]),
+            "ops_per_s": round(outcomes[name]["ok"] / wall, 1),
+            "p50_ms": round(percentile(ordered, 0.5), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "max_ms": round(ordered[-1], 2)
+        }
+    total_ok = sum(counts["ok"] for counts in outcomes.values())
+    return {
+        "processes": args.processes,
+        "duration_s": round(wall, 2),
+        "busy_timeout_s": args.busy_timeout,
+        "mix": args.mix,
+        "hot_parts": len(context["hot_parts"]),
+        "throughput_ops_s": round(total_ok / wall, 1),
+        "busy": sum(counts["busy"] for counts in outcomes.values()),
+        "errors": sum(counts["error"] for counts in outcomes.values()),
+        "operations": operations,
+        "movements": movements,
+        "inserted": inserted,
+        "violations": violations,
+        "error_samples": errors
+    }
+
+
+def format_report(summary: Dict[str, Any]) -> str:
+    """Met en forme le bilan du test de charge."""
+    lines = [
+        f"{summary['processes']} processus pendant {summary['duration_s']} s "
+        f"(attente de verrou : {summary['busy_timeout_s']} s, "
+        f"{summary['hot_parts']} pièces visées)",
+        f"Débit : {summary['throughput_ops_s']} opérations acquittées/s, "
+        f"SQLITE_BUSY : {summary['busy']}, autres erreurs : {summary['errors']}",
+        f"{'opération':10} {'nombre':>7} {'ok/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>9}  issues"
+    ]
+    for name, stats in summary["operations"].items():
+        issues = ", ".join(f"{key} {value}" for key, value in sorted(stats["outcomes"].items()))
+        lines.append(
+            f"{name:10} {stats['count']:7d} {stats['ops_per_s']:8.1f} {stats['p50_ms']:8.2f} "
+            f"{stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f} {stats['max_ms']:9.1f}  {issues}"
+        )
+    lines.append(f"Mouvements acquittés : {summary['movements']}, pièces importées : {summary['inserted']}")
+    if summary["violations"]:
+        lines.append(f"{len(summary['violations'])} violation(s) d'invariant :")
+        lines.extend(f"  - {violation}" for violation in summary["violations"])
+    else:
+        lines.append("Invariants respectés")
+    for error in summary["error_samples"]:
+        lines.append(f"  erreur : {error}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande.
+
+    Returns:
+        int: 0 si les invariants sont respectés, 1 sinon
+    """
+    parser = argparse.ArgumentParser(description="Test de charge multi-processus de la base")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="Durée de la charge (s)")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Poids des opérations, ex. search=60,withdraw=30,restock=5,import=5")
+    parser.add_argument("--busy-timeout", type=float, default=pool_bd.DB_TIMEOUT,
+                        help="Attente maximale d'un verrou par connexion (s)")
+    parser.add_argument("--hot-parts", type=int, default=DEFAULT_HOT_PARTS)
+    parser.add_argument("--import-rows", type=int, default=DEFAULT_IMPORT_ROWS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="Base testée (une copie est conseillée) ; "
+                                     "générée dans un dossier temporaire si absente")
+    parser.add_argument("--output", help="Fichier JSON du bilan")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.db:
+            db_path = os.path.abspath(args.db)
+        else:
+            from ressources import bench_data
+            db_path = os.path.join(tmp_dir, "load_test.db")
+            print(f"Génération de {DEFAULT_PARTS} pièces et {DEFAULT_PLANES} avions...")
+            bench_data.generate_database(db_path, DEFAULT_PARTS, DEFAULT_PLANES, seed=args.seed)
+            pool.close_all()
+        try:
+            summary = run_load_test(db_path, args)
+        finally:
+            pool.close_all()
+
+    print(format_report(summary))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+    return 1 if summary["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
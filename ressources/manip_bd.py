@@ -12,6 +12,7 @@ from typing import Tuple, Optional, Dict, Any
 from datetime import datetime
 
 from ressources.request_bd import db
+from ressources.pool_bd import pool
 
 # Constantes de sécurité
 MAX_NAME_LENGTH = 100
@@ -26,6 +27,8 @@ MIN_COST = 0.0
 DB_TIMEOUT = 30
 MAX_RETRIES = 3
 MAX_BATCH_SIZE = 100
+LEDGER_RETENTION_DAYS = 90          # Conservation du journal brut des mouvements
+DAILY_ROLLUP_RETENTION_DAYS = 730   # Conservation des agrégats journaliers
 
 # Expression régulière pour la validation des noms d'avions
 PLANE_NAME_PATTERN = re.compile(r'^[A-Z0-9-]{2,}$')
@@ -35,6 +38,26 @@ PN_PATTERN = re.compile(r'^[A-Za-z0-9\-\./\s\(\)_,±°\'\"]+$')
 ORDER_PATTERN = re.compile(r'^[A-Za-z0-9\-\./\s\(\)_,±°\'\"]*$')  # Peut être vide
 PROVIDER_PATTERN = re.compile(r'^[A-Za-z0-9\s\-\.\(\)_,±°\'\"&/]*$')  # Peut être vide
 
+# Règles de validation d'un matériel, dans l'ordre de vérification, partagées
+# par validate_material et par la validation vectorisée de l'import :
+# (argument de validate_material, champ, pattern, longueur max, obligatoire)
+MATERIAL_TEXT_RULES = (
+    ("description", "Description", PROVIDER_PATTERN, MAX_DESCRIPTION_LENGTH, True),
+    ("providers", "Providers", PROVIDER_PATTERN, MAX_PROVIDER_LENGTH, False),
+    ("providers_actf", "Providers_ACTF", PROVIDER_PATTERN, MAX_PROVIDER_LENGTH, False),
+    ("pn", "PN", PN_PATTERN, MAX_PN_LENGTH, True),
+    ("order", "Order", ORDER_PATTERN, MAX_ORDER_LENGTH, False),
+    ("rayonnage", "Rayonnage", PROVIDER_PATTERN, MAX_NAME_LENGTH, True),
+    ("etagere", "Etagere", PROVIDER_PATTERN, MAX_NAME_LENGTH, True)
+)
+# (argument de validate_material, champ, minimum, maximum)
+MATERIAL_NUMERIC_RULES = (
+    ("quantity", "Quantity", MIN_QUANTITY, MAX_QUANTITY),
+    ("minimum", "Minimum", MIN_QUANTITY, MAX_QUANTITY),
+    ("cost", "Cost", MIN_COST, MAX_COST),
+    ("stock", "Stock", MIN_COST, MAX_COST)
+)
+
 # Chemin absolu du dossier ressources
 RESOURCES_PATH = os.path.dirname(os.path.abspath(__file__))
 
@@ -126,40 +149,29 @@ def validate_plane_name(name: str) -> Tuple[bool, str]:
         return False, f"Erreur lors de la validation : {str(e)}"
 
 def get_db_connection() -> Optional[sqlite3.Connection]:
-    """Établit une connexion sécurisée à la base de données.
+    """Récupère la connexion du thread courant depuis le pool partagé.
     
     Returns:
         Optional[sqlite3.Connection]: Connexion à la base de données ou None si erreur
+        
+    Note:
+        La connexion doit être rendue au pool par l'appelant avec
+        release_db_connection(), et non fermée
     """
-    retries = 0
-    while retries < MAX_RETRIES:
-        try:
-            db_path = os.path.join(RESOURCES_PATH, "bdd_all.db")
-            
-            if not os.path.exists(db_path):
-                print(f"La base de données n'existe pas : {db_path}")
-                return None
-                
-            if not os.access(db_path, os.W_OK):
-                print(
-                    f"La base de données n'est pas accessible en écriture : {db_path}"
-                )
-                return None
-            
-            conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
-            conn.execute("PRAGMA foreign_keys = ON")
-            conn.execute("PRAGMA journal_mode = WAL")
-            
-            return conn
-            
-        except sqlite3.Error as e:
-            print(f"Tentative {retries + 1}/{MAX_RETRIES} - Erreur : {str(e)}")
-            retries += 1
-            if retries < MAX_RETRIES:
-                time.sleep(1)
+    try:
+        return pool.acquire()
+    except sqlite3.Error as e:
+        print(str(e))
+        return None
+
+def release_db_connection(conn: Optional[sqlite3.Connection]) -> None:
+    """Rend au pool une connexion obtenue par get_db_connection().
     
-    print(f"Échec de connexion après {MAX_RETRIES} tentatives")
-    return None
+    Args:
+        conn: Connexion à rendre (ignorée si None)
+    """
+    if conn is not None:
+        pool.release(conn)
 
 def check_plane_exists(name: str) -> bool:
     """Vérifie si un avion existe déjà dans la base de données.
@@ -242,11 +254,7 @@ def ajout_plane(name: str) -> Tuple[bool, str]:
                 pass
         return False, f"Erreur lors de l'ajout de l'avion : {str(e)}"
     finally:
-        if conn:
-            try:
-                conn.close()
-            except:
-                pass
+        release_db_connection(conn)
 
 def ajouter_relations_piece_avions(
     piece_id: int,
@@ -333,11 +341,67 @@ def ajouter_relations_piece_avions(
                 pass
         return False, f"Erreur lors de l'ajout des relations : {str(e)}"
     finally:
-        if conn:
-            try:
-                conn.close()
-            except:
-                pass
+        release_db_connection(conn)
+
+def validate_material(
+    description: str,
+    providers: str,
+    providers_actf: str,
+    pn: str,
+    order: str,
+    rayonnage: str,
+    etagere: str,
+    quantity: int,
+    minimum: int,
+    cost: float,
+    stock: float,
+    maintenance: Dict[str, bool]
+) -> None:
+    """Valide les champs d'un matériel avant insertion.
+    
+    Utilisée par l'ajout unitaire comme par l'import en masse, afin que
+    les deux chemins appliquent exactement les mêmes règles.
+    
+    Args:
+        description: Description du matériel
+        providers: Fournisseurs
+        providers_actf: Fournisseurs ACTF
+        pn: Part Number
+        order: Numéro de commande
+        rayonnage: Emplacement rayonnage
+        etagere: Emplacement étagère
+        quantity: Quantité en stock
+        minimum: Quantité minimum
+        cost: Coût unitaire
+        stock: Valeur du stock
+        maintenance: Dict des avions concernés par la maintenance
+        
+    Raises:
+        ValidationError: Si un champ est invalide
+    """
+    values = {
+        "description": description, "providers": providers,
+        "providers_actf": providers_actf, "pn": pn, "order": order,
+        "rayonnage": rayonnage, "etagere": etagere, "quantity": quantity,
+        "minimum": minimum, "cost": cost, "stock": stock
+    }
+    
+    # Validation des champs textuels
+    for key, field, pattern, max_length, required in MATERIAL_TEXT_RULES:
+        validate_field(values[key], pattern, field, max_length, required=required)
+    
+    # Validation des champs numériques
+    for key, field, min_value, max_value in MATERIAL_NUMERIC_RULES:
+        validate_numeric(values[key], min_value, max_value, field)
+    
+    # Validation de la maintenance
+    if not isinstance(maintenance, dict):
+        raise ValidationError("Le champ maintenance doit être un dictionnaire")
+    for key in ["50h", "100h", "200h"]:
+        if key not in maintenance:
+            raise ValidationError(f"Clé manquante dans maintenance : {key}")
+        if not isinstance(maintenance[key], bool):
+            raise ValidationError(f"Valeur invalide pour maintenance[{key}]")
 
 def ajouter_materiel(
     numero: str,
@@ -380,35 +444,10 @@ def ajouter_materiel(
     """
     conn = None
     try:
-        # Validation des champs textuels
-        validate_field(description, PROVIDER_PATTERN, "Description", 
-                      MAX_DESCRIPTION_LENGTH)
-        validate_field(providers, PROVIDER_PATTERN, "Providers", 
-                      MAX_PROVIDER_LENGTH, required=False)
-        validate_field(providers_actf, PROVIDER_PATTERN, "Providers_ACTF",
-                      MAX_PROVIDER_LENGTH, required=False)
-        validate_field(pn, PN_PATTERN, "PN", MAX_PN_LENGTH)
-        validate_field(order, ORDER_PATTERN, "Order", MAX_ORDER_LENGTH, 
-                      required=False)
-        validate_field(rayonnage, PROVIDER_PATTERN, "Rayonnage", 
-                      MAX_NAME_LENGTH)
-        validate_field(etagere, PROVIDER_PATTERN, "Etagere", 
-                      MAX_NAME_LENGTH)
-        
-        # Validation des champs numériques
-        validate_numeric(quantity, MIN_QUANTITY, MAX_QUANTITY, "Quantity")
-        validate_numeric(minimum, MIN_QUANTITY, MAX_QUANTITY, "Minimum")
-        validate_numeric(cost, MIN_COST, MAX_COST, "Cost")
-        validate_numeric(stock, MIN_COST, MAX_COST, "Stock")
-        
-        # Validation de la maintenance
-        if not isinstance(maintenance, dict):
-            raise ValidationError("Le champ maintenance doit être un dictionnaire")
-        for key in ["50h", "100h", "200h"]:
-            if key not in maintenance:
-                raise ValidationError(f"Clé manquante dans maintenance : {key}")
-            if not isinstance(maintenance[key], bool):
-                raise ValidationError(f"Valeur invalide pour maintenance[{key}]")
+        validate_material(
+            description, providers, providers_actf, pn, order,
+            rayonnage, etagere, quantity, minimum, cost, stock, maintenance
+        )
         
         conn = get_db_connection()
         if conn is None:
@@ -457,11 +496,164 @@ def ajouter_materiel(
         print(f"Erreur inattendue : {str(e)}")
         return False, f"Erreur lors de l'ajout du matériel : {str(e)}"
     finally:
-        if conn:
-            try:
-                conn.close()
-            except:
-                pass
+        release_db_connection(conn)
+
+def apply_stock_movement(
+    part_id: int,
+    delta: int,
+    username: Optional[str] = None,
+    plane_id: Optional[int] = None
+) -> Tuple[bool, str, Optional[int]]:
+    """Applique un mouvement de stock à une pièce de manière atomique.
+    
+    La quantité est modifiée par une seule requête UPDATE ... RETURNING
+    sur l'ID de la pièce : la lecture et l'écriture ne peuvent pas être
+    entrelacées avec celles d'un autre poste, et le stock ne peut jamais
+    devenir négatif. Le mouvement est inscrit dans stock_movements dans
+    la même transaction.
+    
+    Args:
+        part_id: ID de la pièce ("ID stuff")
+        delta: Variation de quantité (positive pour un ajout,
+            négative pour un retrait)
+        username: Utilisateur à l'origine du mouvement
+        plane_id: ID de l'avion auquel la pièce est destinée
+        
+    Returns:
+        Tuple[bool, str, Optional[int]]: (succès, message, nouvelle quantité)
+    """
+    try:
+        if not isinstance(part_id, int) or part_id <= 0:
+            raise ValidationError("L'ID de la pièce doit être un entier positif")
+        if not isinstance(delta, int) or isinstance(delta, bool) or delta == 0:
+            raise ValidationError("La variation de quantité doit être un entier non nul")
+        validate_numeric(abs(delta), 1, MAX_QUANTITY, "Quantité")
+        if plane_id is not None and (not isinstance(plane_id, int) or plane_id <= 0):
+            raise ValidationError("L'ID de l'avion doit être un entier positif")
+        
+        with pool.connection() as conn:
+            if plane_id is not None and conn.execute(
+                'SELECT 1 FROM planes WHERE "ID plane" = ?', (plane_id,)
+            ).fetchone() is None:
+                return False, "Avion inconnu", None
+            
+            row = conn.execute(
+                '''
+                UPDATE magasin
+                SET "Quantity" = "Quantity" + ?
+                WHERE "ID stuff" = ? AND "Quantity" + ? >= 0
+                RETURNING "Quantity"
+                ''',
+                (delta, part_id, delta)
+            ).fetchone()
+            
+            if row is None:
+                # Échec : distinction entre pièce inconnue et stock insuffisant
+                current = conn.execute(
+                    'SELECT "Quantity" FROM magasin WHERE "ID stuff" = ?',
+                    (part_id,)
+                ).fetchone()
+                if current is None:
+                    return False, "Matériel non trouvé dans la base de données", None
+                return False, (
+                    f"Stock insuffisant\nQuantité disponible : {current[0]}"
+                ), current[0]
+            
+            # Inscription au journal (les agrégats suivent par trigger)
+            conn.execute(
+                '''
+                INSERT INTO stock_movements (
+                    "ID stuff", "ID plane", "username", "delta", "quantity_after"
+                )
+                VALUES (?, ?, ?, ?, ?)
+                ''',
+                (part_id, plane_id, username, delta, row[0])
+            )
+        
+        return True, "Stock mis à jour avec succès", row[0]
+        
+    except ValidationError as e:
+        print(f"Erreur de validation : {str(e)}")
+        return False, str(e), None
+    except sqlite3.IntegrityError as e:
+        print(f"Erreur d'intégrité : {str(e)}")
+        if "FOREIGN KEY" in str(e):
+            # Avion ou pièce supprimé par un autre poste entre-temps
+            return False, "Avion ou matériel inconnu", None
+        if "CHECK" in str(e):
+            return False, f"La quantité maximale ({MAX_QUANTITY}) serait dépassée", None
+        return False, f"Erreur d'intégrité : {str(e)}", None
+    except Exception as e:
+        print(f"Erreur inattendue lors du mouvement de stock : {str(e)}")
+        return False, f"Erreur lors de la mise à jour : {str(e)}", None
+
+def compact_stock_movements(
+    retention_days: int = LEDGER_RETENTION_DAYS,
+    daily_retention_days: int = DAILY_ROLLUP_RETENTION_DAYS
+) -> Tuple[bool, str]:
+    """Purge les mouvements bruts et agrégats journaliers anciens.
+    
+    Les mouvements sont agrégés dès leur insertion : supprimer les lignes
+    brutes anciennes ne modifie ni les agrégats ni recent_materials. Les
+    agrégats hebdomadaires sont conservés sans limite.
+    
+    Args:
+        retention_days: Nombre de jours de journal brut conservés
+        daily_retention_days: Nombre de jours d'agrégats journaliers conservés
+        
+    Returns:
+        Tuple[bool, str]: (succès, message)
+    """
+    try:
+        validate_numeric(retention_days, 1, 36500, "retention_days")
+        validate_numeric(daily_retention_days, retention_days, 36500, "daily_retention_days")
+        
+        raw_cutoff = f"-{int(retention_days)} days"
+        daily_cutoff = f"-{int(daily_retention_days)} days"
+        
+        with pool.connection() as conn:
+            # Vérification en lecture seule : pas de verrou d'écriture
+            # lorsque rien n'est à purger (cas courant au démarrage)
+            pending = conn.execute(
+                '''
+                SELECT EXISTS (
+                    SELECT 1 FROM stock_movements
+                    WHERE "created_at" < datetime('now', ?)
+                ) OR EXISTS (
+                    SELECT 1 FROM stock_movements_daily
+                    WHERE "day" < date('now', ?)
+                )
+                ''',
+                (raw_cutoff, daily_cutoff)
+            ).fetchone()[0]
+            if not pending:
+                return True, "Aucun mouvement à purger"
+            
+            raw_deleted = conn.execute(
+                '''
+                DELETE FROM stock_movements
+                WHERE "created_at" < datetime('now', ?)
+                ''',
+                (raw_cutoff,)
+            ).rowcount
+            daily_deleted = conn.execute(
+                '''
+                DELETE FROM stock_movements_daily
+                WHERE "day" < date('now', ?)
+                ''',
+                (daily_cutoff,)
+            ).rowcount
+        
+        return True, (
+            f"{raw_deleted} mouvement(s) et {daily_deleted} agrégat(s) journalier(s) purgés"
+        )
+        
+    except ValidationError as e:
+        print(f"Erreur de validation : {str(e)}")
+        return False, str(e)
+    except Exception as e:
+        print(f"Erreur lors de la purge du journal : {str(e)}")
+        return False, f"Erreur lors de la purge du journal : {str(e)}"
 
 if __name__ == "__main__":
     import sys
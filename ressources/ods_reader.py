@@ -0,0 +1,209 @@
+"""
+Module de lecture en flux des fichiers ODS.
+
+Ce module lit une feuille de calcul OpenDocument ligne par ligne, en
+analysant content.xml directement dans l'archive ODS avec iterparse. Les
+lignes sont produites au fur et à mesure et retirées de l'arbre XML après
+lecture : la mémoire consommée ne dépend pas de la taille du fichier.
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import date, datetime
+from typing import Any, Iterator, List, Optional, Union
+
+# Espaces de noms OpenDocument
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+TABLE_TAG = f"{{{TABLE_NS}}}table"
+ROW_TAG = f"{{{TABLE_NS}}}table-row"
+CELL_TAGS = (f"{{{TABLE_NS}}}table-cell", f"{{{TABLE_NS}}}covered-table-cell")
+PARAGRAPH_TAGS = (f"{{{TEXT_NS}}}p", f"{{{TEXT_NS}}}h")
+SPACE_TAG = f"{{{TEXT_NS}}}s"
+TAB_TAG = f"{{{TEXT_NS}}}tab"
+LINE_BREAK_TAG = f"{{{TEXT_NS}}}line-break"
+
+NAME_ATTR = f"{{{TABLE_NS}}}name"
+ROWS_REPEATED_ATTR = f"{{{TABLE_NS}}}number-rows-repeated"
+COLUMNS_REPEATED_ATTR = f"{{{TABLE_NS}}}number-columns-repeated"
+VALUE_TYPE_ATTR = f"{{{OFFICE_NS}}}value-type"
+VALUE_ATTR = f"{{{OFFICE_NS}}}value"
+BOOLEAN_VALUE_ATTR = f"{{{OFFICE_NS}}}boolean-value"
+DATE_VALUE_ATTR = f"{{{OFFICE_NS}}}date-value"
+TIME_VALUE_ATTR = f"{{{OFFICE_NS}}}time-value"
+
+NUMERIC_TYPES = ("float", "percentage", "currency")
+
+
+def _paragraph_text(element: ET.Element) -> str:
+    """Reconstitue le texte d'un paragraphe (espaces, tabulations, sauts de ligne).
+
+    Args:
+        element: Élément text:p ou l'un de ses descendants
+
+    Returns:
+        str: Texte du paragraphe
+    """
+    parts = [element.text or ""]
+    for child in element:
+        if child.tag == SPACE_TAG:
+            parts.append(" " * int(child.get(f"{{{TEXT_NS}}}c", "1")))
+        elif child.tag == TAB_TAG:
+            parts.append("\t")
+        elif child.tag == LINE_BREAK_TAG:
+            parts.append("\n")
+        else:
+            parts.append(_paragraph_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def cell_value(cell: ET.Element) -> Any:
+    """Convertit une cellule ODS en valeur Python typée.
+
+    Les nombres entiers sont rendus en int, les autres nombres en float,
+    les booléens en bool, les dates en date/datetime ; le reste en texte.
+
+    Args:
+        cell: Élément table:table-cell
+
+    Returns:
+        Any: Valeur de la cellule ("" si la cellule est vide)
+    """
+    value_type = cell.get(VALUE_TYPE_ATTR)
+
+    if value_type in NUMERIC_TYPES:
+        raw = cell.get(VALUE_ATTR)
+        if raw is not None:
+            number = float(raw)
+            return int(number) if number.is_integer() else number
+    elif value_type == "boolean":
+        return cell.get(BOOLEAN_VALUE_ATTR, "false").lower() == "true"
+    elif value_type == "date":
+        raw = cell.get(DATE_VALUE_ATTR, "")
+        try:
+            return datetime.fromisoformat(raw) if "T" in raw else date.fromisoformat(raw)
+        except ValueError:
+            return raw
+    elif value_type == "time":
+        return cell.get(TIME_VALUE_ATTR, "")
+
+    paragraphs = [_paragraph_text(child) for child in cell if child.tag in PARAGRAPH_TAGS]
+    return "\n".join(paragraphs)
+
+
+def _row_values(row: ET.Element) -> List[Any]:
+    """Lit les cellules d'une ligne en dépliant les colonnes répétées.
+
+    Les cellules vides en fin de ligne sont ignorées, même lorsqu'elles
+    sont répétées des milliers de fois jusqu'au bord de la feuille.
+
+    Args:
+        row: Élément table:table-row
+
+    Returns:
+        List[Any]: Valeurs de la ligne
+    """
+    values = []
+    pending_empty = 0
+    for cell in row:
+        if cell.tag not in CELL_TAGS:
+            continue
+        repeat = int(cell.get(COLUMNS_REPEATED_ATTR, "1"))
+        value = cell_value(cell)
+        if value == "":
+            pending_empty += repeat
+            continue
+        if pending_empty:
+            values.extend([""] * pending_empty)
+            pending_empty = 0
+        values.extend([value] * repeat)
+    return values
+
+
+def iter_ods_rows(
+    file_path: str,
+    sheet: Optional[Union[str, int]] = None
+) -> Iterator[List[Any]]:
+    """Produit les lignes d'une feuille ODS une par une.
+
+    Les lignes répétées sont dépliées ; les lignes vides en fin de feuille
+    ne sont pas produites. Une ligne vide au milieu des données donne une
+    liste vide, afin que la position des lignes suivantes soit conservée.
+
+    Args:
+        file_path: Chemin vers le fichier .ods
+        sheet: Nom ou index de la feuille (première feuille si None)
+
+    Yields:
+        List[Any]: Valeurs typées de chaque ligne
+
+    Raises:
+        ValueError: Si le fichier n'est pas un ODS valide ou si la feuille
+            demandée n'existe pas
+    """
+    try:
+        archive = zipfile.ZipFile(file_path)
+    except zipfile.BadZipFile:
+        raise ValueError(f"Le fichier {file_path} n'est pas un fichier ODS valide")
+
+    with archive:
+        try:
+            content = archive.open("content.xml")
+        except KeyError:
+            raise ValueError(f"Le fichier {file_path} ne contient pas de content.xml")
+
+        with content:
+            sheet_index = -1
+            in_sheet = False
+            found = False
+            pending_blank = 0
+            stack: List[ET.Element] = []
+
+            for event, element in ET.iterparse(content, events=("start", "end")):
+                if event == "start":
+                    stack.append(element)
+                    if element.tag == TABLE_TAG:
+                        sheet_index += 1
+                        in_sheet = (
+                            sheet is None and sheet_index == 0
+                            or sheet == sheet_index
+                            or sheet == element.get(NAME_ATTR)
+                        )
+                        found = found or in_sheet
+                    continue
+
+                stack.pop()
+                if len(stack) == 1:
+                    # Sections de premier niveau (styles, polices) déjà lues
+                    element.clear()
+                    continue
+                if element.tag == TABLE_TAG:
+                    if in_sheet:
+                        return
+                    element.clear()
+                    continue
+                if element.tag != ROW_TAG:
+                    continue
+
+                if in_sheet:
+                    repeat = int(element.get(ROWS_REPEATED_ATTR, "1"))
+                    values = _row_values(element)
+                    if not values:
+                        pending_blank += repeat
+                    else:
+                        for _ in range(pending_blank):
+                            yield []
+                        pending_blank = 0
+                        for _ in range(repeat):
+                            yield list(values)
+
+                # La ligne lue est retirée de l'arbre pour libérer la mémoire
+                if stack:
+                    stack[-1].remove(element)
+                element.clear()
+
+            if not found:
+                raise ValueError(f"La feuille {sheet!r} est introuvable dans {file_path}")
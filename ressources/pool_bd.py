@@ -0,0 +1,272 @@
+"""
+Module de gestion du pool de connexions à la base de données.
+
+Ce module fournit un gestionnaire unique de connexions SQLite partagé par
+tous les modules qui accèdent à bdd_all.db. Chaque thread dispose de sa
+propre connexion longue durée, configurée une seule fois (clés étrangères,
+mode WAL), ce qui évite de rouvrir le fichier et de rejouer les PRAGMA à
+chaque petite requête.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from ressources.query_profiler import ProfiledConnection
+
+# Constantes de connexion
+DB_TIMEOUT = 30
+MAX_RETRIES = 3
+
+# Chemin absolu de la base de données par défaut
+RESOURCES_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(RESOURCES_PATH, "bdd_all.db")
+
+
+class ConnectionPool:
+    """Pool de connexions SQLite par thread.
+
+    Une connexion est ouverte par couple (thread, fichier) et réutilisée
+    jusqu'à l'appel de close_thread() par ce thread (threads de courte
+    durée) ou de close_all(). Les acquisitions imbriquées dans un même
+    thread partagent la connexion : seul le niveau le plus externe valide ou
+    annule la transaction.
+    """
+
+    def __init__(self, default_path: str = DEFAULT_DB_PATH) -> None:
+        """Initialise le pool.
+
+        Args:
+            default_path: Chemin de la base utilisée quand aucun n'est fourni
+        """
+        self.default_path = default_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all_connections: List[sqlite3.Connection] = []
+        self._checked_paths = set()
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "closed": 0,
+            "failures": 0
+        }
+
+    def _check_path(self, path: str) -> None:
+        """Vérifie une seule fois que la base est accessible.
+
+        Args:
+            path: Chemin de la base de données
+
+        Raises:
+            sqlite3.Error: Si le répertoire ou le fichier n'est pas accessible
+        """
+        if path in self._checked_paths:
+            return
+
+        db_dir = os.path.dirname(path)
+        if not os.path.exists(db_dir):
+            raise sqlite3.Error(f"Le répertoire {db_dir} n'existe pas")
+        if not os.access(db_dir, os.W_OK):
+            raise sqlite3.Error(f"Le répertoire {db_dir} n'est pas accessible en écriture")
+        if os.path.exists(path) and not os.access(path, os.W_OK):
+            raise sqlite3.Error(f"La base de données {path} n'est pas accessible en écriture")
+
+        with self._lock:
+            self._checked_paths.add(path)
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        """Ouvre et configure une nouvelle connexion, avec plusieurs tentatives.
+
+        Args:
+            path: Chemin de la base de données
+
+        Returns:
+            sqlite3.Connection: Connexion configurée
+
+        Raises:
+            sqlite3.Error: Si la connexion échoue après MAX_RETRIES tentatives
+        """
+        self._check_path(path)
+
+        last_error = None
+        for attempt in range(MAX_RETRIES):
+            try:
+                # ProfiledConnection : requêtes mesurées quand le profileur est actif
+                conn = sqlite3.connect(
+                    path, timeout=DB_TIMEOUT, check_same_thread=False,
+                    factory=ProfiledConnection
+                )
+                conn.execute("PRAGMA foreign_keys = ON")
+                conn.execute("PRAGMA journal_mode = WAL")
+
+                with self._lock:
+                    self._all_connections.append(conn)
+                    self._stats["opened"] += 1
+                return conn
+
+            except sqlite3.Error as e:
+                last_error = e
+                with self._lock:
+                    self._stats["failures"] += 1
+                print(f"Tentative {attempt + 1}/{MAX_RETRIES} - Erreur : {str(e)}")
+                if attempt + 1 < MAX_RETRIES:
+                    time.sleep(1)
+
+        raise sqlite3.Error(
+            f"Échec de connexion après {MAX_RETRIES} tentatives : {str(last_error)}"
+        )
+
+    def _thread_state(self) -> Dict[str, Dict]:
+        """Retourne l'état du thread courant (connexions et profondeur par base)."""
+        if not hasattr(self._local, "state"):
+            self._local.state = {}
+        return self._local.state
+
+    def acquire(self, path: Optional[str] = None) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant, en l'ouvrant si besoin.
+
+        Chaque appel doit être suivi d'un appel à release().
+
+        Args:
+            path: Chemin de la base (base par défaut si None)
+
+        Returns:
+            sqlite3.Connection: Connexion du thread courant
+
+        Raises:
+            sqlite3.Error: En cas d'erreur de connexion
+        """
+        path = path or self.default_path
+        state = self._thread_state()
+        entry = state.get(path)
+
+        if entry is None:
+            entry = {"conn": self._open(path), "depth": 0}
+            state[path] = entry
+        else:
+            with self._lock:
+                self._stats["reused"] += 1
+
+        entry["depth"] += 1
+        return entry["conn"]
+
+    def release(self, conn: sqlite3.Connection, path: Optional[str] = None) -> None:
+        """Rend une connexion au pool sans la fermer.
+
+        Au niveau le plus externe, une transaction laissée ouverte par
+        l'appelant est annulée, comme l'aurait fait une fermeture.
+
+        Args:
+            conn: Connexion obtenue par acquire()
+            path: Chemin de la base (base par défaut si None)
+        """
+        path = path or self.default_path
+        entry = self._thread_state().get(path)
+        if entry is None or entry["conn"] is not conn:
+            return
+
+        entry["depth"] = max(0, entry["depth"] - 1)
+        if entry["depth"] == 0 and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    def is_outermost(self, path: Optional[str] = None) -> bool:
+        """Indique si le thread courant n'a qu'une seule acquisition en cours.
+
+        Args:
+            path: Chemin de la base (base par défaut si None)
+
+        Returns:
+            bool: True si la transaction appartient à l'appelant courant
+        """
+        entry = self._thread_state().get(path or self.default_path)
+        return entry is not None and entry["depth"] <= 1
+
+    @contextmanager
+    def connection(self, path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+        """Fournit la connexion du thread dans un bloc transactionnel.
+
+        Le niveau le plus externe valide la transaction en sortie normale et
+        l'annule en cas d'exception.
+
+        Args:
+            path: Chemin de la base (base par défaut si None)
+
+        Yields:
+            sqlite3.Connection: Connexion du thread courant
+        """
+        conn = self.acquire(path)
+        try:
+            yield conn
+            if self.is_outermost(path):
+                conn.commit()
+        except Exception:
+            if self.is_outermost(path):
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn, path)
+
+    def close_thread(self) -> None:
+        """Ferme les connexions du thread courant.
+
+        À appeler par un thread de courte durée avant de se terminer : ses
+        connexions ne resteraient sinon ouvertes que jusqu'à close_all().
+        """
+        state = self._thread_state()
+        connections = [entry["conn"] for entry in state.values()]
+        state.clear()
+
+        for conn in connections:
+            with self._lock:
+                if conn not in self._all_connections:
+                    # Déjà fermée par close_all()
+                    continue
+                self._all_connections.remove(conn)
+            try:
+                conn.close()
+                with self._lock:
+                    self._stats["closed"] += 1
+            except sqlite3.Error:
+                pass
+
+    def close_all(self) -> None:
+        """Ferme toutes les connexions ouvertes par le pool, tous threads confondus."""
+        with self._lock:
+            connections = self._all_connections
+            self._all_connections = []
+            self._checked_paths.clear()
+
+        for conn in connections:
+            try:
+                conn.close()
+                with self._lock:
+                    self._stats["closed"] += 1
+            except sqlite3.Error:
+                pass
+
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Retourne les statistiques de réutilisation du pool.
+
+        Returns:
+            Dict[str, float]: Connexions ouvertes, réutilisées, fermées,
+            échecs, connexions actives et taux de réutilisation
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active"] = len(self._all_connections)
+
+        total = stats["opened"] + stats["reused"]
+        stats["reuse_ratio"] = stats["reused"] / total if total else 0.0
+        return stats
+
+
+# Instance globale partagée par tous les modules
+pool = ConnectionPool()
@@ -0,0 +1,526 @@
+"""
+Module d'instrumentation des requêtes SQL.
+
+Ce module mesure, à la demande, le coût de chaque requête exécutée sur les
+connexions du pool : nombre d'appels, histogramme des temps d'exécution
+(lecture des lignes comprise), lignes retournées, erreurs et lieux d'appel
+dans le code. Les requêtes lentes sont consignées dans un journal (une ligne
+JSON par événement), et le plan d'exécution (EXPLAIN QUERY PLAN) de chaque
+requête est relevé à sa première exécution afin de signaler celles qui
+parcourent une table entière.
+
+L'instrumentation est désactivée par défaut ; elle s'active avec la variable
+d'environnement MECASTUFF_PROFILE_SQL (valeur facultative : seuil de lenteur
+en ms), avec l'option --profile-sql de app.py, ou par query_profiler.enable().
+Désactivée, elle ne coûte qu'un test par requête.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fichiers produits (dossier ressources)
+RESOURCES_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG_PATH = os.path.join(RESOURCES_PATH, "slow_queries.log")
+DEFAULT_REPORT_PATH = os.path.join(RESOURCES_PATH, "sql_profile.txt")
+
+# Variable d'environnement d'activation
+ENV_VAR = "MECASTUFF_PROFILE_SQL"
+
+# Seuil au-delà duquel une requête est consignée (ms)
+SLOW_QUERY_MS = 100.0
+
+# Bornes supérieures des classes de l'histogramme des temps (ms)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Nombre de niveaux d'appel retenus pour situer une requête dans le code
+CALL_SITE_DEPTH = 2
+
+# Longueur maximale du texte SQL dans le rapport
+REPORT_SQL_LENGTH = 120
+
+# Requêtes dont le plan d'exécution est relevé
+PLANNED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+# Parcours complet d'une table dans un plan (« SCAN magasin », « SCAN TABLE m »)
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+# Fichiers ignorés lors de la recherche du lieu d'appel
+_SKIPPED_FILES = (os.path.abspath(__file__), os.path.join(RESOURCES_PATH, "pool_bd.py"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Normalise le texte d'une requête (espaces compactés).
+
+    Args:
+        sql: Requête SQL
+
+    Returns:
+        str: Requête sur une ligne, servant de clé aux statistiques
+    """
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    """Retourne les tables parcourues entièrement d'après un plan d'exécution.
+
+    Args:
+        plan: Lignes « detail » de EXPLAIN QUERY PLAN
+
+    Returns:
+        List[str]: Noms (ou alias) des tables parcourues sans index
+    """
+    tables = []
+    for detail in plan:
+        match = FULL_SCAN_PATTERN.match(detail)
+        if match and match.group(1) != "CONSTANT":
+            tables.append(match.group(1))
+    return tables
+
+
+@dataclass
+class StatementStats:
+    """Statistiques cumulées d'une requête."""
+    sql: str
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    call_sites: Counter = field(default_factory=Counter)
+    plan: Optional[List[str]] = None
+    scanned_tables: List[str] = field(default_factory=list)
+    last_error: Optional[str] = None
+
+    def percentile(self, fraction: float) -> float:
+        """Estime un centile des temps d'après l'histogramme.
+
+        Args:
+            fraction: Centile voulu entre 0 et 1 (0.95 pour le 95e)
+
+        Returns:
+            float: Borne supérieure de la classe contenant le centile (ms)
+        """
+        if not self.calls:
+            return 0.0
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit les statistiques en dictionnaire sérialisable."""
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram": dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ["inf"], self.histogram)),
+            "call_sites": dict(self.call_sites.most_common()),
+            "plan": self.plan,
+            "scanned_tables": self.scanned_tables,
+            "last_error": self.last_error
+        }
+
+
+class QueryProfiler:
+    """Collecte des statistiques de requêtes, partagée par tous les threads."""
+
+    def __init__(self) -> None:
+        """Initialise un profileur désactivé."""
+        self.enabled = False
+        self.slow_ms = SLOW_QUERY_MS
+        self.log_path = DEFAULT_LOG_PATH
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def enable(
+        self,
+        slow_ms: Optional[float] = None,
+        log_path: Optional[str] = None,
+        report_at_exit: bool = True
+    ) -> None:
+        """Active l'instrumentation.
+
+        Args:
+            slow_ms: Seuil de consignation des requêtes lentes (ms)
+            log_path: Chemin du journal des requêtes lentes
+            report_at_exit: Si True, écrit le rapport à la fermeture du programme
+        """
+        if slow_ms is not None:
+            self.slow_ms = float(slow_ms)
+        if log_path is not None:
+            self.log_path = log_path
+        self.enabled = True
+        if report_at_exit and not self._atexit_registered:
+            atexit.register(self.save_report)
+            self._atexit_registered = True
+
+    def disable(self) -> None:
+        """Désactive l'instrumentation (les statistiques sont conservées)."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Efface les statistiques collectées."""
+        with self._lock:
+            self._stats.clear()
+
+    # ------------------------------------------------------------------
+    # Collecte
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def call_site() -> str:
+        """Situe l'appel en cours dans le code de l'application.
+
+        Returns:
+            str: Derniers niveaux d'appel hors instrumentation, du plus
+            proche au plus lointain (« fichier:ligne fonction < ... »)
+        """
+        frame = sys._getframe(1)
+        sites = []
+        while frame is not None and len(sites) < CALL_SITE_DEPTH:
+            filename = frame.f_code.co_filename
+            if filename not in _SKIPPED_FILES and "contextlib" not in filename:
+                sites.append(
+                    f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+                )
+            frame = frame.f_back
+        return " < ".join(sites)
+
+    def _entry(self, sql: str) -> Tuple[StatementStats, bool]:
+        """Retourne les statistiques d'une requête, et si elle est nouvelle."""
+        key = normalize_sql(sql)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = StatementStats(key)
+            return stats, True
+        return stats, False
+
+    def wants_plan(self, sql: str) -> bool:
+        """Indique si le plan d'une requête reste à relever.
+
+        Args:
+            sql: Requête SQL
+
+        Returns:
+            bool: True à la première exécution d'une requête de données
+        """
+        key = normalize_sql(sql)
+        if not key.upper().startswith(PLANNED_STATEMENTS):
+            return False
+        with self._lock:
+            stats, created = self._entry(key)
+            if stats.plan is None:
+                stats.plan = []  # Relevé en cours : une seule fois par requête
+                return True
+            return False
+
+    def record_plan(self, sql: str, plan: List[str], call_site: str) -> None:
+        """Enregistre le plan d'exécution d'une requête.
+
+        Args:
+            sql: Requête SQL
+            plan: Lignes « detail » de EXPLAIN QUERY PLAN
+            call_site: Lieu d'appel
+        """
+        scanned = full_scans(plan)
+        with self._lock:
+            stats, _ = self._entry(sql)
+            stats.plan = plan
+            stats.scanned_tables = scanned
+        if scanned:
+            self._log({
+                "event": "full_scan",
+                "sql": stats.sql,
+                "tables": scanned,
+                "plan": plan,
+                "call_site": call_site
+            })
+
+    def record(
+        self,
+        sql: str,
+        elapsed_ms: float,
+        rows: int,
+        call_site: str,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """Enregistre une exécution de requête.
+
+        Args:
+            sql: Requête SQL
+            elapsed_ms: Durée d'exécution, lecture des lignes comprise (ms)
+            rows: Lignes retournées (ou modifiées pour une écriture)
+            call_site: Lieu d'appel
+            error: Exception levée par la requête, le cas échéant
+        """
+        with self._lock:
+            stats, _ = self._entry(sql)
+            stats.calls += 1
+            stats.rows += max(rows, 0)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            stats.call_sites[call_site] += 1
+            if error is not None:
+                stats.errors += 1
+                stats.last_error = str(error)
+
+        if error is not None:
+            self._log({"event": "error", "sql": stats.sql, "error": str(error), "call_site": call_site})
+        elif elapsed_ms >= self.slow_ms:
+            self._log({
+                "event": "slow",
+                "sql": stats.sql,
+                "ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "call_site": call_site
+            })
+
+    def _log(self, entry: Dict[str, Any]) -> None:
+        """Ajoute un événement au journal des requêtes lentes."""
+        entry = {"time": datetime.now().isoformat(timespec="seconds"), **entry}
+        try:
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du journal des requêtes : {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Restitution
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Retourne les statistiques, par temps cumulé décroissant.
+
+        Returns:
+            List[Dict[str, Any]]: Statistiques de chaque requête
+        """
+        with self._lock:
+            stats = [entry.to_dict() for entry in self._stats.values() if entry.calls]
+        return sorted(stats, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def report(self, top: int = 20) -> str:
+        """Construit un rapport lisible des requêtes les plus coûteuses.
+
+        Args:
+            top: Nombre de requêtes affichées
+
+        Returns:
+            str: Rapport
+        """
+        stats = self.snapshot()
+        lines = [
+            f"Requêtes SQL : {len(stats)} distinctes, "
+            f"{sum(entry['calls'] for entry in stats)} exécutions",
+            f"{'total ms':>10} {'appels':>7} {'p50':>7} {'p95':>7} {'max':>8} {'lignes':>8}  requête"
+        ]
+        for entry in stats[:top]:
+            sql = entry["sql"]
+            if len(sql) > REPORT_SQL_LENGTH:
+                sql = sql[:REPORT_SQL_LENGTH - 1] + "…"
+            lines.append(
+                f"{entry['total_ms']:10.1f} {entry['calls']:7d} {entry['p50_ms']:7.2f} "
+                f"{entry['p95_ms']:7.2f} {entry['max_ms']:8.1f} {entry['rows']:8d}  {sql}"
+            )
+            if entry["scanned_tables"]:
+                lines.append(f"{'':52}  ! parcours complet : {', '.join(entry['scanned_tables'])}")
+            if entry["errors"]:
+                lines.append(f"{'':52}  ! {entry['errors']} erreur(s) : {entry['last_error']}")
+            for site, count in list(entry["call_sites"].items())[:3]:
+                lines.append(f"{'':52}  {count:5d} x {site}")
+        return "\n".join(lines)
+
+    def save_report(self, path: str = DEFAULT_REPORT_PATH) -> bool:
+        """Écrit le rapport et les statistiques détaillées dans un fichier.
+
+        Args:
+            path: Chemin du rapport (les statistiques JSON vont dans path + ".json")
+
+        Returns:
+            bool: True si l'écriture a réussi
+        """
+        if not self._stats:
+            return True
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.report() + "\n")
+            with open(path + ".json", "w", encoding="utf-8") as file:
+                json.dump(self.snapshot(), file, ensure_ascii=False, indent=2)
+            return True
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du rapport des requêtes : {str(e)}")
+            return False
+
+
+# Instance globale
+query_profiler = QueryProfiler()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Curseur qui mesure ses requêtes, lecture des lignes comprise.
+
+    Une exécution est close (et enregistrée) quand ses lignes sont épuisées,
+    quand le curseur exécute une autre requête, quand il est fermé ou quand
+    il est libéré : une lecture partielle (fetchone, fetchmany) ou une
+    requête dont les lignes ne sont jamais lues est donc aussi comptée.
+    """
+
+    _pending: Optional[list] = None
+
+    def _begin(self, sql: str, params: Any, many: bool = False) -> None:
+        """Termine la mesure précédente et relève le plan si besoin."""
+        self._finish()
+        call_site = query_profiler.call_site()
+        if query_profiler.wants_plan(sql):
+            plan_params = params
+            if many:
+                plan_params = params[0] if params else None
+            try:
+                plan = sqlite3.Connection.execute(
+                    self.connection, "EXPLAIN QUERY PLAN " + sql,
+                    plan_params if plan_params is not None else ()
+                ).fetchall()
+                query_profiler.record_plan(sql, [row[3] for row in plan], call_site)
+            except sqlite3.Error:
+                pass
+        self._pending = [sql, 0.0, 0, call_site]
+
+    def _add(self, elapsed: float, rows: int = 0) -> None:
+        """Ajoute du temps et des lignes à la mesure en cours."""
+        if self._pending is not None:
+            self._pending[1] += elapsed
+            self._pending[2] += rows
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        """Enregistre la mesure en cours."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, elapsed, rows, call_site = pending
+            query_profiler.record(sql, elapsed * 1000, rows, call_site, error)
+
+    def _run(self, method, sql: str, params: Any, many: bool = False):
+        """Exécute une requête en la chronométrant."""
+        self._begin(sql, params, many)
+        begin = time.perf_counter()
+        try:
+            result = method(sql, params) if params is not None else method(sql)
+        except Exception as e:
+            self._add(time.perf_counter() - begin)
+            self._finish(e)
+            raise
+        self._add(time.perf_counter() - begin)
+        if self.description is None:
+            # Écriture : pas de lignes à lire, nombre de lignes modifiées
+            self._add(0.0, max(self.rowcount, 0))
+            self._finish()
+        return result
+
+    def execute(self, sql: str, params: Any = None):
+        """Exécute une requête (voir sqlite3.Cursor.execute)."""
+        return self._run(super().execute, sql, params)
+
+    def executemany(self, sql: str, params: Any):
+        """Exécute une requête pour chaque jeu de paramètres."""
+        # Liste : le premier jeu sert au relevé du plan, puis à l'exécution
+        return self._run(super().executemany, sql, list(params), many=True)
+
+    def fetchone(self):
+        """Lit une ligne."""
+        begin = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - begin, row is not None)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size: int = None):
+        """Lit un lot de lignes."""
+        size = self.arraysize if size is None else size
+        begin = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(time.perf_counter() - begin, len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        """Lit toutes les lignes restantes."""
+        begin = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - begin, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        """Lit la ligne suivante d'un parcours (for row in cursor)."""
+        begin = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(time.perf_counter() - begin)
+            self._finish()
+            raise
+        self._add(time.perf_counter() - begin, 1)
+        return row
+
+    def close(self) -> None:
+        """Ferme le curseur et enregistre la mesure en cours."""
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        """Enregistre la mesure en cours d'un curseur libéré sans être fermé."""
+        try:
+            self._finish()
+        except Exception:
+            # Fin de l'interpréteur : le profileur peut déjà être détruit
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connexion dont les curseurs sont instrumentés quand le profileur est actif."""
+
+    def cursor(self, factory=None):
+        """Crée un curseur, instrumenté si le profileur est actif."""
+        if factory is None:
+            factory = ProfiledCursor if query_profiler.enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql: str, params: Any = ()):
+        """Raccourci de cursor().execute (instrumenté si actif)."""
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, params: Any):
+        """Raccourci de cursor().executemany (instrumenté si actif)."""
+        return self.cursor().executemany(sql, params)
+
+
+# Activation par variable d'environnement (valeur : seuil de lenteur en ms)
+if os.environ.get(ENV_VAR):
+    try:
+        query_profiler.enable(float(os.environ[ENV_VAR]))
+    except ValueError:
+        query_profiler.enable()
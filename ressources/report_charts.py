@@ -0,0 +1,188 @@
+"""
+Module de rendu des diagrammes du rapport statistique.
+
+Ce module produit les images PNG jointes au rapport envoyé par email. Les
+figures sont dessinées avec l'API objet de Matplotlib sur un canevas Agg
+(sans pyplot ni affichage), ce qui permet de les générer depuis n'importe
+quel thread et sur une machine sans écran. Les diagrammes à produire sont
+répartis sur un pool de processus, et chaque image est mise en cache selon
+une empreinte de ses données : un rapport dont les chiffres n'ont pas changé
+n'est pas redessiné.
+"""
+
+import io
+import os
+import atexit
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+# Paramètres de rendu (800 x 600 pixels)
+REPORT_FIGSIZE = (8, 6)
+REPORT_DPI = 100
+
+# Nombre de couleurs de la palette PNG (images plus légères qu'en RGBA)
+PNG_COLORS = 128
+
+# Nombre d'images conservées en cache
+CACHE_SIZE = 32
+
+# Nombre maximum de processus de rendu
+MAX_WORKERS = 3
+
+# Diagramme à produire : (titre, libellés, valeurs)
+ChartSpec = Tuple[str, Sequence[str], Sequence[float]]
+
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def chart_key(spec: ChartSpec) -> str:
+    """Calcule l'empreinte d'un diagramme (données et paramètres de rendu).
+
+    Args:
+        spec: Diagramme (titre, libellés, valeurs)
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    title, labels, values = spec
+    content = repr((
+        title,
+        [str(label) for label in labels],
+        [float(value) for value in values],
+        REPORT_FIGSIZE, REPORT_DPI, PNG_COLORS
+    ))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def render_pie_png(spec: ChartSpec) -> bytes:
+    """Dessine un diagramme en camembert et retourne l'image PNG.
+
+    Fonction exécutée dans les processus de rendu : elle n'utilise que des
+    objets locaux et peut donc aussi être appelée depuis plusieurs threads.
+
+    Args:
+        spec: Diagramme (titre, libellés, valeurs)
+
+    Returns:
+        bytes: Image PNG en couleurs indexées
+    """
+    # Imports locaux : seuls les processus de rendu chargent Matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image
+
+    title, labels, values = spec
+    figure = Figure(figsize=REPORT_FIGSIZE, dpi=REPORT_DPI)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    if sum(values) > 0:  # Vérifier qu'il y a des données à afficher
+        ax.pie(values, labels=labels, autopct='%1.1f%%')
+    else:
+        ax.text(0.5, 0.5, "Pas de données", ha='center', va='center', fontsize=14)
+        ax.set_axis_off()
+    ax.set_title(title)
+
+    canvas.draw()
+    image = Image.frombuffer(
+        "RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1
+    ).convert("RGB").quantize(colors=PNG_COLORS)
+
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Retourne le pool de processus de rendu, créé au premier usage."""
+    global _pool
+    workers = min(MAX_WORKERS, os.cpu_count() or 1)
+    if workers < 2:
+        # Un seul cœur : le démarrage des processus coûterait plus qu'il ne rapporte
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            try:
+                # spawn : pas de fork d'un processus qui exécute Tk et des threads
+                context = multiprocessing.get_context("spawn")
+                _pool = ProcessPoolExecutor(workers, mp_context=context)
+            except Exception as e:
+                print(f"Pool de rendu indisponible, rendu séquentiel : {str(e)}")
+                return None
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Arrête le pool de processus de rendu s'il a été créé."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def render_charts(specs: Sequence[ChartSpec]) -> List[bytes]:
+    """Produit les images PNG de plusieurs diagrammes.
+
+    Les images déjà en cache sont réutilisées ; les autres sont dessinées en
+    parallèle (ou directement s'il n'y en a qu'une, ou sur un seul cœur),
+    puis mises en cache.
+
+    Args:
+        specs: Diagrammes (titre, libellés, valeurs)
+
+    Returns:
+        List[bytes]: Images PNG, dans l'ordre des diagrammes
+    """
+    specs = [(title, list(labels), list(values)) for title, labels, values in specs]
+    keys = [chart_key(spec) for spec in specs]
+    images: List[Optional[bytes]] = []
+
+    with _cache_lock:
+        for key in keys:
+            image = _cache.get(key)
+            if image is not None:
+                _cache.move_to_end(key)
+            images.append(image)
+
+    missing = [index for index, image in enumerate(images) if image is None]
+    if len(missing) > 1:
+        pool = _get_pool()
+        if pool is not None:
+            try:
+                futures = {index: pool.submit(render_pie_png, specs[index]) for index in missing}
+                for index, future in futures.items():
+                    images[index] = future.result()
+            except Exception as e:
+                # Pool cassé (processus tué, environnement figé mal configuré...)
+                print(f"Erreur du pool de rendu, rendu séquentiel : {str(e)}")
+                shutdown_pool()
+
+    for index in missing:
+        if images[index] is None:
+            images[index] = render_pie_png(specs[index])
+
+    with _cache_lock:
+        for index in missing:
+            _cache[keys[index]] = images[index]
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return images
+
+
+def clear_cache() -> None:
+    """Vide le cache des images."""
+    with _cache_lock:
+        _cache.clear()
@@ -6,10 +6,18 @@ en suivant les normes PEP 8 et en utilisant une approche orientée objet.
 """
 
 import os
+import re
+import json
+import base64
 import sqlite3
-from typing import List, Dict, Tuple, Optional, Any, Union
+from array import array
+from collections import namedtuple
+from typing import List, Dict, Tuple, Optional, Any, Union, Iterator, Sequence
 from dataclasses import dataclass
 
+from ressources.pool_bd import pool
+from ressources.init_bd import FTS_TABLE, FTS_COLUMNS
+
 # Constantes de sécurité
 MAX_QUERY_RESULTS = 1000  # Limite maximale de résultats par requête
 MAX_FIELD_LENGTH = 255   # Longueur maximale des champs texte
@@ -17,6 +25,195 @@ MAX_COST = 1000000.0    # Coût maximum autorisé
 MIN_COST = 0.0          # Coût minimum autorisé
 MAX_QUANTITY = 10000    # Quantité maximale autorisée
 MIN_QUANTITY = 0        # Quantité minimale autorisée
+FETCH_BATCH_SIZE = 500  # Nombre de lignes lues par fetchmany
+DEFAULT_PAGE_SIZE = 100 # Taille de page par défaut de la pagination
+MAX_PAGE_SIZE = 1000    # Taille de page maximale
+
+# Colonnes de la table magasin, dans l'ordre de MaterialRecord
+MATERIAL_COLUMNS = (
+    "ID stuff", "Numero", "Rayonnage", "Etagere", "Description",
+    "Providers", "PN", "Order", "Quantity", "Minimum",
+    "50H", "100H", "200H_ou_annuelle", "Providers_ACTF",
+    "Cost_Estimate", "Stock_Estimate_HT", "Remarks"
+)
+
+# Noms d'attributs Python correspondants
+MATERIAL_FIELDS = (
+    "id_stuff", "numero", "rayonnage", "etagere", "description",
+    "providers", "pn", "order", "quantity", "minimum",
+    "h50", "h100", "h200", "providers_actf",
+    "cost_estimate", "stock_estimate_ht", "remarks"
+)
+
+# Liste SQL des colonnes, à utiliser à la place de SELECT *
+MATERIAL_SELECT = ", ".join(f'"{column}"' for column in MATERIAL_COLUMNS)
+
+# Longueur maximale (en mots) des extraits surlignés
+SNIPPET_TOKENS = 12
+
+# Découpage d'un terme de recherche en mots (lettres accentuées comprises)
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Colonnes de la recherche quand aucun champ n'est demandé
+DEFAULT_SEARCH_FIELDS = ("Numero", "Description", "PN", "Providers")
+
+# Terme ressemblant à une référence (au moins un chiffre, sans espace) : il
+# est aussi cherché à l'intérieur des PN, que l'index ne trouve qu'en début
+PN_SEARCH_PATTERN = re.compile(r"^(?=.*\d)[A-Za-z0-9\-\./]{3,}$")
+
+# Colonnes de magasin, préfixées par l'alias m, pour les jointures
+_MATERIAL_SELECT_M = ", ".join(f'm."{column}"' for column in MATERIAL_COLUMNS)
+
+# Colonnes booléennes de maintenance
+MAINTENANCE_COLUMNS = frozenset({"50H", "100H", "200H_ou_annuelle"})
+
+# Type des tableaux par colonne numérique (module array)
+COLUMN_TYPECODES = {
+    "ID stuff": "q",
+    "Quantity": "q",
+    "Minimum": "q",
+    "50H": "b",
+    "100H": "b",
+    "200H_ou_annuelle": "b",
+    "Cost_Estimate": "d",
+    "Stock_Estimate_HT": "d"
+}
+
+
+class MaterialRecord(namedtuple("_MaterialRecordBase", MATERIAL_FIELDS)):
+    """Ligne de la table magasin sous forme de tuple compact.
+
+    Les champs sont accessibles par attribut (record.description), par
+    position ou par nom de colonne (record["Description"]) afin de rester
+    compatible avec l'ancien format dictionnaire. Les bornes de quantité et
+    de coût sont garanties par les contraintes CHECK de la table.
+    """
+
+    __slots__ = ()
+
+    _column_index = {column: i for i, column in enumerate(MATERIAL_COLUMNS)}
+
+    def __getitem__(self, key):
+        """Accès par position ou par nom de colonne.
+
+        Args:
+            key: Index, tranche ou nom de colonne de la table magasin
+
+        Returns:
+            Valeur du champ (booléen pour les colonnes de maintenance)
+
+        Raises:
+            KeyError: Si le nom de colonne est inconnu
+        """
+        if isinstance(key, str):
+            value = tuple.__getitem__(self, self._column_index[key])
+            return bool(value) if key in MAINTENANCE_COLUMNS else value
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Équivalent de dict.get() sur les noms de colonnes."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Tuple[str, ...]:
+        """Retourne les noms de colonnes, comme pour un dictionnaire."""
+        return MATERIAL_COLUMNS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit l'enregistrement en dictionnaire indexé par colonne."""
+        return {column: self[column] for column in MATERIAL_COLUMNS}
+
+
+def material_row_factory(cursor: sqlite3.Cursor, row: tuple) -> MaterialRecord:
+    """Fabrique de lignes SQLite produisant des MaterialRecord.
+
+    La requête doit sélectionner les colonnes de MATERIAL_SELECT.
+    """
+    return tuple.__new__(MaterialRecord, row)
+
+
+class ResultSet:
+    """Résultat de requête stocké par colonnes.
+
+    Les colonnes numériques connues sont stockées dans des array.array
+    compacts, les autres dans des listes. Destiné aux traitements en masse
+    (statistiques, exports) qui parcourent une colonne à la fois.
+    """
+
+    def __init__(self, columns: Sequence[str], data: Dict[str, Sequence]) -> None:
+        """Initialise le résultat.
+
+        Args:
+            columns: Noms des colonnes dans l'ordre de la requête
+            data: Valeurs de chaque colonne
+        """
+        self.columns = tuple(columns)
+        self._data = data
+
+    @classmethod
+    def from_cursor(
+        cls,
+        cursor: sqlite3.Cursor,
+        typecodes: Optional[Dict[str, str]] = None
+    ) -> "ResultSet":
+        """Construit un ResultSet à partir d'un curseur déjà exécuté.
+
+        Args:
+            cursor: Curseur dont la requête a été exécutée
+            typecodes: Type array par colonne (COLUMN_TYPECODES par défaut)
+
+        Returns:
+            ResultSet contenant toutes les lignes du curseur
+        """
+        if typecodes is None:
+            typecodes = COLUMN_TYPECODES
+
+        columns = [description[0] for description in cursor.description]
+        values = [[] for _ in columns]
+        appenders = [column_values.append for column_values in values]
+
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        while rows:
+            for row in rows:
+                for append, value in zip(appenders, row):
+                    append(value)
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+
+        data = {}
+        for column, column_values in zip(columns, values):
+            typecode = typecodes.get(column)
+            if typecode is None:
+                data[column] = column_values
+            else:
+                # Les valeurs NULL sont ramenées à 0 dans les tableaux numériques
+                data[column] = array(
+                    typecode,
+                    (value or 0 for value in column_values)
+                )
+        return cls(columns, data)
+
+    def __len__(self) -> int:
+        """Retourne le nombre de lignes."""
+        return len(self._data[self.columns[0]]) if self.columns else 0
+
+    def __getitem__(self, column: str) -> Sequence:
+        """Retourne toutes les valeurs d'une colonne."""
+        return self._data[column]
+
+    def __contains__(self, column: str) -> bool:
+        """Indique si la colonne fait partie du résultat."""
+        return column in self._data
+
+    def column(self, column: str) -> Sequence:
+        """Retourne toutes les valeurs d'une colonne."""
+        return self._data[column]
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Parcourt le résultat ligne par ligne."""
+        return zip(*(self._data[column] for column in self.columns))
+
 
 @dataclass
 class DatabaseConfig:
@@ -50,7 +247,7 @@ class DatabaseConnection:
         self.config = config
     
     def __enter__(self) -> Tuple[sqlite3.Connection, sqlite3.Cursor]:
-        """Établit la connexion à la base de données.
+        """Récupère la connexion du thread courant depuis le pool partagé.
         
         Returns:
             Tuple contenant la connexion et le curseur
@@ -59,23 +256,23 @@ class DatabaseConnection:
             sqlite3.Error: En cas d'erreur de connexion
         """
         try:
-            self.conn = sqlite3.connect(self.config.path, timeout=30)  # Timeout de 30 secondes
-            self.conn.execute("PRAGMA foreign_keys = ON")  # Active les contraintes de clés étrangères
+            self.conn = pool.acquire(self.config.path)
             self.cursor = self.conn.cursor()
             return self.conn, self.cursor
         except sqlite3.Error as e:
             raise sqlite3.Error(f"Erreur de connexion à la base de données : {str(e)}")
     
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Ferme la connexion à la base de données de manière sécurisée."""
+        """Rend la connexion au pool après validation ou annulation."""
         if hasattr(self, 'cursor') and self.cursor:
             self.cursor.close()
         if hasattr(self, 'conn') and self.conn:
-            if exc_type is None:
-                self.conn.commit()  # Commit uniquement si pas d'exception
-            else:
-                self.conn.rollback()  # Rollback en cas d'exception
-            self.conn.close()
+            if pool.is_outermost(self.config.path):
+                if exc_type is None:
+                    self.conn.commit()  # Commit uniquement si pas d'exception
+                else:
+                    self.conn.rollback()  # Rollback en cas d'exception
+            pool.release(self.conn, self.config.path)
 
 
 class DatabaseQueries:
@@ -92,6 +289,7 @@ class DatabaseQueries:
         """
         assert isinstance(config, DatabaseConfig), "La configuration doit être de type DatabaseConfig"
         self.config = config
+        self._fts_available = False
     
     def query(self, sql: str, params: tuple = ()) -> List[Tuple]:
         """Exécute une requête SQL et retourne les résultats.
@@ -114,6 +312,49 @@ class DatabaseQueries:
             print(f"Erreur lors de l'exécution de la requête : {str(e)}")
             return []
     
+    def iter_query(
+        self,
+        sql: str,
+        params: tuple = (),
+        batch_size: int = FETCH_BATCH_SIZE,
+        row_factory: Optional[Any] = None
+    ) -> Iterator[Any]:
+        """Exécute une requête de lecture et parcourt ses lignes par lots.
+        
+        Les lignes sont lues avec fetchmany, sans limite de nombre, avec une
+        mémoire bornée par batch_size. La connexion est rendue au pool dès
+        l'exécution : un parcours suspendu ne bloque pas les transactions
+        des autres appelants du même thread.
+        
+        Args:
+            sql: Requête SQL de lecture à exécuter
+            params: Paramètres de la requête
+            batch_size: Nombre de lignes lues à chaque fetchmany
+            row_factory: Fabrique de lignes optionnelle (ex. material_row_factory)
+            
+        Yields:
+            Chaque ligne du résultat
+            
+        Raises:
+            sqlite3.Error: En cas d'erreur d'exécution
+        """
+        conn = pool.acquire(self.config.path)
+        try:
+            cursor = conn.cursor()
+            if row_factory is not None:
+                cursor.row_factory = row_factory
+            cursor.execute(sql, params)
+        finally:
+            pool.release(conn, self.config.path)
+        
+        try:
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            cursor.close()
+    
     def _validate_text_input(self, text: str, field_name: str, max_length: int = MAX_FIELD_LENGTH) -> None:
         """Valide une entrée texte.
         
@@ -129,7 +370,7 @@ class DatabaseQueries:
             raise ValueError(f"Le champ {field_name} doit être une chaîne de caractères")
         if len(text) > max_length:
             raise ValueError(f"Le champ {field_name} est trop long (max {max_length} caractères)")
-        if any(c for c in text if ord(c) < 32 or ord(c) > 126):
+        if any(c for c in text if ord(c) < 32 or ord(c) == 127):
             raise ValueError(f"Le champ {field_name} contient des caractères invalides")
     
     def check_user_credentials(
@@ -215,26 +456,21 @@ class DatabaseQueries:
         
         Returns:
             Liste des noms d'avions
-            
-        Note:
-            La liste est limitée à MAX_QUERY_RESULTS éléments
         """
         try:
-            with DatabaseConnection(self.config) as (_, cursor):
-                cursor.execute(f'SELECT "name" FROM planes LIMIT {MAX_QUERY_RESULTS}')
-                return cursor.fetchall()
+            return list(self.iter_query('SELECT "name" FROM planes ORDER BY "ID plane"'))
         except Exception as e:
             print(f"Erreur lors de la récupération des avions : {str(e)}")
             return []
     
-    def get_material_by_id(self, material_id: int) -> Optional[Dict[str, Any]]:
+    def get_material_by_id(self, material_id: int) -> Optional[MaterialRecord]:
         """Récupère les informations d'un matériel par son ID.
         
         Args:
             material_id: ID du matériel
             
         Returns:
-            Dictionnaire contenant les informations du matériel ou None si non trouvé
+            MaterialRecord du matériel ou None si non trouvé
             
         Raises:
             ValueError: Si l'ID est invalide
@@ -244,35 +480,15 @@ class DatabaseQueries:
                 raise ValueError("L'ID du matériel doit être un entier positif")
             
             with DatabaseConnection(self.config) as (_, cursor):
-                cursor.execute('''
-                    SELECT *
+                cursor.row_factory = material_row_factory
+                cursor.execute(f'''
+                    SELECT {MATERIAL_SELECT}
                     FROM magasin
                     WHERE "ID stuff" = ?
                     LIMIT 1
                 ''', (material_id,))
                 
-                row = cursor.fetchone()
-                if row:
-                    return {
-                        "ID stuff": row[0],
-                        "Numero": row[1],
-                        "Rayonnage": row[2],
-                        "Etagere": row[3],
-                        "Description": row[4],
-                        "Providers": row[5],
-                        "PN": row[6],
-                        "Order": row[7],
-                        "Quantity": max(MIN_QUANTITY, min(MAX_QUANTITY, row[8])),
-                        "Minimum": max(MIN_QUANTITY, min(MAX_QUANTITY, row[9])),
-                        "50H": bool(row[10]),
-                        "100H": bool(row[11]),
-                        "200H_ou_annuelle": bool(row[12]),
-                        "Providers_ACTF": row[13],
-                        "Cost_Estimate": max(MIN_COST, min(MAX_COST, row[14])),
-                        "Stock_Estimate_HT": max(MIN_COST, min(MAX_COST, row[15])),
-                        "Remarks": row[16]
-                    }
-                return None
+                return cursor.fetchone()
         except ValueError as e:
             print(f"Erreur de validation : {str(e)}")
             return None
@@ -280,67 +496,519 @@ class DatabaseQueries:
             print(f"Erreur lors de la récupération du matériel : {str(e)}")
             return None
     
+    def _has_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """Indique si l'index plein texte de magasin est disponible.
+        
+        Args:
+            cursor: Curseur sur la base de données
+            
+        Returns:
+            True si la table FTS5 existe
+        """
+        if not self._fts_available:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (FTS_TABLE,)
+            )
+            self._fts_available = cursor.fetchone() is not None
+        return self._fts_available
+    
+    @staticmethod
+    def build_fts_query(search_term: str, fields: Optional[List[str]] = None) -> Optional[str]:
+        """Construit une expression MATCH FTS5 à partir d'un terme libre.
+        
+        Chaque mot devient une recherche par préfixe et tous les mots
+        doivent être présents. Les caractères spéciaux FTS5 sont ignorés.
+        Sans champ demandé, la recherche porte sur DEFAULT_SEARCH_FIELDS.
+        
+        Args:
+            search_term: Terme de recherche saisi par l'utilisateur
+            fields: Colonnes auxquelles restreindre la recherche
+            
+        Returns:
+            Expression MATCH ou None si le terme ne contient aucun mot
+        """
+        tokens = SEARCH_TOKEN_PATTERN.findall(search_term)
+        if not tokens:
+            return None
+        
+        expression = " ".join(f'"{token}"*' for token in tokens)
+        columns = " ".join(fields or DEFAULT_SEARCH_FIELDS)
+        return f"{{{columns}}} : ({expression})"
+    
+    @staticmethod
+    def pn_like_pattern(search_term: str, fields: Optional[List[str]] = None) -> Optional[str]:
+        """Retourne le motif LIKE d'une recherche de référence dans les PN.
+        
+        L'index plein texte ne trouve un mot que par son début : une partie
+        de PN (« 7284480 » pour « N7284480058 ») est donc aussi cherchée par
+        LIKE, uniquement pour les termes qui ressemblent à une référence.
+        
+        Args:
+            search_term: Terme de recherche saisi par l'utilisateur
+            fields: Colonnes auxquelles restreindre la recherche
+            
+        Returns:
+            Motif LIKE, ou None si le terme ou les champs ne s'y prêtent pas
+        """
+        term = search_term.strip()
+        if "PN" not in (fields or DEFAULT_SEARCH_FIELDS) or not PN_SEARCH_PATTERN.match(term):
+            return None
+        return f"%{term}%"
+    
+    def _check_search_fields(self, fields: Optional[List[str]]) -> None:
+        """Valide la liste des champs de recherche.
+        
+        Args:
+            fields: Liste des champs demandés (None pour tous)
+            
+        Raises:
+            ValueError: Si un champ n'est pas indexé
+        """
+        if fields is not None and not all(field in FTS_COLUMNS for field in fields):
+            raise ValueError("Champs de recherche invalides")
+    
+    def _search_fts(
+        self,
+        cursor: sqlite3.Cursor,
+        search_term: str,
+        fields: Optional[List[str]],
+        limit: int,
+        with_snippet: bool
+    ) -> List[Any]:
+        """Exécute une recherche classée bm25 dans l'index plein texte.
+        
+        Args:
+            cursor: Curseur sur la base de données
+            search_term: Terme de recherche
+            fields: Colonnes auxquelles restreindre la recherche
+            limit: Nombre maximal de résultats
+            with_snippet: Si True, ajoute un extrait surligné à chaque ligne
+            
+        Returns:
+            Liste de MaterialRecord, ou de couples (MaterialRecord, extrait)
+        """
+        match = self.build_fts_query(search_term, fields)
+        if match is None:
+            return []
+        
+        snippet = ""
+        if with_snippet:
+            snippet = (
+                f", snippet({FTS_TABLE}, -1, '[', ']', '…', {SNIPPET_TOKENS})"
+            )
+            cursor.row_factory = lambda _, row: (
+                tuple.__new__(MaterialRecord, row[:-1]), row[-1]
+            )
+        else:
+            cursor.row_factory = material_row_factory
+        
+        cursor.execute(f'''
+            SELECT {_MATERIAL_SELECT_M}{snippet}
+            FROM {FTS_TABLE}
+            JOIN magasin m ON m."ID stuff" = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        ''', (match, limit))
+        rows = cursor.fetchall()
+        
+        # Références trouvées à l'intérieur d'un PN, après les résultats classés
+        pn_like = self.pn_like_pattern(search_term, fields)
+        if pn_like is not None and len(rows) < limit:
+            cursor.execute(f'''
+                SELECT {_MATERIAL_SELECT_M}{', m."PN"' if with_snippet else ''}
+                FROM magasin m
+                WHERE m."PN" LIKE ?
+                AND m."ID stuff" NOT IN (
+                    SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?
+                )
+                ORDER BY m."ID stuff"
+                LIMIT ?
+            ''', (pn_like, match, limit - len(rows)))
+            rows.extend(cursor.fetchall())
+        return rows
+    
     def search_material(
         self, 
         search_term: str, 
         fields: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[MaterialRecord]:
         """Recherche du matériel selon différents critères.
         
+        La recherche utilise l'index plein texte (insensible aux accents,
+        par préfixe, classée par pertinence) lorsqu'il existe, et se replie
+        sur des LIKE sinon.
+        
         Args:
             search_term: Terme de recherche
-            fields: Liste des champs dans lesquels chercher (tous par défaut)
+            fields: Liste des champs dans lesquels chercher
+                (DEFAULT_SEARCH_FIELDS par défaut)
             
         Returns:
-            Liste des matériels correspondants
+            Liste des matériels correspondants, les plus pertinents d'abord
             
         Raises:
             ValueError: Si les paramètres sont invalides
         """
         try:
             self._validate_text_input(search_term, "terme de recherche")
-            
-            if fields is None:
-                fields = ["Numero", "Description", "PN", "Providers"]
-            else:
-                allowed_fields = {"Numero", "Description", "PN", "Providers", "Rayonnage", "Etagere"}
-                if not all(field in allowed_fields for field in fields):
-                    raise ValueError("Champs de recherche invalides")
+            self._check_search_fields(fields)
             
             with DatabaseConnection(self.config) as (_, cursor):
+                if self._has_fts(cursor):
+                    return self._warn_if_truncated(self._search_fts(
+                        cursor, search_term, fields, MAX_QUERY_RESULTS, False
+                    ))
+                
+                if fields is None:
+                    fields = list(DEFAULT_SEARCH_FIELDS)
+                
+                cursor.row_factory = material_row_factory
                 where_clauses = [f'"{field}" LIKE ?' for field in fields]
                 where_statement = " OR ".join(where_clauses)
                 params = [f"%{search_term}%" for _ in fields]
                 
                 query = f'''
-                    SELECT *
+                    SELECT {MATERIAL_SELECT}
                     FROM magasin
                     WHERE {where_statement}
                     LIMIT {MAX_QUERY_RESULTS}
                 '''
                 
                 cursor.execute(query, params)
-                rows = cursor.fetchall()
+                return self._warn_if_truncated(cursor.fetchall())
+                
+        except ValueError as e:
+            print(f"Erreur de validation : {str(e)}")
+            return []
+        except Exception as e:
+            print(f"Erreur lors de la recherche de matériel : {str(e)}")
+            return []
+    
+    @staticmethod
+    def _warn_if_truncated(rows: List[Any]) -> List[Any]:
+        """Signale un résultat tronqué à MAX_QUERY_RESULTS lignes.
+        
+        Args:
+            rows: Lignes retournées par la requête
+            
+        Returns:
+            Les mêmes lignes
+        """
+        if len(rows) >= MAX_QUERY_RESULTS:
+            print(
+                f"Résultat limité à {MAX_QUERY_RESULTS} lignes, "
+                "utilisez search_material_pages pour tout parcourir"
+            )
+        return rows
+    
+    @staticmethod
+    def encode_page_cursor(sort_key: str, descending: bool, last_row: MaterialRecord) -> str:
+        """Encode la position d'une fin de page en jeton opaque.
+        
+        Args:
+            sort_key: Colonne de tri
+            descending: Sens du tri
+            last_row: Dernière ligne de la page
+            
+        Returns:
+            Jeton base64 à transmettre pour obtenir la page suivante
+        """
+        payload = [sort_key, descending, last_row[sort_key], last_row.id_stuff]
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+    
+    @staticmethod
+    def decode_page_cursor(token: str, sort_key: str, descending: bool) -> Tuple[Any, int]:
+        """Décode un jeton de page produit par encode_page_cursor.
+        
+        Args:
+            token: Jeton opaque
+            sort_key: Colonne de tri attendue
+            descending: Sens du tri attendu
+            
+        Returns:
+            Tuple (valeur de tri, ID stuff) de la dernière ligne vue
+            
+        Raises:
+            ValueError: Si le jeton est invalide ou ne correspond pas au tri
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token.encode("ascii"))
+            key, desc, value, last_id = json.loads(raw.decode("utf-8"))
+        except Exception:
+            raise ValueError("Jeton de pagination invalide")
+        if key != sort_key or desc != descending or not isinstance(last_id, int):
+            raise ValueError("Le jeton de pagination ne correspond pas à ce tri")
+        return value, last_id
+    
+    def _search_filter(
+        self,
+        cursor: sqlite3.Cursor,
+        search_term: str,
+        fields: Optional[List[str]]
+    ) -> Optional[Tuple[List[str], List[Any]]]:
+        """Construit les conditions WHERE d'une recherche sur magasin.
+        
+        Args:
+            cursor: Curseur sur la base de données
+            search_term: Terme de recherche (vide pour tout le catalogue)
+            fields: Liste des champs dans lesquels chercher
+                (DEFAULT_SEARCH_FIELDS par défaut)
+            
+        Returns:
+            Tuple (conditions, paramètres), ou None si le terme ne peut
+            correspondre à aucune ligne
+        """
+        where: List[str] = []
+        params: List[Any] = []
+        if not search_term.strip():
+            return where, params
+        
+        if self._has_fts(cursor):
+            match = self.build_fts_query(search_term, fields)
+            if match is None:
+                return None
+            condition = f'"ID stuff" IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)'
+            params.append(match)
+            pn_like = self.pn_like_pattern(search_term, fields)
+            if pn_like is not None:
+                condition = f'({condition} OR "PN" LIKE ?)'
+                params.append(pn_like)
+            where.append(condition)
+        else:
+            like_fields = fields or list(DEFAULT_SEARCH_FIELDS)
+            where.append(
+                "(" + " OR ".join(f'"{field}" LIKE ?' for field in like_fields) + ")"
+            )
+            params.extend(f"%{search_term}%" for _ in like_fields)
+        return where, params
+    
+    def count_material(self, search_term: str = "", fields: Optional[List[str]] = None) -> int:
+        """Compte les résultats d'une recherche, sans limite.
+        
+        Args:
+            search_term: Terme de recherche (vide pour tout le catalogue)
+            fields: Liste des champs dans lesquels chercher
+                (DEFAULT_SEARCH_FIELDS par défaut)
+            
+        Returns:
+            Nombre de matériels correspondants (0 en cas d'erreur)
+        """
+        try:
+            self._validate_text_input(search_term, "terme de recherche")
+            self._check_search_fields(fields)
+            
+            with DatabaseConnection(self.config) as (_, cursor):
+                search = self._search_filter(cursor, search_term, fields)
+                if search is None:
+                    return 0
+                where, params = search
+                where_statement = f"WHERE {' AND '.join(where)}" if where else ""
+                cursor.execute(f"SELECT COUNT(*) FROM magasin {where_statement}", params)
+                return cursor.fetchone()[0]
                 
-                return [{
-                    "ID stuff": row[0],
-                    "Numero": row[1],
-                    "Rayonnage": row[2],
-                    "Etagere": row[3],
-                    "Description": row[4],
-                    "Providers": row[5],
-                    "PN": row[6],
-                    "Order": row[7],
-                    "Quantity": max(MIN_QUANTITY, min(MAX_QUANTITY, row[8])),
-                    "Minimum": max(MIN_QUANTITY, min(MAX_QUANTITY, row[9])),
-                    "50H": bool(row[10]),
-                    "100H": bool(row[11]),
-                    "200H_ou_annuelle": bool(row[12]),
-                    "Providers_ACTF": row[13],
-                    "Cost_Estimate": max(MIN_COST, min(MAX_COST, row[14])),
-                    "Stock_Estimate_HT": max(MIN_COST, min(MAX_COST, row[15])),
-                    "Remarks": row[16]
-                } for row in rows]
+        except ValueError as e:
+            print(f"Erreur de validation : {str(e)}")
+            return 0
+        except Exception as e:
+            print(f"Erreur lors du comptage des résultats : {str(e)}")
+            return 0
+    
+    def get_material_page(
+        self,
+        search_term: str = "",
+        fields: Optional[List[str]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sort_key: str = "ID stuff",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Tuple[List[MaterialRecord], Optional[str]]:
+        """Récupère une page du catalogue par pagination sur clé (keyset).
+        
+        Chaque page est une requête indépendante qui reprend après la
+        dernière ligne de la page précédente (WHERE (clé, ID) > (?, ?)),
+        sans OFFSET : le coût d'une page ne dépend pas de sa position.
+        Seul un saut direct vers une ligne lointaine (cursor None et offset
+        non nul) utilise OFFSET ; les pages suivantes reprennent par clé.
+        
+        Les valeurs NULL de la colonne de tri sont comparées explicitement
+        (en tête en tri croissant, en fin en tri décroissant, comme dans
+        SQLite) pour que chaque requête reste un parcours d'index.
+        
+        Args:
+            search_term: Terme de recherche (vide pour tout le catalogue)
+            fields: Liste des champs dans lesquels chercher
+                (DEFAULT_SEARCH_FIELDS par défaut)
+            page_size: Nombre de lignes par page
+            sort_key: Colonne de tri parmi MATERIAL_COLUMNS
+            descending: Si True, tri décroissant
+            cursor: Jeton renvoyé par la page précédente (None pour la première)
+            offset: Position de la première ligne, sans jeton uniquement
+            
+        Returns:
+            Tuple (lignes de la page, jeton de la page suivante ou None)
+            
+        Raises:
+            ValueError: Si les paramètres ou le jeton sont invalides
+        """
+        if sort_key not in MATERIAL_COLUMNS:
+            raise ValueError(f"Clé de tri invalide : {sort_key}")
+        if not isinstance(page_size, int) or not 0 < page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"La taille de page doit être comprise entre 1 et {MAX_PAGE_SIZE}")
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("La position de départ doit être un entier positif")
+        if offset and cursor is not None:
+            raise ValueError("Une page ne peut pas combiner jeton et position de départ")
+        self._validate_text_input(search_term, "terme de recherche")
+        self._check_search_fields(fields)
+        
+        with DatabaseConnection(self.config) as (_, db_cursor):
+            search = self._search_filter(db_cursor, search_term, fields)
+            if search is None:
+                return [], None
+            where, params = search
+            
+            # Segments parcourus dans l'ordre : (condition, paramètres)
+            segments = self._page_segments(sort_key, descending, cursor)
+            direction = "DESC" if descending else "ASC"
+            order_by = f'"ID stuff" {direction}' if sort_key == "ID stuff" \
+                else f'"{sort_key}" {direction}, "ID stuff" {direction}'
+            
+            db_cursor.row_factory = material_row_factory
+            rows = []
+            for condition, condition_params in segments:
+                conditions = where + ([condition] if condition else [])
+                where_statement = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                db_cursor.execute(f'''
+                    SELECT {MATERIAL_SELECT}
+                    FROM magasin
+                    {where_statement}
+                    ORDER BY {order_by}
+                    LIMIT ? OFFSET ?
+                ''', (*params, *condition_params, page_size + 1 - len(rows), offset))
+                rows.extend(db_cursor.fetchall())
+                if len(rows) > page_size:
+                    break
+        
+        # La ligne supplémentaire indique seulement qu'une page suivante existe
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return rows, self.encode_page_cursor(sort_key, descending, rows[-1])
+        return rows, None
+    
+    def _page_segments(
+        self,
+        sort_key: str,
+        descending: bool,
+        cursor: Optional[str]
+    ) -> List[Tuple[Optional[str], Tuple[Any, ...]]]:
+        """Construit les conditions de reprise d'une page après un jeton.
+        
+        Une comparaison (clé, ID) > (?, ?) écarte les NULL : la reprise est
+        donc découpée en segments (NULL, puis valeurs renseignées en tri
+        croissant ; l'inverse en tri décroissant), chacun utilisable par
+        l'index de la colonne.
+        
+        Args:
+            sort_key: Colonne de tri
+            descending: Sens du tri
+            cursor: Jeton de la page précédente (None pour la première)
+            
+        Returns:
+            List[Tuple[Optional[str], Tuple]]: Conditions et paramètres
+        """
+        if cursor is None:
+            return [(None, ())]
+        
+        last_value, last_id = self.decode_page_cursor(cursor, sort_key, descending)
+        operator = "<" if descending else ">"
+        if sort_key == "ID stuff":
+            return [(f'"ID stuff" {operator} ?', (last_id,))]
+        
+        column = f'"{sort_key}"'
+        if last_value is None:
+            segments = [(f'{column} IS NULL AND "ID stuff" {operator} ?', (last_id,))]
+            if not descending:
+                segments.append((f"{column} IS NOT NULL", ()))
+            return segments
+        
+        segments = [(f'({column}, "ID stuff") {operator} (?, ?)', (last_value, last_id))]
+        if descending:
+            segments.append((f"{column} IS NULL", ()))
+        return segments
+    
+    def search_material_pages(
+        self,
+        search_term: str = "",
+        fields: Optional[List[str]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sort_key: str = "ID stuff",
+        descending: bool = False,
+        cursor: Optional[str] = None
+    ) -> Iterator[Tuple[List[MaterialRecord], Optional[str]]]:
+        """Parcourt tous les résultats d'une recherche, page par page.
+        
+        Contrairement à search_material, aucun résultat n'est tronqué.
+        Le parcours peut être repris plus tard avec le jeton d'une page.
+        
+        Args:
+            search_term: Terme de recherche (vide pour tout le catalogue)
+            fields: Liste des champs dans lesquels chercher
+                (DEFAULT_SEARCH_FIELDS par défaut)
+            page_size: Nombre de lignes par page
+            sort_key: Colonne de tri parmi MATERIAL_COLUMNS
+            descending: Si True, tri décroissant
+            cursor: Jeton de reprise (None pour commencer au début)
+            
+        Yields:
+            Tuple (lignes de la page, jeton de la page suivante ou None)
+            
+        Raises:
+            ValueError: Si les paramètres ou le jeton sont invalides
+        """
+        while True:
+            rows, cursor = self.get_material_page(
+                search_term, fields, page_size, sort_key, descending, cursor
+            )
+            if rows:
+                yield rows, cursor
+            if cursor is None:
+                return
+    
+    def search_material_highlighted(
+        self,
+        search_term: str,
+        fields: Optional[List[str]] = None,
+        limit: int = MAX_QUERY_RESULTS
+    ) -> List[Tuple[MaterialRecord, str]]:
+        """Recherche du matériel avec un extrait où les termes sont surlignés.
+        
+        Les mots trouvés sont encadrés par des crochets dans l'extrait de la
+        colonne la plus pertinente. Nécessite l'index plein texte.
+        
+        Args:
+            search_term: Terme de recherche
+            fields: Liste des champs dans lesquels chercher
+                (DEFAULT_SEARCH_FIELDS par défaut)
+            limit: Nombre maximal de résultats
+            
+        Returns:
+            Liste de couples (matériel, extrait), les plus pertinents d'abord
+        """
+        try:
+            self._validate_text_input(search_term, "terme de recherche")
+            self._check_search_fields(fields)
+            
+            with DatabaseConnection(self.config) as (_, cursor):
+                if not self._has_fts(cursor):
+                    print("Index plein texte indisponible, lancez init_bd.init_db()")
+                    return []
+                return self._search_fts(
+                    cursor, search_term, fields, min(limit, MAX_QUERY_RESULTS), True
+                )
                 
         except ValueError as e:
             print(f"Erreur de validation : {str(e)}")
@@ -349,6 +1017,40 @@ class DatabaseQueries:
             print(f"Erreur lors de la recherche de matériel : {str(e)}")
             return []
     
+    def query_columns(
+        self,
+        sql: str,
+        params: tuple = (),
+        typecodes: Optional[Dict[str, str]] = None
+    ) -> Optional[ResultSet]:
+        """Exécute une requête et retourne le résultat stocké par colonnes.
+        
+        Args:
+            sql: Requête SQL à exécuter
+            params: Paramètres de la requête
+            typecodes: Type array par colonne (COLUMN_TYPECODES par défaut)
+            
+        Returns:
+            ResultSet du résultat ou None en cas d'erreur
+        """
+        try:
+            with DatabaseConnection(self.config) as (_, cursor):
+                cursor.execute(sql, params)
+                return ResultSet.from_cursor(cursor, typecodes)
+        except Exception as e:
+            print(f"Erreur lors de l'exécution de la requête : {str(e)}")
+            return None
+    
+    def get_materials_columns(self) -> Optional[ResultSet]:
+        """Récupère tout le catalogue magasin sous forme de colonnes.
+        
+        Returns:
+            ResultSet des colonnes de MATERIAL_COLUMNS ou None en cas d'erreur
+        """
+        return self.query_columns(
+            f'SELECT {MATERIAL_SELECT} FROM magasin ORDER BY "ID stuff"'
+        )
+    
     def get_material_planes(self, material_id: int) -> List[str]:
         """Récupère la liste des avions associés à un matériel.
         
@@ -384,40 +1086,231 @@ class DatabaseQueries:
             return []
     
     def get_cost_stats_by_plane(self) -> Dict[str, float]:
-        """Calcule le coût moyen des pièces par avion."""
+        """Calcule le coût moyen des pièces par avion.
+        
+        Lit la table de synthèse stats_plane_cost (une ligne par avion),
+        tenue à jour par triggers ; recalcule sur magasin si elle n'existe pas.
+        
+        Returns:
+            Dict[str, float]: Coût moyen par nom d'avion
+        """
         try:
             with DatabaseConnection(self.config) as (_, cursor):
-                cursor.execute('''
-                    SELECT p.name, AVG(m.Cost_Estimate) as avg_cost
-                    FROM planes p
-                    JOIN planes_magasin pm ON p."ID plane" = pm."ID plane"
-                    JOIN magasin m ON m."ID stuff" = pm."ID stuff"
-                    GROUP BY p.name
-                ''')
+                try:
+                    cursor.execute('''
+                        SELECT p.name, s."cost_sum" / s."cost_count"
+                        FROM stats_plane_cost s
+                        JOIN planes p ON p."ID plane" = s."ID plane"
+                        WHERE s."links" > 0
+                        ORDER BY p.name
+                    ''')
+                except sqlite3.OperationalError:
+                    # Base non initialisée avec les tables de synthèse
+                    cursor.execute('''
+                        SELECT p.name, AVG(m.Cost_Estimate) as avg_cost
+                        FROM planes p
+                        JOIN planes_magasin pm ON p."ID plane" = pm."ID plane"
+                        JOIN magasin m ON m."ID stuff" = pm."ID stuff"
+                        GROUP BY p.name
+                    ''')
                 return {row[0]: row[1] for row in cursor.fetchall()}
         except Exception as e:
             print(f"Erreur lors du calcul des coûts moyens : {str(e)}")
             return {}
 
     def get_availability_ratio(self) -> Dict[str, float]:
-        """Calcule le ratio de disponibilité des pièces."""
+        """Calcule le ratio de disponibilité des pièces.
+        
+        Lit la table de synthèse stats_magasin (une seule ligne) ; recalcule
+        sur magasin si elle n'existe pas.
+        
+        Returns:
+            Dict[str, float]: Nombre de pièces par statut (statuts vides exclus)
+        """
         try:
+            with DatabaseConnection(self.config) as (_, cursor):
+                try:
+                    cursor.execute(
+                        'SELECT "available", "below_minimum" FROM stats_magasin WHERE "id" = 1'
+                    )
+                    row = cursor.fetchone() or (0, 0)
+                    counts = {"Disponible": row[0], "Sous minimum": row[1]}
+                    return {status: count for status, count in counts.items() if count}
+                except sqlite3.OperationalError:
+                    # Base non initialisée avec les tables de synthèse
+                    cursor.execute('''
+                        SELECT 
+                            CASE 
+                                WHEN Quantity >= Minimum THEN 'Disponible'
+                                ELSE 'Sous minimum'
+                            END as status,
+                            COUNT(*) as count
+                        FROM magasin
+                        GROUP BY status
+                    ''')
+                    return {row[0]: row[1] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Erreur lors du calcul des ratios de disponibilité : {str(e)}")
+            return {}
+
+    def get_stock_value(self) -> float:
+        """Retourne la valeur totale du stock (somme de Quantity x Cost_Estimate).
+        
+        Returns:
+            float: Valeur du stock (0 en cas d'erreur)
+        """
+        try:
+            with DatabaseConnection(self.config) as (_, cursor):
+                try:
+                    cursor.execute('SELECT "stock_value" FROM stats_magasin WHERE "id" = 1')
+                except sqlite3.OperationalError:
+                    cursor.execute('SELECT TOTAL("Quantity" * "Cost_Estimate") FROM magasin')
+                row = cursor.fetchone()
+                return float(row[0]) if row else 0.0
+        except Exception as e:
+            print(f"Erreur lors du calcul de la valeur du stock : {str(e)}")
+            return 0.0
+
+    def get_provider_mix(self, limit: int = 6) -> Dict[str, int]:
+        """Retourne la répartition des pièces par fournisseur.
+
+        Les fournisseurs au-delà des limit premiers sont regroupés sous
+        "Autres", les fournisseurs non renseignés sous "Non renseigné".
+
+        Args:
+            limit: Nombre de fournisseurs affichés individuellement
+
+        Returns:
+            Dict[str, int]: Nombre de pièces par fournisseur, par nombre décroissant
+        """
+        try:
+            limit = max(1, min(int(limit), MAX_QUERY_RESULTS))
             with DatabaseConnection(self.config) as (_, cursor):
                 cursor.execute('''
-                    SELECT 
-                        CASE 
-                            WHEN Quantity >= Minimum THEN 'Disponible'
-                            ELSE 'Sous minimum'
-                        END as status,
-                        COUNT(*) as count
+                    SELECT COALESCE(NULLIF(TRIM("Providers"), ''), 'Non renseigné') AS provider,
+                           COUNT(*) AS total
                     FROM magasin
-                    GROUP BY status
+                    GROUP BY provider
+                    ORDER BY total DESC, provider
                 ''')
+                rows = cursor.fetchall()
+            mix = dict(rows[:limit])
+            others = sum(count for _, count in rows[limit:])
+            if others:
+                mix["Autres"] = mix.get("Autres", 0) + others
+            return mix
+        except Exception as e:
+            print(f"Erreur lors du calcul de la répartition par fournisseur : {str(e)}")
+            return {}
+
+    @staticmethod
+    def _rollup_source(since: Optional[str]) -> Tuple[str, str, tuple]:
+        """Choisit la table d'agrégats adaptée à la période demandée.
+
+        Sans borne, les agrégats hebdomadaires (conservés sans limite)
+        suffisent ; avec une date de début, les agrégats journaliers
+        donnent la précision au jour.
+
+        Args:
+            since: Date de début au format AAAA-MM-JJ, ou None
+
+        Returns:
+            Tuple[str, str, tuple]: (table, clause WHERE, paramètres)
+        """
+        if since is None:
+            return "stock_movements_weekly", "", ()
+        if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", since):
+            raise ValueError("La date de début doit être au format AAAA-MM-JJ")
+        return "stock_movements_daily", 'WHERE r."day" >= ?', (since,)
+
+    def get_consumption_by_plane(self, since: Optional[str] = None) -> Dict[str, int]:
+        """Retourne le nombre de pièces retirées par avion.
+
+        Args:
+            since: Date de début au format AAAA-MM-JJ (tout l'historique si None)
+
+        Returns:
+            Dict[str, int]: Quantité retirée par nom d'avion ("Sans avion"
+            pour les retraits non attribués)
+        """
+        try:
+            table, where, params = self._rollup_source(since)
+            with DatabaseConnection(self.config) as (_, cursor):
+                cursor.execute(f'''
+                    SELECT COALESCE(p."name", 'Sans avion'), SUM(r."withdrawn") AS total
+                    FROM {table} r
+                    LEFT JOIN planes p ON p."ID plane" = r."ID plane"
+                    {where}
+                    GROUP BY r."ID plane"
+                    HAVING total > 0
+                    ORDER BY total DESC
+                ''', params)
                 return {row[0]: row[1] for row in cursor.fetchall()}
         except Exception as e:
-            print(f"Erreur lors du calcul des ratios de disponibilité : {str(e)}")
+            print(f"Erreur lors du calcul de la consommation par avion : {str(e)}")
             return {}
 
+    def get_consumption_by_part(
+        self,
+        since: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Tuple[int, str, int, int]]:
+        """Retourne les pièces les plus consommées.
+
+        Args:
+            since: Date de début au format AAAA-MM-JJ (tout l'historique si None)
+            limit: Nombre maximum de pièces retournées
+
+        Returns:
+            List[Tuple[int, str, int, int]]: ("ID stuff", description,
+            quantité retirée, quantité ajoutée), par retrait décroissant
+        """
+        try:
+            limit = max(1, min(int(limit), MAX_QUERY_RESULTS))
+            table, where, params = self._rollup_source(since)
+            with DatabaseConnection(self.config) as (_, cursor):
+                cursor.execute(f'''
+                    SELECT r."ID stuff", m."Description",
+                           SUM(r."withdrawn") AS withdrawn, SUM(r."added")
+                    FROM {table} r
+                    JOIN magasin m ON m."ID stuff" = r."ID stuff"
+                    {where}
+                    GROUP BY r."ID stuff"
+                    ORDER BY withdrawn DESC
+                    LIMIT ?
+                ''', params + (limit,))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Erreur lors du calcul de la consommation par pièce : {str(e)}")
+            return []
+
+    def get_recent_materials(self, username: str, limit: int = 50) -> List[int]:
+        """Retourne les pièces récemment mouvementées par un utilisateur.
+
+        Args:
+            username: Nom d'utilisateur
+            limit: Nombre maximum de pièces retournées
+
+        Returns:
+            List[int]: "ID stuff" du plus récent au plus ancien
+        """
+        try:
+            limit = max(1, min(int(limit), MAX_QUERY_RESULTS))
+            with DatabaseConnection(self.config) as (_, cursor):
+                # recent_materials est tenue à jour par trigger et survit à
+                # la purge du journal brut (compact_stock_movements)
+                cursor.execute('''
+                    SELECT "ID stuff"
+                    FROM recent_materials
+                    WHERE "username" = ?
+                    ORDER BY "last_movement" DESC
+                    LIMIT ?
+                ''', (username, limit))
+                return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Erreur lors de la récupération des pièces récentes : {str(e)}")
+            return []
+
 
 # Instance globale pour un accès facile aux requêtes
 db = DatabaseQueries()
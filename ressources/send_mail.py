@@ -5,124 +5,132 @@ pour l'application Méca'STUFF.
 
 # Imports de la bibliothèque standard
 import io
-import os
+import time
+import socket
+import threading
 from datetime import datetime
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import smtplib
 
-# Imports des bibliothèques tierces
-import matplotlib.pyplot as plt
-import tkinter as tk
-from tkinter import messagebox
+from ressources.pool_bd import pool
+from ressources.config_store import config as default_config
+from ressources.request_bd import db
+from ressources.report_charts import render_charts
 
-def generer_diagrammes():
+# Format de la date du dernier envoi enregistrée dans la configuration
+SEND_DATE_FORMAT = "%d/%m/%Y à %H:%M"
+
+# Paramètres de la file d'envoi (secondes)
+SMTP_TIMEOUT = 30            # Délai maximum d'une opération SMTP
+SMTP_IDLE_SECONDS = 60       # Durée de conservation d'une session inactive
+OUTBOX_POLL_SECONDS = 300    # Réveil périodique du thread d'envoi
+RETRY_BASE_SECONDS = 30      # Délai avant la première nouvelle tentative
+RETRY_MAX_SECONDS = 3600     # Délai maximum entre deux tentatives
+MAX_ATTEMPTS = 5             # Nombre de tentatives avant abandon
+SENDING_LEASE_SECONDS = 600  # Délai après lequel un envoi interrompu est repris
+
+# Poste d'origine des emails mis en file : chaque poste n'envoie que les siens
+WORKSTATION = socket.gethostname()
+
+# Erreurs liées à la connexion : la session est rouverte une fois
+SESSION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+def _send_date_to_since(last_send_date):
     """
-    Génère les trois diagrammes statistiques.
+    Convertit la date du dernier envoi en date de début de période.
+
+    Args:
+        last_send_date (str): Date au format JJ/MM/AAAA à HH:MM
+
+    Returns:
+        str: Date au format AAAA-MM-JJ, ou None si aucun envoi valide
+    """
+    try:
+        return datetime.strptime(last_send_date, SEND_DATE_FORMAT).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def generer_diagrammes(since=None):
+    """
+    Génère les trois diagrammes statistiques à partir de la base.
+
+    Args:
+        since (str): Début de la période de consommation, au format
+            AAAA-MM-JJ (tout l'historique si None)
 
     Returns:
         list: Liste des images des diagrammes générés en format BytesIO
     """
-    diagrammes = []
+    availability = db.get_availability_ratio()
+    consumption = db.get_consumption_by_plane(since)
+    mix = db.get_provider_mix()
 
-    # Configuration des diagrammes
+    # Configuration des diagrammes (titre, libellés, valeurs)
     diag_configs = [
-        {
-            'title': 'Proportion des types de pièces',
-            'labels': ['Type A', 'Type B', 'Type C'],
-            'values': [30, 45, 25]
-        },
-        {
-            'title': 'Ratio de disponibilité des pièces',
-            'labels': ['Disponible', 'Indisponible'],
-            'values': [70, 30]
-        },
-        {
-            'title': 'Consommation de pièces par avion',
-            'labels': ['Avion 1', 'Avion 2', 'Avion 3', 'Avion 4', 'Avion 5'],
-            'values': [30, 25, 20, 15, 10]
-        }
+        ('Proportion des pièces par fournisseur', list(mix), list(mix.values())),
+        ('Ratio de disponibilité des pièces', list(availability), list(availability.values())),
+        ('Consommation de pièces par avion', list(consumption), list(consumption.values()))
     ]
 
-    # Génération des diagrammes
-    for config in diag_configs:
-        plt.figure(figsize=(8, 6))
-        plt.pie(config['values'], labels=config['labels'], autopct='%1.1f%%')
-        plt.title(config['title'])
-
-        img = io.BytesIO()
-        plt.savefig(img, format='png')
-        plt.close()
-        diagrammes.append(img)
-
-    return diagrammes
+    return [io.BytesIO(image) for image in render_charts(diag_configs)]
 
 
 class EmailManager:
     """Gestionnaire d'envoi d'emails."""
 
-    def __init__(self, smtp_server="smtp.gmail.com", smtp_port=587):
+    def __init__(
+        self,
+        smtp_server="smtp.gmail.com",
+        smtp_port=587,
+        use_tls=True,
+        expediteur="jules.gillet83@gmail.com",
+        mot_de_passe="natw uorn wqsv gaix",
+        config=None
+    ):
         """
         Initialise le gestionnaire d'emails.
 
         Args:
             smtp_server (str): Adresse du serveur SMTP
             smtp_port (int): Port du serveur SMTP
+            use_tls (bool): Si True, chiffre la session avec STARTTLS
+            expediteur (str): Adresse de l'expéditeur
+            mot_de_passe (str): Mot de passe SMTP (pas d'authentification si vide)
+            config (ConfigStore): Configuration où sont mémorisés les envois
+                (configuration de l'application si None)
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
-        self.expediteur = "jules.gillet83@gmail.com"
-        self.mot_de_passe = "natw uorn wqsv gaix"
-        self.config_file = os.path.join(os.path.dirname(__file__), "config.csv")
+        self.use_tls = use_tls
+        self.expediteur = expediteur
+        self.mot_de_passe = mot_de_passe
+        self.config = config if config is not None else default_config
 
     def get_last_send_date(self):
         """
-        Récupère la date du dernier envoi de mail depuis le fichier config.csv.
+        Récupère la date du dernier envoi de mail depuis la configuration.
 
         Returns:
             str: Date du dernier envoi ou message par défaut
         """
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # Recherche de la ligne 'last_send_date'
-                for i, line in enumerate(lines):
-                    if line.strip() == 'last_send_date':
-                        if i + 1 < len(lines):
-                            return lines[i + 1].strip()
-                return "Aucun envoi précédent"
-        except FileNotFoundError:
-            return "Aucun envoi précédent"
-        except Exception as e:
-            print(f"Erreur lors de la lecture de la date : {str(e)}")
-            return "Aucun envoi précédent"
+        return self.config.get("last_send_date") or "Aucun envoi précédent"
 
     def get_last_recipient(self):
         """
-        Récupère le dernier destinataire depuis le fichier config.csv.
+        Récupère le dernier destinataire depuis la configuration.
 
         Returns:
             str: Dernier destinataire ou chaîne vide
         """
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # Recherche de la ligne 'last_recipient'
-                for i, line in enumerate(lines):
-                    if line.strip() == 'last_recipient':
-                        if i + 1 < len(lines):
-                            return lines[i + 1].strip()
-                return ""
-        except FileNotFoundError:
-            return ""
-        except Exception as e:
-            print(f"Erreur lors de la lecture du destinataire : {str(e)}")
-            return ""
+        return self.config.get("last_recipient") or ""
 
     def save_last_send_info(self, destinataire):
         """
-        Sauvegarde la date d'envoi et le destinataire dans config.csv.
+        Sauvegarde la date d'envoi et le destinataire dans la configuration.
 
         Args:
             destinataire (str): Adresse email du destinataire
@@ -130,46 +138,12 @@ class EmailManager:
         Returns:
             str: Date actuelle au format JJ/MM/AAAA à HH:MM
         """
-        current_date = datetime.now().strftime("%d/%m/%Y à %H:%M")
-        try:
-            # Lecture du fichier existant
-            lines = []
-            date_found = False
-            recipient_found = False
-            
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                # Mise à jour des valeurs existantes
-                i = 0
-                while i < len(lines):
-                    if lines[i].strip() == 'last_send_date':
-                        lines[i + 1] = current_date + '\n'
-                        date_found = True
-                        i += 2
-                    elif lines[i].strip() == 'last_recipient':
-                        lines[i + 1] = destinataire + '\n'
-                        recipient_found = True
-                        i += 2
-                    else:
-                        i += 1
-            
-            # Ajout des nouvelles valeurs si non trouvées
-            if not date_found:
-                lines.extend(['last_send_date\n', current_date + '\n'])
-            if not recipient_found:
-                lines.extend(['last_recipient\n', destinataire + '\n'])
-            
-            # Écriture du fichier
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-                
-            return current_date
-            
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde des informations : {str(e)}")
-            return current_date
+        current_date = datetime.now().strftime(SEND_DATE_FORMAT)
+        self.config.update({
+            "last_send_date": current_date,
+            "last_recipient": destinataire
+        })
+        return current_date
 
     def envoie_mail(self, destinataire, objet, contenu, avec_diagrammes=False):
         """
@@ -185,10 +159,7 @@ class EmailManager:
             bool: True si l'envoi a réussi, False sinon
         """
         try:
-            message = self._create_message(destinataire, objet, contenu)
-
-            if avec_diagrammes:
-                self._attach_diagrams(message)
+            message = self.build_message(destinataire, objet, contenu, avec_diagrammes)
 
             success = self._send_message(message, avec_diagrammes)
             
@@ -201,6 +172,24 @@ class EmailManager:
             print(f"Erreur lors de l'envoi du mail : {str(e)}")
             return False
 
+    def build_message(self, destinataire, objet, contenu, avec_diagrammes=False):
+        """
+        Crée le message complet, diagrammes compris.
+
+        Args:
+            destinataire (str): Adresse email du destinataire
+            objet (str): Objet du mail
+            contenu (str): Contenu du mail
+            avec_diagrammes (bool): Si True, inclut les diagrammes statistiques
+
+        Returns:
+            MIMEMultipart: Message prêt à être envoyé
+        """
+        message = self._create_message(destinataire, objet, contenu)
+        if avec_diagrammes:
+            self._attach_diagrams(message)
+        return message
+
     def _create_message(self, destinataire, objet, contenu):
         """
         Crée le message email avec le contenu HTML.
@@ -237,10 +226,11 @@ class EmailManager:
         Returns:
             str: Contenu formaté en HTML
         """
+        contenu_html = contenu.replace('\n', '<br>')
         return f"""
         <html>
             <body>
-                <p>{contenu.replace('\n', '<br>')}</p>
+                <p>{contenu_html}</p>
                 <br>
                 <p>Cordialement,</p>
                 <img src="https://drive.google.com/uc?export=view&id=18g47sUPXEQ4enbYHXf8rBVO7GAIewIBz"
@@ -259,7 +249,9 @@ class EmailManager:
         Args:
             message (MIMEMultipart): Message auquel ajouter les diagrammes
         """
-        diagrammes = generer_diagrammes()
+        # Consommation depuis le dernier rapport envoyé
+        since = _send_date_to_since(self.get_last_send_date())
+        diagrammes = generer_diagrammes(since)
         for i, img_data in enumerate(diagrammes, 1):
             img_data.seek(0)
             image = MIMEImage(img_data.read(), _subtype="png")
@@ -271,43 +263,330 @@ class EmailManager:
             )
             message.attach(image)
 
-    def _send_message(self, message, avec_diagrammes):
+    def open_session(self):
+        """
+        Ouvre une session SMTP authentifiée, réutilisable pour plusieurs envois.
+
+        Returns:
+            smtplib.SMTP: Session ouverte (à fermer par l'appelant)
+        """
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.mot_de_passe:
+                server.login(self.expediteur, self.mot_de_passe)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _send_message(self, message, avec_diagrammes, server=None):
         """
         Envoie le message via SMTP.
 
         Args:
             message (MIMEMultipart): Message à envoyer
             avec_diagrammes (bool): Si True, sauvegarde la date d'envoi
+            server (smtplib.SMTP): Session déjà ouverte à réutiliser
+                (une session est ouverte pour ce seul message si None)
 
         Returns:
             bool: True si l'envoi a réussi, False sinon
         """
-        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(self.expediteur, self.mot_de_passe)
-            server.send_message(message)
+        if server is None:
+            with self.open_session() as server:
+                return self._send_message(message, avec_diagrammes, server)
+
+        server.send_message(message)
 
-            if avec_diagrammes:
-                self.save_last_send_info(message["To"])
+        if avec_diagrammes:
+            self.save_last_send_info(message["To"])
 
-            return True
+        return True
 
 
-# Instance globale
+class EmailOutbox:
+    """
+    File d'envoi persistante des emails.
+
+    Les emails sont inscrits dans la table email_outbox puis envoyés par un
+    thread de fond, qui garde une même session SMTP ouverte pour les envois
+    successifs et retente les échecs avec un délai croissant. Chaque poste
+    n'envoie que les emails qu'il a mis en file : les diagrammes et la date
+    du dernier envoi viennent de sa propre configuration. L'interface relit
+    le résultat des envois dans la table avec statuses, sans jamais attendre
+    le serveur.
+    """
+
+    def __init__(self, manager, db_path=None, owner=WORKSTATION):
+        """
+        Initialise la file d'envoi (le thread démarre avec start ou enqueue).
+
+        Args:
+            manager (EmailManager): Gestionnaire utilisé pour créer et envoyer les messages
+            db_path (str): Chemin de la base (base par défaut si None)
+            owner (str): Poste d'origine des emails mis en file et envoyés
+        """
+        self.manager = manager
+        self.db_path = db_path
+        self.owner = owner
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = None
+        self._server_used_at = 0.0
+
+    def enqueue(self, destinataire, objet, contenu, avec_diagrammes=False):
+        """
+        Inscrit un email dans la file et réveille le thread d'envoi.
+
+        Args:
+            destinataire (str): Adresse email du destinataire
+            objet (str): Objet du mail
+            contenu (str): Contenu du mail
+            avec_diagrammes (bool): Si True, inclut les diagrammes statistiques
+
+        Returns:
+            int: ID de l'email dans la file, None en cas d'erreur
+        """
+        try:
+            with pool.connection(self.db_path) as conn:
+                cursor = conn.execute(
+                    '''
+                    INSERT INTO email_outbox (
+                        "queued_by", "recipient", "subject", "body", "with_charts"
+                    )
+                    VALUES (?, ?, ?, ?, ?)
+                    ''',
+                    (self.owner, destinataire, objet, contenu, int(bool(avec_diagrammes)))
+                )
+                mail_id = cursor.lastrowid
+        except Exception as e:
+            print(f"Erreur lors de la mise en file de l'email : {str(e)}")
+            return None
+
+        self.start()
+        self._wake.set()
+        return mail_id
+
+    def start(self):
+        """Démarre le thread d'envoi s'il ne tourne pas déjà."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="email-outbox", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Arrête le thread d'envoi ; les emails non envoyés restent en file.
+
+        Args:
+            timeout (float): Durée maximale d'attente du thread (secondes)
+        """
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def statuses(self, mail_ids):
+        """
+        Relit dans la file l'état d'emails mis en file.
+
+        Args:
+            mail_ids (list): IDs des emails à consulter
+
+        Returns:
+            dict: ID mail -> (statut, tentatives, destinataire, dernière erreur),
+            le statut valant "pending", "sending", "sent" ou "failed"
+        """
+        mail_ids = list(mail_ids)
+        if not mail_ids:
+            return {}
+        try:
+            placeholders = ", ".join("?" * len(mail_ids))
+            with pool.connection(self.db_path) as conn:
+                rows = conn.execute(
+                    f'''
+                    SELECT "ID mail", "status", "attempts", "recipient", "last_error"
+                    FROM email_outbox
+                    WHERE "ID mail" IN ({placeholders})
+                    ''',
+                    mail_ids
+                ).fetchall()
+            return {row[0]: tuple(row[1:]) for row in rows}
+        except Exception as e:
+            print(f"Erreur lors de la lecture de la file d'envoi : {str(e)}")
+            return {}
+
+    def _run(self):
+        """Boucle du thread d'envoi."""
+        try:
+            # Les emails interrompus par une fermeture de l'application sont
+            # repris par drain() à l'expiration de leur réservation : un autre
+            # poste peut être en train de les envoyer
+            while not self._stop.is_set():
+                try:
+                    delay = self.drain()
+                except Exception as e:
+                    # Base verrouillée ou indisponible : nouvel essai plus tard,
+                    # le thread reste actif
+                    print(f"Erreur du thread d'envoi des emails : {str(e)}")
+                    delay = RETRY_BASE_SECONDS
+
+                # Fermeture d'une session restée inactive trop longtemps
+                if self._server is not None:
+                    idle = time.monotonic() - self._server_used_at
+                    if idle >= SMTP_IDLE_SECONDS:
+                        self._close_session()
+                    else:
+                        delay = min(delay, SMTP_IDLE_SECONDS - idle)
+
+                self._wake.wait(max(0.0, delay))
+                self._wake.clear()
+        finally:
+            self._close_session()
+            pool.close_thread()
+
+    def drain(self):
+        """
+        Envoie tous les emails dont l'échéance est atteinte.
+
+        Returns:
+            float: Délai avant la prochaine échéance (secondes)
+        """
+        while not self._stop.is_set():
+            # Réservation atomique parmi les emails de ce poste (ou sans poste
+            # d'origine, mis en file avant queued_by). Un envoi réservé mais
+            # jamais conclu (application fermée) redevient disponible à
+            # l'expiration de sa réservation.
+            now = time.time()
+            with pool.connection(self.db_path) as conn:
+                row = conn.execute(
+                    '''
+                    UPDATE email_outbox
+                    SET "status" = 'sending', "next_attempt_at" = ?
+                    WHERE "ID mail" = (
+                        SELECT "ID mail"
+                        FROM email_outbox
+                        WHERE "status" IN ('pending', 'sending') AND "next_attempt_at" <= ?
+                            AND "queued_by" IN (?, '')
+                        ORDER BY "next_attempt_at", "ID mail"
+                        LIMIT 1
+                    )
+                    AND "status" IN ('pending', 'sending') AND "next_attempt_at" <= ?
+                    RETURNING "ID mail", "recipient", "subject", "body", "with_charts", "attempts"
+                    ''',
+                    (now + SENDING_LEASE_SECONDS, now, self.owner, now)
+                ).fetchone()
+            if row is None:
+                break
+            self._send_one(*row)
+
+        with pool.connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT MIN(\"next_attempt_at\") FROM email_outbox "
+                "WHERE \"status\" IN ('pending', 'sending') AND \"queued_by\" IN (?, '')",
+                (self.owner,)
+            ).fetchone()
+        if row[0] is None:
+            return OUTBOX_POLL_SECONDS
+        return min(OUTBOX_POLL_SECONDS, max(0.0, row[0] - time.time()))
+
+    def _send_one(self, mail_id, destinataire, objet, contenu, avec_diagrammes, attempts):
+        """Envoie un email de la file et enregistre le résultat."""
+        try:
+            message = self.manager.build_message(destinataire, objet, contenu, bool(avec_diagrammes))
+            try:
+                self.manager._send_message(message, bool(avec_diagrammes), self._session())
+            except SESSION_ERRORS:
+                # Session fermée par le serveur entre deux envois : une reconnexion
+                self._close_session()
+                self.manager._send_message(message, bool(avec_diagrammes), self._session())
+            self._server_used_at = time.monotonic()
+        except Exception as e:
+            self._close_session()
+            self._record_failure(mail_id, attempts + 1, e)
+            return
+
+        with pool.connection(self.db_path) as conn:
+            conn.execute(
+                '''
+                UPDATE email_outbox
+                SET "status" = 'sent', "attempts" = ?, "last_error" = NULL,
+                    "sent_at" = CURRENT_TIMESTAMP
+                WHERE "ID mail" = ?
+                ''',
+                (attempts + 1, mail_id)
+            )
+
+    def _record_failure(self, mail_id, attempts, error):
+        """Replanifie un email après un échec, ou l'abandonne."""
+        # Refus définitif du serveur (adresse invalide...) : inutile de retenter
+        permanent = (
+            isinstance(error, smtplib.SMTPRecipientsRefused)
+            or (isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500)
+        )
+        if permanent or attempts >= MAX_ATTEMPTS:
+            status, next_attempt = "failed", 0
+        else:
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            status, next_attempt = "pending", time.time() + delay
+
+        print(f"Erreur lors de l'envoi de l'email {mail_id} : {str(error)}")
+        with pool.connection(self.db_path) as conn:
+            conn.execute(
+                '''
+                UPDATE email_outbox
+                SET "status" = ?, "attempts" = ?, "next_attempt_at" = ?, "last_error" = ?
+                WHERE "ID mail" = ?
+                ''',
+                (status, attempts, next_attempt, str(error), mail_id)
+            )
+
+    def _session(self):
+        """Retourne la session SMTP courante, ouverte au besoin."""
+        if self._server is None:
+            self._server = self.manager.open_session()
+            self._server_used_at = time.monotonic()
+        return self._server
+
+    def _close_session(self):
+        """Ferme la session SMTP courante."""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+# Instances globales
 global_email_manager = EmailManager()
+global_email_outbox = EmailOutbox(global_email_manager)
 
 
 def envoyer_rapport_statistiques(destinataire="jules.gillet83@gmail.com"):
     """
-    Envoie un rapport par email avec les diagrammes statistiques.
+    Place dans la file d'envoi un rapport avec les diagrammes statistiques.
+
+    Le rapport est envoyé en arrière-plan ; son résultat se relit avec
+    global_email_outbox.statuses.
 
     Args:
         destinataire (str): Adresse email du destinataire
 
     Returns:
-        bool: True si l'envoi a réussi, False sinon
+        int: ID de l'email dans la file, None en cas d'erreur
     """
     contenu = """
 Bonjour,
@@ -315,24 +594,14 @@ Bonjour,
 Veuillez trouver ci-joint le rapport statistique du matériel Méca'STUFF.
 
 Les diagrammes joints présentent :
-1. La proportion des différents types de pièces
+1. La proportion des pièces par fournisseur
 2. Le ratio de pièces disponibles/indisponibles
 3. La consommation de pièces par avion depuis le dernier rapport
 """
 
-    success = global_email_manager.envoie_mail(
+    return global_email_outbox.enqueue(
         destinataire=destinataire,
         objet="Rapport statistique Méca'STUFF",
         contenu=contenu,
         avec_diagrammes=True
     )
-    
-    root = tk.Tk()
-    root.withdraw()  # Cacher la fenêtre principale de Tkinter
-    
-    if success:
-        messagebox.showinfo("Succès", "Le mail a été envoyé avec succès.")
-    else:
-        messagebox.showerror("Échec", "Échec de l'envoi du mail.")
-    
-    return success
\ No newline at end of file
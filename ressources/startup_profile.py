@@ -0,0 +1,153 @@
+"""
+Module de mesure du temps de démarrage de l'application.
+
+Activé par « python app.py --profile-startup », ce module chronomètre chaque
+import de premier niveau (dépendances comprises) effectué avant l'affichage
+de la fenêtre de connexion, ainsi que les étapes marquées par l'application,
+jusqu'à la première image à l'écran. Le rapport indique aussi si les modules
+chargés à la demande (Matplotlib, pygame, NumPy, messagerie) sont bien restés
+hors du chemin de démarrage, et si le budget de démarrage est respecté.
+"""
+
+import sys
+import time
+import builtins
+from typing import Any, Dict, List, Optional, Tuple
+
+# Temps maximum jusqu'à la première image de la fenêtre de connexion (s)
+STARTUP_BUDGET_S = 1.5
+
+# Nombre d'imports affichés dans le rapport
+REPORT_TOP = 15
+
+# Modules qui ne doivent être chargés qu'à leur première utilisation
+LAZY_MODULES = (
+    "matplotlib", "pygame", "numpy",
+    "ressources.send_mail", "ressources.catalog", "ressources.charts"
+)
+
+
+class StartupProfiler:
+    """Chronométrage des imports et des étapes du démarrage."""
+
+    def __init__(self) -> None:
+        """Initialise un profileur inactif."""
+        self.start: Optional[float] = None
+        self.imports: Dict[str, float] = {}
+        self.marks: List[Tuple[str, float]] = []
+        self._depth = 0
+        self._original_import = None
+
+    @property
+    def active(self) -> bool:
+        """Indique si la mesure est en cours."""
+        return self.start is not None
+
+    def install(self, start: Optional[float] = None) -> None:
+        """Commence la mesure en interceptant les imports.
+
+        Args:
+            start: Instant de référence (time.perf_counter), maintenant si None
+        """
+        if self.active:
+            return
+        self.start = time.perf_counter() if start is None else start
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        """Rétablit le mécanisme d'import d'origine."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(
+        self,
+        name: str,
+        globals: Any = None,
+        locals: Any = None,
+        fromlist: Any = (),
+        level: int = 0
+    ) -> Any:
+        """Import chronométré : seul l'import le plus externe est compté."""
+        if self._depth:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        # « from paquet import module » : le temps revient au sous-module
+        submodules = [
+            f"{name}.{item}" for item in (fromlist or ())
+            if isinstance(item, str) and f"{name}.{item}" not in sys.modules
+        ]
+
+        self._depth += 1
+        begin = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            duration = time.perf_counter() - begin
+            self._depth -= 1
+            loaded = [module for module in submodules if module in sys.modules]
+            key = ", ".join(loaded) if loaded else name
+            self.imports[key] = self.imports.get(key, 0.0) + duration
+
+    def mark(self, label: str) -> None:
+        """Enregistre une étape du démarrage.
+
+        Args:
+            label: Nom de l'étape
+        """
+        if self.active:
+            self.marks.append((label, time.perf_counter() - self.start))
+
+    def elapsed(self) -> float:
+        """Temps écoulé depuis le début de la mesure (s)."""
+        return time.perf_counter() - self.start if self.active else 0.0
+
+    def within_budget(self, budget: float = STARTUP_BUDGET_S) -> bool:
+        """Indique si la dernière étape est atteinte dans le budget.
+
+        Args:
+            budget: Temps maximum (s)
+
+        Returns:
+            bool: True si le démarrage respecte le budget
+        """
+        return bool(self.marks) and self.marks[-1][1] <= budget
+
+    def report(self, budget: float = STARTUP_BUDGET_S) -> str:
+        """Construit le rapport de démarrage.
+
+        Args:
+            budget: Temps maximum jusqu'à la dernière étape (s)
+
+        Returns:
+            str: Rapport lisible
+        """
+        lines = ["Imports (temps cumulé, dépendances comprises) :"]
+        ranked = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)
+        for name, duration in ranked[:REPORT_TOP]:
+            lines.append(f"  {duration * 1000:8.1f} ms  {name}")
+        total_imports = sum(self.imports.values())
+        lines.append(f"  {total_imports * 1000:8.1f} ms  total ({len(self.imports)} imports)")
+
+        lines.append("Étapes (depuis le lancement) :")
+        for label, at in self.marks:
+            lines.append(f"  {at * 1000:8.1f} ms  {label}")
+
+        loaded = [name for name in LAZY_MODULES if name in sys.modules]
+        lines.append(
+            "Modules différés chargés au démarrage : "
+            + (", ".join(loaded) if loaded else "aucun")
+        )
+
+        if self.marks:
+            verdict = "respecté" if self.within_budget(budget) else "DÉPASSÉ"
+            lines.append(
+                f"Budget de démarrage : {self.marks[-1][1] * 1000:.0f} ms "
+                f"pour {budget * 1000:.0f} ms ({verdict})"
+            )
+        return "\n".join(lines)
+
+
+# Instance globale
+profiler = StartupProfiler()
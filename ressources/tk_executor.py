@@ -0,0 +1,178 @@
+"""
+Module d'exécution des traitements longs hors du thread de l'interface.
+
+Ce module fournit un exécuteur qui lance les accès à la base de données dans
+un thread de travail et rapatrie leurs résultats dans la boucle Tk par
+interrogation périodique (after). Les fonctions de rappel s'exécutent donc
+toujours dans le thread de l'interface, qui reste réactive quelle que soit
+la latence de la base. Une requête remplacée par une plus récente portant
+la même clé est annulée, et son résultat éventuel ignoré.
+"""
+
+import queue
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Intervalle d'interrogation des résultats (ms)
+POLL_INTERVAL_MS = 50
+
+# Un seul thread : les écritures restent sérialisées, comme dans le thread Tk
+DEFAULT_WORKERS = 1
+
+
+class TkExecutor:
+    """Exécuteur de tâches en arrière-plan relié à une fenêtre Tk."""
+
+    def __init__(
+        self,
+        widget: tk.Misc,
+        max_workers: int = DEFAULT_WORKERS,
+        on_busy: Optional[Callable[[bool], None]] = None
+    ) -> None:
+        """Initialise l'exécuteur.
+
+        Args:
+            widget: Widget dont la boucle Tk reçoit les résultats
+            max_workers: Nombre de threads de travail
+            on_busy: Fonction appelée avec True quand des tâches sont en
+                cours, puis avec False quand toutes sont terminées
+        """
+        self.widget = widget
+        self.on_busy = on_busy
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="tk-db")
+        self._done: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._latest: Dict[str, Future] = {}
+        self._pending = 0
+        self._poll_id: Optional[str] = None
+        self._closed = False
+
+    @property
+    def busy(self) -> bool:
+        """Indique si des tâches sont en attente ou en cours."""
+        return self._pending > 0
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        key: Optional[str] = None,
+        **kwargs: Any
+    ) -> Optional[Future]:
+        """Lance une fonction dans le thread de travail.
+
+        Args:
+            fn: Fonction à exécuter (ne doit pas toucher aux widgets)
+            *args: Arguments positionnels de fn
+            on_done: Rappel exécuté dans le thread Tk avec le résultat
+            on_error: Rappel exécuté dans le thread Tk avec l'exception
+            key: Clé de la requête ; une nouvelle requête de même clé rend
+                la précédente obsolète
+            **kwargs: Arguments nommés de fn
+
+        Returns:
+            Optional[Future]: Tâche lancée, None si l'exécuteur est fermé
+        """
+        if self._closed:
+            return None
+
+        if key is not None:
+            self.cancel(key)
+
+        future = self._executor.submit(fn, *args, **kwargs)
+        if key is not None:
+            self._latest[key] = future
+
+        self._pending += 1
+        if self._pending == 1:
+            self._notify_busy(True)
+
+        future.add_done_callback(
+            lambda done: self._done.put((done, key, on_done, on_error))
+        )
+        self._schedule_poll()
+        return future
+
+    def cancel(self, key: str) -> None:
+        """Rend obsolète la dernière requête d'une clé.
+
+        La tâche est annulée si elle n'a pas démarré ; sinon son résultat
+        sera ignoré.
+
+        Args:
+            key: Clé de la requête
+        """
+        future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _schedule_poll(self) -> None:
+        """Programme l'interrogation des résultats si elle ne l'est pas déjà."""
+        if self._poll_id is None and not self._closed:
+            try:
+                self._poll_id = self.widget.after(POLL_INTERVAL_MS, self._poll)
+            except tk.TclError:
+                self._poll_id = None
+
+    def _poll(self) -> None:
+        """Traite, dans le thread Tk, les tâches terminées depuis le dernier passage."""
+        self._poll_id = None
+        while not self._closed:
+            try:
+                future, key, on_done, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    # Résultat d'une requête remplacée entre-temps
+                    continue
+                del self._latest[key]
+
+            error = future.exception()
+            try:
+                if error is not None:
+                    if on_error is not None:
+                        on_error(error)
+                    else:
+                        print(f"Erreur lors d'une tâche en arrière-plan : {str(error)}")
+                elif on_done is not None:
+                    on_done(future.result())
+            except Exception as e:
+                print(f"Erreur lors du traitement d'un résultat : {str(e)}")
+
+        if self._closed:
+            return
+        if self._pending:
+            self._schedule_poll()
+        else:
+            self._notify_busy(False)
+
+    def _notify_busy(self, busy: bool) -> None:
+        """Prévient l'interface d'un changement d'activité."""
+        if self.on_busy is not None and not self._closed:
+            try:
+                self.on_busy(busy)
+            except tk.TclError:
+                pass
+
+    def shutdown(self) -> None:
+        """Arrête l'exécuteur : les tâches en attente sont annulées.
+
+        Une tâche déjà en cours se termine dans son thread, mais aucun
+        rappel n'est plus exécuté.
+        """
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.widget.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None
+        self._latest.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
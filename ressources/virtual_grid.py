@@ -0,0 +1,470 @@
+"""
+Module du tableau de résultats virtualisé.
+
+Ce module fournit un tableau qui ne dessine que les lignes visibles : un
+nombre fixe d'éléments de canevas est réutilisé pendant le défilement, quelle
+que soit la taille du résultat. Les lignes sont chargées page par page à la
+demande, au fur et à mesure que l'utilisateur fait défiler le tableau ; avec
+un exécuteur (TkExecutor), les pages sont lues en arrière-plan et les lignes
+pas encore arrivées sont affichées comme en cours de chargement.
+"""
+
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import customtkinter as ctk
+
+from ressources import allinfos as infos
+from ressources.request_bd import MAX_PAGE_SIZE
+
+# Dimensions du tableau (pixels)
+ROW_HEIGHT = 24
+HEADER_HEIGHT = 28
+CELL_PADDING = 6
+CHAR_WIDTH = 7  # Largeur moyenne d'un caractère, pour tronquer les cellules
+
+# Nombre de lignes chargées par requête
+PAGE_SIZE = 200
+
+# Texte affiché à la place d'une ligne en cours de chargement
+PLACEHOLDER = "Chargement…"
+
+# Couleurs des lignes
+ROW_COLORS = ("#242424", "#2E2E2E")
+SELECTED_COLOR = "#5A2A10"
+
+# Écart (en lignes) au-delà duquel une ligne lointaine est lue directement à
+# sa position plutôt qu'en poursuivant la pagination sur clé
+JUMP_THRESHOLD = PAGE_SIZE
+
+# Fonction de chargement :
+# (clé de tri, décroissant, jeton, taille, position) -> (lignes, jeton suivant)
+# La position n'est utilisée que sans jeton, pour un saut direct.
+PageFetcher = Callable[[str, bool, Optional[str], int, int], Tuple[List[Any], Optional[str]]]
+
+
+class PagedRows:
+    """Lignes d'une requête paginée, chargées à la demande et mises en cache.
+
+    Les pages sont lues par pagination sur clé à la suite des lignes déjà
+    chargées. Une ligne lointaine (barre de défilement) est lue directement
+    à sa position, sans charger les pages intermédiaires ; la lecture
+    reprend ensuite par clé à partir de cette page.
+    """
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        sort_key: str,
+        descending: bool = False,
+        total: Optional[int] = None,
+        page_size: int = PAGE_SIZE
+    ) -> None:
+        """Initialise un cache vide.
+
+        Args:
+            fetch_page: Fonction de chargement d'une page
+            sort_key: Colonne de tri
+            descending: Tri décroissant
+            total: Nombre total de lignes s'il est connu
+            page_size: Nombre de lignes par requête
+        """
+        self.fetch_page = fetch_page
+        self.sort_key = sort_key
+        self.descending = descending
+        self.total = total
+        self.page_size = page_size
+        self.exhausted = False
+        self.loading = False
+        self.failed = False
+        self._rows: Dict[int, Any] = {}
+        self._cursors: Dict[int, str] = {}  # Index de reprise -> jeton de pagination
+
+    def __len__(self) -> int:
+        """Nombre de lignes connu (total, ou lignes chargées + 1 s'il en reste)."""
+        if self.total is not None:
+            return self.total
+        known = max(self._rows) + 1 if self._rows else 0
+        return known + (0 if self.exhausted else 1)
+
+    def row(self, index: int) -> Optional[Any]:
+        """Retourne la ligne index si elle est chargée, None sinon."""
+        return self._rows.get(index)
+
+    def _first_missing(self, start: int, stop: int) -> Optional[int]:
+        """Retourne l'index de la première ligne non chargée de [start, stop[."""
+        if self.total is not None:
+            stop = min(stop, self.total)
+        for index in range(max(0, start), stop):
+            if index not in self._rows:
+                return index
+        return None
+
+    def missing(self, start: int, stop: int) -> bool:
+        """Indique s'il reste des lignes à charger dans [start, stop[."""
+        return not self.failed and self._first_missing(start, stop) is not None
+
+    def next_request(self, start: int, stop: int) -> Tuple[int, Optional[str], int]:
+        """Choisit la prochaine page à charger pour couvrir [start, stop[.
+
+        La pagination sur clé est poursuivie depuis la fin d'un bloc chargé
+        proche ; au-delà de JUMP_THRESHOLD lignes, la page est lue
+        directement à sa position.
+
+        Args:
+            start: Index de la première ligne souhaitée
+            stop: Index de fin (exclu)
+
+        Returns:
+            Tuple[int, Optional[str], int]: (position, jeton, taille de la page)
+        """
+        first = self._first_missing(start, stop)
+        position, cursor = first, None
+        resume = max((index for index in self._cursors if index <= first), default=None)
+        if resume is not None and first - resume <= JUMP_THRESHOLD:
+            position, cursor = resume, self._cursors[resume]
+        size = min(max(self.page_size, stop - position), MAX_PAGE_SIZE)
+        return position, cursor, size
+
+    def fetch(self, position: int, cursor: Optional[str], size: int) -> Tuple[List[Any], Optional[str]]:
+        """Lit une page (utilisable depuis un thread de travail).
+
+        Args:
+            position: Index de la première ligne de la page
+            cursor: Jeton de pagination, None pour un saut direct
+            size: Nombre de lignes
+
+        Returns:
+            Tuple[List[Any], Optional[str]]: (lignes, jeton suivant)
+        """
+        offset = position if cursor is None else 0
+        return self.fetch_page(self.sort_key, self.descending, cursor, size, offset)
+
+    def store(self, position: int, rows: List[Any], cursor: Optional[str]) -> None:
+        """Range une page chargée à sa position.
+
+        Args:
+            position: Index de la première ligne de la page
+            rows: Lignes de la page
+            cursor: Jeton de la page suivante (None en fin de résultat)
+        """
+        for index, row in enumerate(rows, position):
+            self._rows[index] = row
+        self._cursors.pop(position, None)
+        end = position + len(rows)
+        if cursor is None:
+            self.exhausted = True
+            self.total = end
+        elif end not in self._rows:
+            self._cursors[end] = cursor
+
+    def ensure(self, start: int, stop: int) -> None:
+        """Charge les pages nécessaires pour disposer des lignes [start, stop[.
+
+        Args:
+            start: Index de la première ligne souhaitée
+            stop: Index de fin (exclu)
+        """
+        while self.missing(start, stop):
+            position, cursor, size = self.next_request(start, stop)
+            self.store(position, *self.fetch(position, cursor, size))
+
+    def get(self, start: int, stop: int) -> List[Any]:
+        """Retourne les lignes [start, stop[, en les chargeant si besoin.
+
+        Args:
+            start: Index de la première ligne
+            stop: Index de fin (exclu)
+
+        Returns:
+            List[Any]: Lignes disponibles dans l'intervalle
+        """
+        self.ensure(start, stop)
+        return [self._rows[index] for index in range(start, stop) if index in self._rows]
+
+
+class VirtualGrid(ctk.CTkFrame):
+    """Tableau virtualisé avec en-têtes triables et chargement paresseux.
+
+    Seules les lignes visibles existent sous forme d'éléments de canevas ;
+    leur texte est réécrit à chaque défilement.
+    """
+
+    def __init__(
+        self,
+        master: Any,
+        columns: Sequence[Tuple[str, str, int]],
+        on_select: Optional[Callable[[Any], None]] = None,
+        executor: Optional[Any] = None,
+        **kwargs
+    ) -> None:
+        """Crée le tableau.
+
+        Args:
+            master: Widget parent
+            columns: Triplets (clé de colonne, titre, largeur en pixels)
+            on_select: Fonction appelée avec la ligne sélectionnée
+            executor: TkExecutor chargeant les pages en arrière-plan ; sans
+                exécuteur, les pages sont lues dans le thread de l'interface
+            **kwargs: Options transmises à CTkFrame
+        """
+        super().__init__(master, **kwargs)
+        self.columns = list(columns)
+        self.on_select = on_select
+        self.executor = executor
+        self.source: Optional[PagedRows] = None
+        self._fetch_page: Optional[PageFetcher] = None
+        self._total: Optional[int] = None
+        self.sort_key = self.columns[0][0]
+        self.descending = False
+        self.top = 0
+        self.selected: Optional[int] = None
+        self._row_items: List[Tuple[int, List[int]]] = []
+
+        width = sum(column_width for _, _, column_width in self.columns)
+
+        self.header = tk.Canvas(
+            self, height=HEADER_HEIGHT, width=width,
+            bg=infos.bg_color, highlightthickness=0
+        )
+        self.header.grid(row=0, column=0, sticky="ew")
+
+        self.canvas = tk.Canvas(self, width=width, bg=ROW_COLORS[0], highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._draw_header()
+        self.header.bind("<Button-1>", self._on_header_click)
+        self.canvas.bind("<Configure>", lambda e: self._build_rows())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.canvas.bind("<Button-1>", self._on_click)
+
+    # ----------------------------------------------------------------------
+    # Données
+    # ----------------------------------------------------------------------
+
+    def set_source(self, fetch_page: PageFetcher, total: Optional[int] = None) -> None:
+        """Affiche un nouveau résultat, depuis la première ligne.
+
+        Args:
+            fetch_page: Fonction de chargement d'une page
+            total: Nombre total de lignes s'il est connu
+        """
+        self._fetch_page = fetch_page
+        self._total = total
+        self._reset_source()
+
+    def _reset_source(self) -> None:
+        """Recrée le cache de lignes pour le tri courant."""
+        self.source = PagedRows(self._fetch_page, self.sort_key, self.descending, self._total)
+        self.top = 0
+        self.selected = None
+        self._draw_header()
+        self.refresh()
+
+    def _request_rows(self, start: int, stop: int) -> None:
+        """Demande les pages manquantes pour afficher les lignes [start, stop[.
+
+        Sans exécuteur, les pages sont chargées immédiatement. Sinon une seule
+        page est demandée à la fois ; refresh est rappelé à son arrivée et
+        demande la suivante si besoin.
+
+        Args:
+            start: Index de la première ligne affichée
+            stop: Index de fin (exclu)
+        """
+        source = self.source
+        if source is None or source.loading or not source.missing(start, stop):
+            return
+        if self.executor is None:
+            source.ensure(start, stop)
+            return
+
+        source.loading = True
+        position, cursor, size = source.next_request(start, stop)
+        self.executor.submit(
+            source.fetch, position, cursor, size,
+            on_done=lambda page: self._on_page_loaded(source, position, page),
+            on_error=lambda error: self._on_page_failed(source, error),
+            key=f"grille-{id(self)}"
+        )
+
+    def _on_page_loaded(
+        self,
+        source: PagedRows,
+        position: int,
+        page: Tuple[List[Any], Optional[str]]
+    ) -> None:
+        """Range une page reçue du thread de travail et redessine le tableau.
+
+        Args:
+            source: Cache pour lequel la page a été demandée
+            position: Index de la première ligne de la page
+            page: Couple (lignes, jeton suivant)
+        """
+        if source is not self.source or not self.winfo_exists():
+            return
+        source.loading = False
+        source.store(position, *page)
+        self.refresh()
+
+    def _on_page_failed(self, source: PagedRows, error: BaseException) -> None:
+        """Arrête le chargement d'un cache dont une page n'a pas pu être lue."""
+        print(f"Erreur lors du chargement des lignes : {str(error)}")
+        if source is self.source:
+            source.loading = False
+            source.failed = True
+            if self.winfo_exists():
+                self.refresh()
+
+    def visible_rows(self) -> int:
+        """Nombre de lignes affichables dans la hauteur actuelle."""
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT + 1)
+
+    # ----------------------------------------------------------------------
+    # Dessin
+    # ----------------------------------------------------------------------
+
+    def _draw_header(self) -> None:
+        """Dessine les en-têtes de colonnes avec l'indicateur de tri."""
+        self.header.delete("all")
+        x = 0
+        for key, title, width in self.columns:
+            if key == self.sort_key:
+                title = f"{title} {'▼' if self.descending else '▲'}"
+            self.header.create_text(
+                x + CELL_PADDING, HEADER_HEIGHT // 2, anchor="w",
+                text=title, fill=infos.label_color, font=("Helvetica", 11, "bold")
+            )
+            x += width
+
+    def _build_rows(self) -> None:
+        """Crée le jeu fixe d'éléments de canevas pour les lignes visibles."""
+        count = self.visible_rows()
+        if count == len(self._row_items):
+            self.refresh()
+            return
+
+        self.canvas.delete("all")
+        self._row_items = []
+        for index in range(count):
+            y = index * ROW_HEIGHT
+            background = self.canvas.create_rectangle(
+                0, y, 10000, y + ROW_HEIGHT, width=0, fill=ROW_COLORS[index % 2]
+            )
+            texts = []
+            x = 0
+            for _, _, width in self.columns:
+                texts.append(self.canvas.create_text(
+                    x + CELL_PADDING, y + ROW_HEIGHT // 2, anchor="w",
+                    text="", fill=infos.text_color, font=("Helvetica", 11)
+                ))
+                x += width
+            self._row_items.append((background, texts))
+        self.refresh()
+
+    @staticmethod
+    def _fit(value: Any, width: int) -> str:
+        """Tronque le texte d'une cellule à la largeur de sa colonne."""
+        text = "" if value is None else str(value)
+        max_chars = max(1, (width - 2 * CELL_PADDING) // CHAR_WIDTH)
+        return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+    def refresh(self) -> None:
+        """Réécrit le texte des lignes visibles et la position de la barre."""
+        if self.source is None:
+            return
+
+        count = len(self._row_items)
+        self._request_rows(self.top, self.top + count)
+        total = len(self.source)
+
+        for index, (background, texts) in enumerate(self._row_items):
+            row_index = self.top + index
+            row = self.source.row(row_index)
+            pending = row is None and row_index < total and not self.source.failed
+            fill = SELECTED_COLOR if row is not None and row_index == self.selected \
+                else ROW_COLORS[row_index % 2]
+            self.canvas.itemconfigure(background, fill=fill)
+            for column, (text_item, (key, _, width)) in enumerate(zip(texts, self.columns)):
+                if row is not None:
+                    value = self._fit(row[key], width)
+                else:
+                    value = PLACEHOLDER if pending and column == 0 else ""
+                self.canvas.itemconfigure(text_item, text=value)
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ----------------------------------------------------------------------
+    # Défilement, tri et sélection
+    # ----------------------------------------------------------------------
+
+    def scroll_to(self, top: int) -> None:
+        """Place la ligne top en haut du tableau.
+
+        Args:
+            top: Index de la première ligne affichée
+        """
+        if self.source is None:
+            return
+        last_top = max(0, len(self.source) - len(self._row_items) + 1)
+        self.top = max(0, min(int(top), last_top))
+        self.refresh()
+
+    def scroll_rows(self, delta: int) -> None:
+        """Fait défiler le tableau de delta lignes."""
+        self.scroll_to(self.top + delta)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        """Gère les commandes de la barre de défilement (moveto / scroll)."""
+        if self.source is None:
+            return
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.source))
+        elif action == "scroll":
+            step = len(self._row_items) if unit == "pages" else 1
+            self.scroll_rows(int(amount) * step)
+
+    def _on_mousewheel(self, event) -> None:
+        """Défilement à la molette (event.delta > 0 vers le haut)."""
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_header_click(self, event) -> None:
+        """Trie sur la colonne cliquée, ou inverse le tri si elle l'est déjà."""
+        x = 0
+        for key, _, width in self.columns:
+            if x <= event.x < x + width:
+                if key == self.sort_key:
+                    self.descending = not self.descending
+                else:
+                    self.sort_key = key
+                    self.descending = False
+                if self._fetch_page is not None:
+                    self._reset_source()
+                else:
+                    self._draw_header()
+                return
+            x += width
+
+    def _on_click(self, event) -> None:
+        """Sélectionne la ligne cliquée."""
+        if self.source is None:
+            return
+        row_index = self.top + event.y // ROW_HEIGHT
+        row = self.source.row(row_index)
+        if row is None:
+            return
+        self.selected = row_index
+        self.refresh()
+        if self.on_select is not None:
+            self.on_select(row)
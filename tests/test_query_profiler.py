@@ -0,0 +1,75 @@
+"""
+Tests du profileur de requêtes : chaque exécution doit être enregistrée,
+même quand ses lignes ne sont lues qu'en partie ou pas du tout.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ressources.query_profiler import ProfiledConnection, query_profiler
+
+
+class ProfiledCursorTest(unittest.TestCase):
+    """Enregistrement des exécutions par ProfiledCursor."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.was_enabled = query_profiler.enabled
+        query_profiler.reset()
+        query_profiler.enable(
+            log_path=os.path.join(self.tmp_dir.name, "slow.log"), report_at_exit=False
+        )
+        self.conn = sqlite3.connect(
+            os.path.join(self.tmp_dir.name, "test.db"), factory=ProfiledConnection
+        )
+        self.conn.execute("CREATE TABLE parts (id INTEGER PRIMARY KEY, name TEXT)")
+        self.conn.executemany(
+            "INSERT INTO parts (name) VALUES (?)", [(f"piece {i}",) for i in range(20)]
+        )
+        query_profiler.reset()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        if not self.was_enabled:
+            query_profiler.disable()
+        query_profiler.reset()
+        self.tmp_dir.cleanup()
+
+    def calls(self, fragment: str) -> int:
+        """Nombre d'exécutions enregistrées des requêtes contenant fragment."""
+        return sum(
+            entry["calls"] for entry in query_profiler.snapshot()
+            if fragment in entry["sql"]
+        )
+
+    def test_fetchone_is_recorded(self) -> None:
+        count = self.conn.execute("SELECT count(*) FROM parts").fetchone()[0]
+        self.assertEqual(count, 20)
+        self.assertEqual(self.calls("count(*)"), 1)
+
+    def test_partial_fetchmany_is_recorded(self) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM parts ORDER BY id")
+        self.assertEqual(len(cursor.fetchmany(5)), 5)
+        del cursor
+        self.assertEqual(self.calls("SELECT name FROM parts"), 1)
+
+    def test_unread_query_is_recorded(self) -> None:
+        self.conn.execute("PRAGMA journal_mode")
+        self.assertEqual(self.calls("journal_mode"), 1)
+
+    def test_next_query_closes_previous(self) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM parts WHERE id = 1").fetchone()
+        cursor.execute("SELECT name FROM parts WHERE id = 2").fetchone()
+        cursor.close()
+        self.assertEqual(self.calls("SELECT name FROM parts WHERE id"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()